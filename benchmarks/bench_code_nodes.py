@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Code ノード実行のベンチマーク（入力検証コード）
+
+catalog/・industry/・samples/ の全 DSL から入力検証の Code ノード（出力に is_valid を持つもの。
+gen_core.validation_code / workflow_engine.INJECTION_CODE_TPL の生成物）を集め、
+合成入力で main() を呼ぶスループットを方式ごとに比較する。
+
+  recompile : 実行ごとに compile() → exec → main()（キャッシュなし）
+  exec      : dsl_interpreter.compile_code のコードオブジェクトを使い、実行ごとに exec → main()
+  cached    : ノードごとに 1 回取り出した main() を呼ぶだけ（dsl_interpreter.Workflow の実行時）
+
+検証コードの正規表現はパターンのリストを main() の中で作って re.search(str, ...) に渡すため、
+re モジュール内部のコンパイル済みパターンのキャッシュ（re._MAXCACHE 件）に収まっていることも確認する。
+
+  python benchmarks/bench_code_nodes.py [--calls 200000] [--repeat 3]
+"""
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_interpreter import CODE_CACHE_STATS, SAMPLE_TEXT, compile_code, sample_inputs
+
+RE_FUNCS = {"search", "match", "fullmatch", "findall", "finditer", "sub", "subn", "split", "compile"}
+
+
+def validator_nodes():
+    """[(ノード ID, ソース, main の引数)]"""
+    nodes = []
+    for path, doc in dsl_corpus.load_corpus().items():
+        inputs = sample_inputs(doc)
+        for node in doc["workflow"]["graph"]["nodes"]:
+            data = node.get("data") or {}
+            if data.get("type") != "code" or "is_valid" not in (data.get("outputs") or {}):
+                continue
+            kwargs = {v["variable"]: inputs.get((v.get("value_selector") or [None, None])[-1], SAMPLE_TEXT)
+                      for v in data.get("variables") or []}
+            nodes.append((str(node["id"]), data.get("code") or "", kwargs))
+    return nodes
+
+
+def regex_literals(source):
+    """re.* の第 1 引数、または *patterns という名前のリストに書かれた文字列リテラル"""
+    found = set()
+    for node in ast.walk(ast.parse(source)):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in RE_FUNCS
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == "re" and node.args
+                and isinstance(node.args[0], ast.Constant)):
+            found.add(node.args[0].value)
+        elif (isinstance(node, ast.Assign) and isinstance(node.value, (ast.List, ast.Tuple))
+              and any(isinstance(t, ast.Name) and t.id.endswith("patterns") for t in node.targets)):
+            found.update(e.value for e in node.value.elts if isinstance(e, ast.Constant))
+    return found
+
+
+def load_main(nid, code):
+    namespace = {"__name__": f"code_{nid}"}
+    exec(code, namespace)
+    return namespace["main"]
+
+
+def run(mode, nodes, calls):
+    """calls 回（ノードを巡回）実行して秒数を返す"""
+    if mode == "cached":
+        prepared = [(load_main(nid, compile_code(src)), kwargs) for nid, src, kwargs in nodes]
+    t0 = time.perf_counter()
+    for i in range(calls):
+        nid, source, kwargs = nodes[i % len(nodes)]
+        if mode == "recompile":
+            main = load_main(nid, compile(source, f"<code {nid}>", "exec"))
+        elif mode == "exec":
+            main = load_main(nid, compile_code(source))
+        else:
+            main, kwargs = prepared[i % len(nodes)]
+        result = main(**kwargs)
+    assert result["is_valid"] in ("true", "false")
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000, help="cached / exec の実行回数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nodes = validator_nodes()
+    sources = {src for _, src, _ in nodes}
+    patterns = set().union(*(regex_literals(src) for src in sources))
+    print(f"{len(nodes)} validator nodes, {len(sources)} distinct sources, "
+          f"{len(patterns)} distinct regex literals (re cache holds {re._MAXCACHE})")
+    if len(patterns) > re._MAXCACHE:
+        print("  ! more patterns than re's cache: re.search(str) will recompile on every call")
+
+    # 出力が方式によらず同じこと
+    for nid, src, kwargs in nodes:
+        expected = load_main(nid, compile(src, "<check>", "exec"))(**kwargs)
+        assert load_main(nid, compile_code(src))(**kwargs) == expected, nid
+
+    counts = {"recompile": max(len(nodes), args.calls // 50), "exec": args.calls // 5, "cached": args.calls}
+    rates = {}
+    for mode, calls in counts.items():
+        best = min(run(mode, nodes, calls) for _ in range(args.repeat))
+        rates[mode] = calls / best
+    for mode, rate in rates.items():
+        print(f"  {mode:<10} {rate:>12,.0f} calls/s  {rate / rates['recompile']:7.1f}x")
+    print(f"compile_code: {CODE_CACHE_STATS['misses']} compiles, {CODE_CACHE_STATS['hits']:,} cache hits")
+
+
+if __name__ == "__main__":
+    main()
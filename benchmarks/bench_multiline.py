@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+複数行文字列のブロック化方式ベンチマーク
+
+  legacy : workflow_engine.convert_multiline で文書ツリーを複製 → yaml.dump
+  dumper : dsl_yaml.BlockStyleDumper がダンプ時にスタイルを判定（複製なし）
+
+catalog/・industry/・samples/ の全 DSL を読み込み、各方式を別プロセスで実行して
+処理時間・ダンプ中のピークメモリ（tracemalloc）・プロセスのピーク RSS を比較する。
+
+  python benchmarks/bench_multiline.py [--repeat 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "industry", "ai-solutions"))
+
+import yaml
+import dsl_yaml
+import dsl_corpus
+
+MODES = ("legacy", "dumper")
+
+
+def load_corpus():
+    return list(dsl_corpus.load_corpus().values())
+
+
+def dump_legacy(doc):
+    from workflow_engine import convert_multiline
+    return yaml.dump(convert_multiline(doc), default_flow_style=False, allow_unicode=True,
+                     sort_keys=False, width=200)
+
+
+DUMPERS = {"legacy": dump_legacy, "dumper": dsl_yaml.dump}
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_mode(mode, repeat):
+    """1 方式を計測して結果辞書を返す（子プロセス内で実行される）"""
+    dump = DUMPERS[mode]
+    docs = load_corpus()
+    dump(docs[0])  # import 等のウォームアップ
+    rss_loaded = peak_rss_kb()
+
+    times = []
+    total_bytes = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        total_bytes = sum(len(dump(doc)) for doc in docs)
+        times.append(time.perf_counter() - t0)
+    rss_peak = peak_rss_kb()
+
+    # 1 文書あたりのダンプ中ピーク割り当て量（tracemalloc は遅いので時間計測とは別パス）
+    tracemalloc.start()
+    alloc_peak = 0
+    for doc in docs:
+        tracemalloc.reset_peak()
+        dump(doc)
+        alloc_peak = max(alloc_peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        "mode": mode, "files": len(docs), "chars": total_bytes,
+        "best_s": min(times), "mean_s": sum(times) / len(times),
+        "alloc_peak_kb": alloc_peak // 1024,
+        "rss_loaded_kb": rss_loaded, "rss_peak_kb": rss_peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.repeat)))
+        return
+
+    results = []
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "--repeat", str(args.repeat)],
+                             check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out))
+
+    print(f"corpus: {results[0]['files']} files, {results[0]['chars']:,} chars, repeat={args.repeat}")
+    print(f"{'mode':<8} {'best[s]':>8} {'mean[s]':>8} {'alloc peak/doc[KB]':>19} {'peak RSS[KB]':>13} {'RSS growth[KB]':>15}")
+    for r in results:
+        growth = r["rss_peak_kb"] - r["rss_loaded_kb"] if r["rss_peak_kb"] is not None else "-"
+        print(f"{r['mode']:<8} {r['best_s']:>8.3f} {r['mean_s']:>8.3f} {r['alloc_peak_kb']:>19,} "
+              f"{r['rss_peak_kb'] or '-':>13} {growth:>15}")
+    base, new = results
+    print(f"\nspeedup: {base['best_s'] / new['best_s']:.2f}x, "
+          f"alloc peak: {new['alloc_peak_kb'] / max(base['alloc_peak_kb'], 1):.0%} of legacy")
+
+
+if __name__ == "__main__":
+    main()
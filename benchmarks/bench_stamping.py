@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+build_auto スケルトン・スタンピングのベンチマーク
+
+gen_batch1〜3c の cfg を モデル × temperature × ロケール のバリアントに展開し、
+  rebuild : build_auto({**cfg, **variant})          … バリアントごとにスケルトンから再構築
+  stamp   : AutoSkeleton(cfg).stamp(variant)        … cfg ごとに 1 回コンパイルしてスロットだけ差し込む
+の文書構築時間を比較する（YAML 出力は含まない）。先頭のバリアントについては
+両方式の YAML 出力が一致することも確認する。
+
+  python benchmarks/bench_stamping.py [--variants 10000] [--repeat 3]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "industry", "ai-solutions"))
+
+import dsl_yaml
+from workflow_engine import AutoSkeleton, build_auto
+from gen_batch_all import BATCHES
+
+MODELS = [("openai", "gpt-4o-mini"), ("openai", "gpt-4o"), ("anthropic", "claude-3-5-haiku"),
+          ("azure_openai", "gpt-4o-mini"), ("ollama", "llama3.1:8b")]
+TEMPS = [0.0, 0.2, 0.3, 0.5, 0.7]
+LOCALES = {
+    "ja": "",
+    "en": "\n\n## Output language\nRespond in English.",
+    "zh": "\n\n## 输出语言\n请用简体中文回答。",
+    "ko": "\n\n## 출력 언어\n한국어로 답변하세요.",
+}
+
+
+def variant_grid(cfg):
+    """cfg 1 件分のバリアント（差し替えるスロットだけの dict）"""
+    for (provider, model), temp, (locale, suffix) in itertools.product(MODELS, TEMPS, LOCALES.items()):
+        yield {"provider": provider, "model": model, "temp": temp, "sys": cfg["sys"] + suffix,
+               "out_header": f"{cfg.get('out_header', cfg['name'])} [{locale}]"}
+
+
+def plan(n):
+    """(cfg, variants) のリスト。バリアント総数が n になるまで cfg を巡回する"""
+    cfgs = [cfg for mod in BATCHES for cfg in mod.WORKFLOWS]
+    jobs, total = [], 0
+    for cfg in itertools.cycle(cfgs):
+        variants = list(itertools.islice(variant_grid(cfg), n - total))
+        jobs.append((cfg, variants))
+        total += len(variants)
+        if total >= n:
+            return jobs
+
+
+def run_rebuild(jobs):
+    return sum(1 for cfg, variants in jobs for v in variants if build_auto({**cfg, **v}))
+
+
+def run_stamp(jobs):
+    count = 0
+    for cfg, variants in jobs:
+        skeleton = AutoSkeleton(cfg)
+        count += sum(1 for v in variants if skeleton.stamp(v))
+    return count
+
+
+def best_of(func, jobs, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(jobs)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    jobs = plan(args.variants)
+    cfg, variants = jobs[0]
+    if dsl_yaml.dump(build_auto({**cfg, **variants[1]})) != dsl_yaml.dump(AutoSkeleton(cfg).stamp(variants[1])):
+        sys.exit("stamp output differs from build_auto")
+
+    t_rebuild = best_of(run_rebuild, jobs, args.repeat)
+    t_stamp = best_of(run_stamp, jobs, args.repeat)
+    n = args.variants
+    print(f"{n:,} variants from {len(jobs)} cfgs, best of {args.repeat}")
+    print(f"{'mode':<8} {'total[s]':>9} {'us/variant':>11} {'variants/s':>11}")
+    for mode, t in (("rebuild", t_rebuild), ("stamp", t_stamp)):
+        print(f"{mode:<8} {t:>9.3f} {t / n * 1e6:>11.1f} {n / t:>11,.0f}")
+    print(f"\nspeedup: {t_rebuild / t_stamp:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
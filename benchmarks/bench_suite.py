@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+ジェネレーター ベンチマークスイート（ベースライン比較・回帰検出）
+
+ステージ（各ステージは別プロセスで実行し、スループットとピーク RSS を計測）:
+  build_auto                 gen_batch1〜3c の全 cfg を build_auto
+  convert_multiline          構築済み文書を workflow_engine.convert_multiline（互換パス）
+  yaml_dump                  構築済み文書を dsl_yaml.dump
+  generate_batch:<module>    gen_batch*.WORKFLOWS を generate_batch（一時ディレクトリへ --force 出力）
+  synthetic                  実 cfg から作った合成 cfg N 件（既定 10,000）を build_auto + dsl_yaml.dump
+  layout_long_edges          2,000 ノードの直列 + ノード 0 からの飛び越しエッジ 999 本を gen_layout.layout
+                             （長いエッジのダミーノードがまたぐ長さの合計に比例しないことの確認）
+
+  python benchmarks/bench_suite.py                     # ベースラインと比較（回帰があれば終了コード 1）
+  python benchmarks/bench_suite.py --save-baseline     # 結果をベースラインとして保存
+  python benchmarks/bench_suite.py --stage yaml_dump --max-slowdown 0.1 --max-memory 0.1
+  python benchmarks/bench_suite.py --synthetic 1000    # 合成ステージを縮小（ベースラインも同条件で取ること）
+
+ベースライン（benchmarks/baseline.json）は計測したマシンに依存する。
+別環境で比較する場合は、変更前のツリーで --save-baseline してから変更後に実行する。
+"""
+import argparse
+import atexit
+import contextlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "industry", "ai-solutions"))
+
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+BATCH_MODULES = ["gen_batch1", "gen_batch2", "gen_batch3a", "gen_batch3b", "gen_batch3c"]
+MIN_SAMPLE_S = 0.2
+STAGES = (["build_auto", "convert_multiline", "yaml_dump"]
+          + [f"generate_batch:{m}" for m in BATCH_MODULES] + ["synthetic", "layout_long_edges"])
+LONG_EDGE_CHAIN = 2000
+
+
+def batch_cfgs():
+    import importlib
+    return [cfg for m in BATCH_MODULES for cfg in importlib.import_module(m).WORKFLOWS]
+
+
+def synthetic_cfgs(n):
+    """実 cfg を巡回し、AIS 番号・ファイル名を振り直した合成 cfg"""
+    for i, cfg in zip(range(n), itertools.cycle(batch_cfgs())):
+        num = 1000 + i
+        yield {**cfg, "num": num, "file": f"ais-{num}-synthetic.yml", "name": f"{cfg['name']} #{i}"}
+
+
+def setup_stage(stage, synthetic):
+    """(実行関数, 1 回あたりの処理件数) を返す"""
+    import dsl_yaml
+    from gen_graph import export_doc
+    from workflow_engine import build_auto, convert_multiline, generate_batch
+
+    if stage == "build_auto":
+        cfgs = batch_cfgs()
+        return lambda: [build_auto(c) for c in cfgs], len(cfgs)
+    if stage == "convert_multiline":
+        docs = [export_doc(build_auto(c)) for c in batch_cfgs()]
+        return lambda: [convert_multiline(d) for d in docs], len(docs)
+    if stage == "yaml_dump":
+        docs = [build_auto(c) for c in batch_cfgs()]
+        return lambda: [dsl_yaml.dump(d) for d in docs], len(docs)
+    if stage.startswith("generate_batch:"):
+        import importlib
+        module = stage.split(":", 1)[1]
+        workflows = importlib.import_module(module).WORKFLOWS
+        out_dir = tempfile.mkdtemp(prefix="bench-")
+        atexit.register(shutil.rmtree, out_dir, True)
+
+        def run():
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                generate_batch(workflows, scope=module, force=True, out_dir=out_dir)
+        return run, len(workflows)
+    if stage == "synthetic":
+        def run():
+            # cfg は 1 件ずつ生成・破棄する（件数に比例してメモリが増えないこと）
+            for cfg in synthetic_cfgs(synthetic):
+                dsl_yaml.dump(build_auto(cfg))
+        return run, synthetic
+    if stage == "layout_long_edges":
+        from gen_graph import Edge, Graph, Node
+        from gen_layout import layout
+        ids = [f"n{i}" for i in range(LONG_EDGE_CHAIN)]
+        edges = [Edge(a, b, "code", "code") for a, b in zip(ids, ids[1:])]
+        edges += [Edge(ids[0], ids[k], "code", "code") for k in range(2, LONG_EDGE_CHAIN // 2 + 1)]
+        graph = Graph([Node(i, {"type": "code"}) for i in ids], edges)
+        return lambda: layout(graph), 1
+    raise ValueError(f"unknown stage: {stage}")
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_stage(stage, repeat, synthetic):
+    """1 ステージを計測して結果辞書を返す（子プロセス内で実行される）"""
+    run, items = setup_stage(stage, synthetic)
+    inner = 1
+    if stage == "synthetic":
+        repeat = 1  # 1 回で十分に長い
+    else:
+        # ウォームアップ兼較正: 短いステージは 1 サンプルが MIN_SAMPLE_S 以上になるまで繰り返す
+        t0 = time.perf_counter()
+        run()
+        inner = max(1, int(MIN_SAMPLE_S / max(time.perf_counter() - t0, 1e-6)))
+    rss_ready = peak_rss_kb()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            run()
+        times.append((time.perf_counter() - t0) / inner)
+    rss_peak = peak_rss_kb()
+    best = min(times)
+    return {"stage": stage, "items": items, "best_s": round(best, 5),
+            "items_per_s": round(items / best, 1), "peak_rss_kb": rss_peak,
+            "rss_growth_kb": rss_peak - rss_ready if rss_peak is not None else None}
+
+
+def run_all(stages, repeat, synthetic):
+    results = {}
+    for stage in stages:
+        out = subprocess.run([sys.executable, __file__, "--child", stage, "--repeat", str(repeat),
+                              "--synthetic", str(synthetic)],
+                             check=True, capture_output=True, text=True).stdout
+        results[stage] = json.loads(out)
+        r = results[stage]
+        print(f"  {stage:<26} {r['items_per_s']:>10,.1f} items/s  {r['peak_rss_kb'] or '-':>8} KB", flush=True)
+    return results
+
+
+def compare(results, baseline, max_slowdown, max_memory):
+    """ベースラインとの比較行と回帰の有無を返す"""
+    rows, regressed = [], False
+    for stage, r in results.items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None or base.get("items") != r["items"]:
+            rows.append((stage, r, None, None, "no baseline"))
+            continue
+        speed = r["items_per_s"] / base["items_per_s"]
+        memory = (r["peak_rss_kb"] / base["peak_rss_kb"]) if r["peak_rss_kb"] and base.get("peak_rss_kb") else None
+        status = []
+        if speed < 1 - max_slowdown:
+            status.append("SLOWER")
+        if memory is not None and memory > 1 + max_memory:
+            status.append("MORE MEMORY")
+        regressed |= bool(status)
+        rows.append((stage, r, speed, memory, " ".join(status) or "ok"))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stage", action="append", choices=STAGES, help="計測するステージ（複数指定可、既定は全部）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=10000, help="合成ステージの件数")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存する")
+    parser.add_argument("--max-slowdown", type=float, default=0.2,
+                        help="許容するスループット低下率（既定 0.2 = 20%%）")
+    parser.add_argument("--max-memory", type=float, default=0.2,
+                        help="許容するピーク RSS 増加率（既定 0.2 = 20%%）")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_stage(args.child, args.repeat, args.synthetic)))
+        return
+
+    stages = args.stage or STAGES
+    print(f"python {platform.python_version()} on {platform.machine()} ({os.cpu_count()} CPU), repeat={args.repeat}")
+    results = run_all(stages, args.repeat, args.synthetic)
+
+    if args.save_baseline:
+        baseline = {"python": platform.python_version(), "machine": platform.machine(), "stages": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline["stages"].update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nbaseline saved: {os.path.relpath(args.baseline, ROOT_DIR)}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"\nno baseline at {args.baseline}; run with --save-baseline first")
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows, regressed = compare(results, baseline, args.max_slowdown, args.max_memory)
+    print(f"\n{'stage':<26} {'speed':>7} {'memory':>7}  status  (thresholds: -{args.max_slowdown:.0%} speed, "
+          f"+{args.max_memory:.0%} peak RSS)")
+    for stage, r, speed, memory, status in rows:
+        speed_s = f"{speed:.2f}x" if speed is not None else "-"
+        memory_s = f"{memory:.2f}x" if memory is not None else "-"
+        print(f"{stage:<26} {speed_s:>7} {memory_s:>7}  {status}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ from pptx.enum.shapes import MSO_SHAPE
 import datetime
 import os
 
+# カタログ定義（gen_all.REGISTRY）はメタデータだけを読む。DSL の組み立てや YAML の書き込みは行わない
+import gen_all
+
 # ── カラーパレット ──
 NAVY       = RGBColor(0x1B, 0x2A, 0x4A)
 BLUE       = RGBColor(0x2D, 0x6C, 0xDF)
@@ -31,6 +34,17 @@ W = prs.slide_width
 H = prs.slide_height
 
 # ── ヘルパー関数 ──
+NEW_AIS = {f"AIS-{w.num}" for w in gen_all.workflows()}
+
+
+def check_course(category, rows):
+    """コース表の # 列がカタログ定義（gen_all）と一致することを確認する"""
+    expected = [str(w.num) for w in gen_all.workflows(category)]
+    actual = [row[0] for row in rows[1:]]
+    if actual != expected:
+        raise SystemExit(f"{category}: slide rows {actual} do not match gen_all definitions {expected}")
+    return rows
+
 def add_bg(slide, color):
     fill = slide.background.fill
     fill.solid()
@@ -304,7 +318,7 @@ for i, (problem, color, picks) in enumerate(problems):
                           alignment=PP_ALIGN.CENTER, line_spacing=1.2)
     # Picks
     for j, pick in enumerate(picks):
-        is_new = any(pick.startswith(f"AIS-{n}") for n in range(121, 171))
+        is_new = pick.split()[0] in NEW_AIS
         txt_color = ACCENT if is_new else DARK_GRAY
         prefix = "★ " if is_new else "  "
         add_textbox(slide, x + Inches(0.2), y + Inches(0.85 + j * 0.34), Inches(3.4), Inches(0.3),
@@ -361,7 +375,7 @@ for i, (dept, color, picks) in enumerate(departments):
                 dept, font_size=16, color=WHITE, bold=True, alignment=PP_ALIGN.CENTER)
     # Picks
     for j, pick in enumerate(picks):
-        is_new = any(pick.startswith(f"AIS-{n}") for n in range(121, 171))
+        is_new = pick.split()[0] in NEW_AIS
         txt_color = ACCENT if is_new else DARK_GRAY
         prefix = "★ " if is_new else "  "
         add_textbox(slide, x + Inches(0.15), y + Inches(0.6 + j * 0.45), Inches(2.65), Inches(0.4),
@@ -390,7 +404,7 @@ cross_data = [
     ["129", "経営ダッシュボードナラティブ", "Narrative Science", "月次報告書作成80%短縮"],
     ["130", "社内規程AI検索・改訂", "（自社開発が必要だった領域）", "規程管理の属人化を解消"],
 ]
-make_table(slide, Inches(0.4), Inches(1.5), Inches(12.5), cross_data,
+make_table(slide, Inches(0.4), Inches(1.5), Inches(12.5), check_course('cross-functional', cross_data),
            [0.5, 3.0, 3.5, 3.5], font_size=12, row_height=0.42)
 
 add_rounded_rect(slide, Inches(0.4), Inches(6.3), Inches(12.5), Inches(0.55), RGBColor(0xFF,0xF3,0xE0))
@@ -419,7 +433,7 @@ auto_data = [
     ["137", "サービスキャンペーン通知", "キャンペーン情報→DM・メール・SMS通知文を一括生成", "マーケティング"],
     ["138", "IATF 16949監査チェック", "監査範囲→IATF要求事項の監査チェックリスト生成", "品質管理・監査"],
 ]
-make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), auto_data,
+make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), check_course('automotive', auto_data),
            [0.5, 2.8, 5.4, 1.8], font_size=11, row_height=0.55)
 
 # Bottom callout
@@ -449,7 +463,7 @@ pharma_data = [
     ["145", "薬事申請CTD要約", "CTDデータ→品質・非臨床・臨床の概要ドラフト自動生成", "薬事申請担当"],
     ["146", "PVシグナル分析レポート", "有害事象データ→シグナル検出・評価・対応推奨を分析", "PV責任者"],
 ]
-make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), pharma_data,
+make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), check_course('pharma', pharma_data),
            [0.5, 2.8, 5.4, 1.8], font_size=11, row_height=0.55)
 
 add_rounded_rect(slide, Inches(0.3), Inches(6.3), Inches(12.7), Inches(0.55), RGBColor(0xE8,0xE8,0xF6))
@@ -478,7 +492,7 @@ energy_data = [
     ["153", "電力料金プラン提案書", "使用電力量→最適料金プラン比較＋提案書を自動作成", "営業担当"],
     ["154", "再エネ発電所月次報告", "発電データ→月次運転報告書を自動生成", "発電所管理"],
 ]
-make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), energy_data,
+make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), check_course('energy', energy_data),
            [0.5, 2.8, 5.4, 1.8], font_size=11, row_height=0.55)
 
 add_rounded_rect(slide, Inches(0.3), Inches(6.3), Inches(12.7), Inches(0.55), RGBColor(0xE8,0xF5,0xE9))
@@ -507,7 +521,7 @@ travel_data = [
     ["161", "旅行業約款チェックリスト", "ツアー内容→旅行業法に基づく説明事項チェック生成", "旅行業務取扱"],
     ["162", "観光マーケティングレポート", "観光客データ→観光DMP分析レポートを自動生成", "DMO・行政"],
 ]
-make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), travel_data,
+make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), check_course('travel', travel_data),
            [0.5, 2.8, 5.4, 1.8], font_size=11, row_height=0.55)
 
 add_rounded_rect(slide, Inches(0.3), Inches(6.3), Inches(12.7), Inches(0.55), RGBColor(0xFE,0xF5,0xE7))
@@ -536,7 +550,7 @@ agri_data = [
     ["169", "トレーサビリティ報告書", "生産〜流通データ→食品トレーサビリティ報告書を生成", "品質保証"],
     ["170", "6次産業化事業計画書", "農産物・加工品→6次産業化の事業計画書ドラフト作成", "農業経営者"],
 ]
-make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), agri_data,
+make_table(slide, Inches(0.3), Inches(1.5), Inches(12.7), check_course('agriculture', agri_data),
            [0.5, 2.8, 5.4, 1.8], font_size=11, row_height=0.55)
 
 add_rounded_rect(slide, Inches(0.3), Inches(6.3), Inches(12.7), Inches(0.55), RGBColor(0xE8,0xF5,0xE9))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+dify-gen: DSL YAML ジェネレーターの統合 CLI
+
+gen_all（catalog/ AIS-121〜170）と industry/ai-solutions の generate_all / gen_batch1〜3c
+（AIS-11〜120）を 1 つのコマンドから生成する。AIS 番号・カテゴリ・パスのパターンで
+対象を絞り込むと、該当するジェネレーターだけを import して必要なファイルだけを生成する。
+生成は gen_build.write_jobs（.gen-manifest.json による差分生成、-j でプロセス並列）。
+
+  python dify_gen.py                              # 全件（変更分のみ）
+  python dify_gen.py --list                       # 生成対象の一覧
+  python dify_gen.py --ais 26-49,121              # AIS 番号で指定
+  python dify_gen.py --category catalog/energy    # カテゴリで指定（catalog / industry/ai-solutions も可）
+  python dify_gen.py --glob '*-report.yml' -j 0   # パスのパターンで指定、CPU コア数で並列
+
+生成対象のカテゴリは catalog/<分野>（agriculture, automotive, cross-functional, energy,
+pharma, travel）と industry/ai-solutions だけ。industry/banking・insurance・manufacturing・
+retail・common は手書きの DSL でジェネレーターが無いため、--category に指定しても何も生成しない
+（該当が無いときは生成対象のカテゴリ一覧を表示する）。
+"""
+import fnmatch
+import importlib
+import os
+import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_SOLUTIONS_DIR = os.path.join(ROOT_DIR, "industry", "ai-solutions")
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, AI_SOLUTIONS_DIR)
+
+from gen_build import batch_arg_parser, write_jobs
+
+# ジェネレーター定義: (モジュール名, 出力ディレクトリ, AIS 範囲)
+# AIS 範囲は --ais 指定時に import するモジュールを絞るために使う
+SOURCES = [
+    ("generate_all", "industry/ai-solutions", (11, 25)),
+    ("gen_batch1", "industry/ai-solutions", (26, 49)),
+    ("gen_batch2", "industry/ai-solutions", (50, 77)),
+    ("gen_batch3a", "industry/ai-solutions", (78, 91)),
+    ("gen_batch3b", "industry/ai-solutions", (92, 105)),
+    ("gen_batch3c", "industry/ai-solutions", (106, 120)),
+    ("gen_all", "catalog", (121, 170)),
+]
+
+AIS_RE = re.compile(r"ais-(\d+)-")
+
+
+def parse_ais(spec):
+    """'26-49,121' → {26..49, 121}"""
+    numbers = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        try:
+            lo, hi = int(lo), int(hi or lo)
+        except ValueError:
+            raise ValueError(f"invalid AIS range: {part!r}")
+        numbers.update(range(lo, hi + 1))
+    return numbers
+
+
+def source_jobs(module_name):
+    """ジェネレーターモジュールを import してジョブリストを返す"""
+    mod = importlib.import_module(module_name)
+    if hasattr(mod, "catalog_jobs"):
+        return mod.catalog_jobs()
+    if hasattr(mod, "builder_jobs"):
+        return mod.builder_jobs()
+    from workflow_engine import render_cfg
+    return [(cfg["file"], render_cfg, cfg, module_name) for cfg in mod.WORKFLOWS]
+
+
+def discover(ais=None, categories=None):
+    """
+    生成対象を列挙する。各要素は
+    {"path", "ais", "category", "source", "out_dir", "job"}（path はリポジトリルートからの相対パス）。
+    ais / categories を指定すると、範囲外のジェネレーターは import しない。
+    """
+    targets = []
+    for module_name, out_rel, (lo, hi) in SOURCES:
+        if ais is not None and not any(lo <= n <= hi for n in ais):
+            continue
+        if categories and not any(c == out_rel or c.startswith(out_rel + "/") or out_rel.startswith(c + "/")
+                                  for c in categories):
+            continue
+        for job in source_jobs(module_name):
+            filename = job[0]
+            subdir = os.path.dirname(filename)
+            m = AIS_RE.match(os.path.basename(filename))
+            targets.append({
+                "path": f"{out_rel}/{filename}",
+                "ais": int(m.group(1)) if m else None,
+                "category": f"{out_rel}/{subdir}" if subdir else out_rel,
+                "source": module_name,
+                "out_dir": os.path.join(ROOT_DIR, *out_rel.split("/")),
+                "job": job,
+            })
+    return targets
+
+
+def select(targets, ais=None, categories=None, patterns=None):
+    """AIS 番号・カテゴリ（前方一致）・パスの glob パターンで絞り込む"""
+    def match(t):
+        if ais is not None and t["ais"] not in ais:
+            return False
+        if categories and not any(t["category"] == c or t["category"].startswith(c + "/")
+                                  for c in categories):
+            return False
+        if patterns and not any(fnmatch.fnmatch(t["path"], p) or fnmatch.fnmatch(os.path.basename(t["path"]), p)
+                                for p in patterns):
+            return False
+        return True
+    return [t for t in targets if match(t)]
+
+
+def main():
+    parser = batch_arg_parser(__doc__)
+    parser.add_argument("--ais", help="AIS 番号（例: 26-49,121）")
+    parser.add_argument("--category", action="append", default=[],
+                        help="生成対象のカテゴリ（catalog, catalog/<分野>, industry/ai-solutions）。複数指定可")
+    parser.add_argument("--glob", action="append", default=[],
+                        help="パスまたはファイル名の glob パターン。複数指定可")
+    parser.add_argument("--list", action="store_true", help="生成せず対象を一覧表示する")
+    args = parser.parse_args()
+
+    try:
+        ais = parse_ais(args.ais) if args.ais else None
+    except ValueError as e:
+        parser.error(str(e))
+    categories = [c.strip("/") for c in args.category]
+    filtered = ais is not None or bool(categories) or bool(args.glob)
+    targets = select(discover(ais, categories), ais, categories, args.glob)
+
+    if not targets:
+        print("No matching workflows.")
+        if categories:
+            known = sorted({t["category"] for t in discover()})
+            print("Generated categories: " + ", ".join(known))
+            generated = {out_rel for _, out_rel, _ in SOURCES}
+            manual = sorted(f"industry/{d}" for d in os.listdir(os.path.join(ROOT_DIR, "industry"))
+                            if os.path.isdir(os.path.join(ROOT_DIR, "industry", d))
+                            and f"industry/{d}" not in generated)
+            print("Hand-written (no generator): " + ", ".join(manual))
+        sys.exit(1)
+    if args.list:
+        for t in targets:
+            print(f"  AIS-{t['ais']:<4} {t['path']}  ({t['source']})")
+        print(f"\n{len(targets)} workflows")
+        return
+
+    # 出力ディレクトリ（= マニフェスト）ごとにまとめて生成。絞り込み時は削除（prune）しない
+    built = 0
+    for out_dir in dict.fromkeys(t["out_dir"] for t in targets):
+        group = [t for t in targets if t["out_dir"] == out_dir]
+        print(f"=== {os.path.relpath(out_dir, ROOT_DIR)} ({len(group)} workflows) ===")
+        built += write_jobs([t["job"] for t in group], out_dir, workers=args.workers,
+                            label="  ✓ {}", force=args.force, prune=not filtered)
+    print(f"\n{built} of {len(targets)} workflows generated.")
+
+
+if __name__ == "__main__":
+    main()
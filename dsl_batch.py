@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+バッチ実行: 1 つのワークフローを JSONL / CSV の入力行すべてに対して実行する
+
+入力は 1 行ずつ読み（JSONL は 1 行 1 オブジェクト、CSV は 1 行目がヘッダー）、列を Start ノードの
+変数に対応付けて dsl_interpreter.Workflow で実行する。結果は入力と同じ順に 1 行 1 件の JSONL で書き出す。
+
+  - 行は chunk 件ずつワーカープロセスに渡し、処理中のチャンクは最大 workers × 4 個に抑える
+    （入力・出力ともストリーミングなので、数 GB の入力でもメモリ使用量は一定）
+  - チェックポイント（<出力>.ckpt）に書き出し済みの行数と出力ファイルの長さを定期的に保存する。
+    --resume で続きから再開（出力をチェックポイントの位置まで切り詰め、処理済みの行を読み飛ばす）
+  - 進捗と最後の集計で rows/s を表示する
+
+列の対応付けは既定で「列名 = 変数名」。--map 列=変数 で変更でき、query 列（--query-column）は
+sys.query になる。CSV の値は文字列なので、number 型の変数は Start ノードで数値に変換される。
+
+  python dsl_batch.py industry/banking/bnk-06-complaint-classification.yml complaints.csv -o out.jsonl
+  python dsl_batch.py industry/banking/bnk-02-loan-review.yml apps.jsonl -o out.jsonl --resume -j 4
+  python dsl_batch.py WORKFLOW INPUT -o OUT --stubs mystubs:RecordedStubs --http live
+  python dsl_batch.py WORKFLOW INPUT -o OUT --http live --replay auto   # LLM・HTTP の応答を記録・再生（dsl_replay）
+
+出力行: {"row": 0, "status": "succeeded", "outputs": {...}, "error": null, "error_node": null, "ms": 1.2}
+"""
+import argparse
+import csv
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_interpreter import Stubs, Workflow, WorkflowError, offline_transport, urllib_transport
+from dsl_replay import MODES as REPLAY_MODES, ReplayCache, ReplayStubs
+from dsl_validate import START_TYPES
+
+CHUNK = 64
+CHECKPOINT_EVERY = 1000
+PROGRESS_INTERVAL = 2.0
+
+
+def load_stubs(spec):
+    """'module:Class' → Stubs のインスタンス（None なら既定のスタブ）"""
+    if not spec:
+        return None
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "Stubs")()
+
+
+def start_variables(doc):
+    for node in doc["workflow"]["graph"].get("nodes") or []:
+        data = node.get("data") or {}
+        if data.get("type") in START_TYPES and not node.get("parentId"):
+            return [v.get("variable") for v in data.get("variables") or []]
+    return []
+
+
+def read_rows(path, fmt):
+    """(行番号, 行) を 1 件ずつ返す。JSONL の行は未解析の文字列のまま（解析はワーカーで行う）"""
+    with open(path, encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        if fmt == "csv":
+            yield from enumerate(csv.DictReader(f))
+        else:
+            yield from enumerate(line for line in f if line.strip())
+
+
+# ── ワーカー（プロセスごとにワークフローを 1 回だけ構築する） ──
+
+_RUNNER = None
+
+
+class Runner:
+    def __init__(self, workflow_path, mapping, query_column, http, stubs, replay=None):
+        doc, error = dsl_corpus.parse_file(workflow_path)
+        if error:
+            raise ValueError(error)
+        transport = urllib_transport if http == "live" else offline_transport
+        stubs = load_stubs(stubs)
+        self.cache = None
+        if replay:
+            self.cache = cache = ReplayCache(mode=replay)
+            stubs, transport = ReplayStubs(stubs or Stubs(), cache), cache.transport(transport)
+        self.workflow = Workflow(doc, stubs=stubs, transport=transport)
+        self.columns = [(mapping.get(v, v), v) for v in start_variables(doc)]
+        self.query_column = query_column
+
+    def run(self, index, row):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except ValueError as e:
+                return _line(index, "failed", error=f"invalid JSON: {e}")
+            if not isinstance(row, dict):
+                return _line(index, "failed", error="row must be a JSON object")
+        inputs = {var: row[col] for col, var in self.columns if col in row}
+        result = self.workflow.run(inputs, query=row.get(self.query_column))
+        return _line(index, result.status, result.outputs, result.error, result.error_node, result.elapsed)
+
+
+def _line(index, status, outputs=None, error=None, error_node=None, elapsed=0.0):
+    """(出力行, 成功したか)"""
+    line = json.dumps({"row": index, "status": status, "outputs": outputs or {}, "error": error,
+                       "error_node": error_node, "ms": round(elapsed * 1000, 3)}, ensure_ascii=False)
+    return line + "\n", status == "succeeded"
+
+
+def _init_worker(*args):
+    global _RUNNER
+    _RUNNER = Runner(*args)
+    if _RUNNER.cache is not None and _RUNNER.cache.mode == "replay":
+        _RUNNER.cache.block_sockets()   # ワーカープロセスは終了時に破棄されるので戻さない
+
+
+def _run_chunk(rows):
+    return [_RUNNER.run(index, row) for index, row in rows]
+
+
+# ── チェックポイント ──
+
+def _fingerprint(workflow_path, input_path):
+    with open(workflow_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return {"workflow": os.path.abspath(workflow_path), "workflow_sha1": digest,
+            "input": os.path.abspath(input_path)}
+
+
+def load_checkpoint(path, fingerprint):
+    try:
+        with open(path, encoding="utf-8") as f:
+            ckpt = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return ckpt if all(ckpt.get(k) == v for k, v in fingerprint.items()) else None
+
+
+def save_checkpoint(path, fingerprint, rows, offset, failed):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**fingerprint, "rows": rows, "offset": offset, "failed": failed}, f)
+    os.replace(tmp, path)
+
+
+# ── 実行 ──
+
+def run_batch(workflow_path, input_path, output_path, fmt=None, workers=0, chunk=CHUNK, mapping=None,
+              query_column="query", http="offline", stubs=None, resume=False, limit=None,
+              checkpoint_every=CHECKPOINT_EVERY, progress=True, replay=None):
+    """集計 dict {"rows", "processed", "failed", "skipped", "seconds", "rows_per_s"} を返す（rows / failed は再開前を含む）"""
+    fmt = fmt or ("csv" if input_path.lower().endswith(".csv") else "jsonl")
+    workers = workers or os.cpu_count() or 1
+    ckpt_path = output_path + ".ckpt"
+    fingerprint = _fingerprint(workflow_path, input_path)
+    ckpt = load_checkpoint(ckpt_path, fingerprint) if resume else None
+    if ckpt and not (os.path.exists(output_path) and os.path.getsize(output_path) >= ckpt["offset"]):
+        ckpt = None  # 出力が消えている・短い: 最初からやり直す
+    done, failed, offset = (ckpt["rows"], ckpt["failed"], ckpt["offset"]) if ckpt else (0, 0, 0)
+    args = (workflow_path, mapping or {}, query_column, http, stubs, replay)
+    runner = Runner(*args)  # 出力を開く・ワーカーを起こす前に DSL とスタブの指定を検査する
+
+    out = open(output_path, "r+b" if ckpt and os.path.exists(output_path) else "wb")
+    out.truncate(offset)
+    out.seek(offset)
+    rows = itertools.islice(read_rows(input_path, fmt), done, limit)
+    chunks = iter(lambda: list(itertools.islice(rows, chunk)), [])
+
+    skipped, start = done, time.perf_counter()
+    last_report = start
+    last_saved = done
+
+    def write(lines):
+        nonlocal done, failed, offset, last_report, last_saved
+        for line, ok in lines:
+            data = line.encode("utf-8")
+            out.write(data)
+            offset += len(data)
+            failed += not ok
+        done += len(lines)
+        now = time.perf_counter()
+        if done - last_saved >= checkpoint_every:
+            out.flush()
+            save_checkpoint(ckpt_path, fingerprint, done, offset, failed)
+            last_saved = done
+        if progress and now - last_report >= PROGRESS_INTERVAL:
+            rate = (done - skipped) / (now - start)
+            print(f"  {done:,} rows ({rate:,.0f} rows/s, {failed:,} failed)", file=sys.stderr, flush=True)
+            last_report = now
+
+    try:
+        if workers == 1:
+            # replay モードは実行中のソケット接続を禁止する（ワーカーでは _init_worker で禁止する）
+            replaying = runner.cache is not None and runner.cache.mode == "replay"
+            restore = runner.cache.block_sockets() if replaying else None
+            try:
+                for batch in chunks:
+                    write([runner.run(index, row) for index, row in batch])
+            finally:
+                if restore:
+                    restore()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=args) as pool:
+                pending = deque()
+                for batch in chunks:
+                    pending.append(pool.submit(_run_chunk, batch))
+                    if len(pending) >= workers * 4:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        # 中断時も書き出し済みの行までをチェックポイントにする（出力は行順なので途中に欠けはない）
+        out.flush()
+        out.close()
+        save_checkpoint(ckpt_path, fingerprint, done, offset, failed)
+    seconds = time.perf_counter() - start
+    processed = done - skipped
+    return {"rows": done, "processed": processed, "failed": failed, "skipped": skipped,
+            "seconds": round(seconds, 3), "rows_per_s": round(processed / seconds, 1) if seconds else 0.0}
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("workflow", help="実行する .yml")
+    parser.add_argument("input", help="入力（.jsonl / .csv）")
+    parser.add_argument("-o", "--output", required=True, help="結果の JSONL")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="入力形式（既定は拡張子から判定）")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="並列数（0 = CPU コア数、1 = シリアル）")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help=f"ワーカーに渡す行数（既定 {CHUNK}）")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUMN=VARIABLE", help="列と Start 変数の対応")
+    parser.add_argument("--query-column", default="query", help="sys.query にする列（既定 query）")
+    parser.add_argument("--http", choices=("offline", "live"), default="offline",
+                        help="http-request ノードを送信しない（offline、既定）か実際に送信する（live）")
+    parser.add_argument("--stubs", metavar="MODULE:CLASS", help="LLM などのスタブ（dsl_interpreter.Stubs のサブクラス）")
+    parser.add_argument("--replay", choices=REPLAY_MODES,
+                        help="LLM・HTTP の応答を .dsl-cache/replay に記録（record）・再生（replay、ソケット接続を禁止）・"
+                             "両方（auto）")
+    parser.add_argument("--resume", action="store_true", help="チェックポイントから再開する")
+    parser.add_argument("--limit", type=int, help="先頭から N 行だけ実行する")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, help="チェックポイントの間隔（行）")
+    args = parser.parse_args()
+
+    mapping = {}
+    for item in args.map:
+        column, _, variable = item.partition("=")
+        mapping[variable] = column
+    try:
+        stats = run_batch(args.workflow, args.input, args.output, args.format, args.workers, args.chunk, mapping,
+                          args.query_column, args.http, args.stubs, args.resume, args.limit, args.checkpoint_every,
+                          replay=args.replay)
+    except (ValueError, WorkflowError) as e:
+        sys.exit(f"{args.workflow}: {e}")
+    except KeyboardInterrupt:
+        sys.exit(f"\ninterrupted; resume with --resume (checkpoint: {args.output}.ckpt)")
+    resumed = f", resumed after {stats['skipped']:,}" if stats["skipped"] else ""
+    print(f"{stats['processed']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_s']:,.0f} rows/s{resumed}); "
+          f"{stats['failed']:,} failed total; peak RSS {peak_rss_kb() or '-'} KB")
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+DSL コーパスローダー（解析済み文書のディスクキャッシュ付き）
+
+catalog/・industry/・samples/ の全 .yml を解析して {絶対パス: 文書} で返す。
+解析結果は .dsl-cache/corpus.pickle に (mtime_ns, size) と共に保存し、
+次回以降は変更のあったファイルだけを再解析する（ファイル単位の無効化）。
+削除・移動されたファイルのエントリはキャッシュ保存時に取り除く。
+コールドキャッシュで未解析のファイルが多いときはプロセスプールで並列に解析する。
+PyYAML のバージョンやローダーが変わった場合はキャッシュ全体を作り直す。
+
+  import dsl_corpus
+  corpus = dsl_corpus.load_corpus()          # {path: doc}
+  corpus.errors                              # {path: 解析エラーメッセージ}
+  corpus.stats                               # {"files", "cached", "parsed", "seconds"}
+
+  python dsl_corpus.py                       # 読み込み統計を表示（キャッシュを更新）
+  python dsl_corpus.py --clear               # キャッシュを削除してコールドロード
+"""
+import argparse
+import glob
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIRS = ("catalog", "industry", "samples")
+CACHE_DIR = os.path.join(ROOT_DIR, ".dsl-cache")
+CACHE_PATH = os.path.join(CACHE_DIR, "corpus.pickle")
+CACHE_FORMAT = 1
+
+LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# 並列解析に切り替える未解析ファイル数の下限（少数ならプロセス起動の方が高くつく）
+PARALLEL_MIN_FILES = 16
+
+
+def corpus_files(root=ROOT_DIR, dirs=CORPUS_DIRS):
+    files = []
+    for d in dirs:
+        files += glob.glob(os.path.join(root, d, "**", "*.yml"), recursive=True)
+    return sorted(files)
+
+
+def parse_file(path):
+    """(doc, error) を返す。解析エラーは例外にせずメッセージで返す"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return yaml.load(f, Loader=LOADER), None
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _cache_key():
+    return (CACHE_FORMAT, yaml.__version__, LOADER.__name__)
+
+
+def _read_cache(path):
+    try:
+        with open(path, "rb") as f:
+            key, entries = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+        return {}
+    return entries if key == _cache_key() else {}
+
+
+def _write_cache(path, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((_cache_key(), entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+class Corpus(dict):
+    """{パス: 文書}。解析に失敗したファイルは errors に入り、dict には含まれない"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+        self.stats = {}
+
+
+def load_corpus(paths=None, workers=None, use_cache=True, cache_path=CACHE_PATH):
+    """
+    paths（省略時は corpus_files()）を読み込んで Corpus を返す。
+    workers: 未解析ファイルの並列数（None / 0 以下 = CPU コア数、1 = シリアル）
+    """
+    t0 = time.perf_counter()
+    paths = [os.path.abspath(p) for p in (corpus_files() if paths is None else paths)]
+    entries = _read_cache(cache_path) if use_cache else {}
+    cached = len(entries)
+
+    corpus = Corpus()
+    stale = []
+    hits = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            corpus.errors[path] = f"{type(e).__name__}: {e}"
+            entries.pop(path, None)
+            continue
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            hits += 1
+            doc, error = entry[1], entry[2]
+            if error is None:
+                corpus[path] = doc
+            else:
+                corpus.errors[path] = error
+        else:
+            stale.append((path, stamp))
+    # 今回の paths に含まれないエントリは、ファイルが無くなったものだけ捨てる（部分ロードで他を消さない）
+    requested = set(paths)
+    gone = [p for p in entries if p not in requested and not os.path.exists(p)]
+    for path in gone:
+        del entries[path]
+    pruned = len(entries) < cached
+
+    if stale:
+        if workers is None or workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(stale))
+        stale_paths = [p for p, _ in stale]
+        if workers > 1 and len(stale) >= PARALLEL_MIN_FILES:
+            chunksize = max(1, len(stale) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(parse_file, stale_paths, chunksize=chunksize))
+        else:
+            parsed = [parse_file(p) for p in stale_paths]
+        for (path, stamp), (doc, error) in zip(stale, parsed):
+            entries[path] = (stamp, doc, error)
+            if error is None:
+                corpus[path] = doc
+            else:
+                corpus.errors[path] = error
+    if use_cache and (stale or pruned):
+        _write_cache(cache_path, entries)
+
+    # 元の順序（ソート済みパス順）に揃える
+    ordered = {p: corpus[p] for p in paths if p in corpus}
+    corpus.clear()
+    corpus.update(ordered)
+    corpus.stats = {"files": len(paths), "cached": hits, "parsed": len(stale),
+                    "seconds": time.perf_counter() - t0}
+    return corpus
+
+
+def clear_cache(cache_path=CACHE_PATH):
+    try:
+        os.remove(cache_path)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clear", action="store_true", help="キャッシュを削除してから読み込む")
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使わずに全件解析する")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="並列数（0 = CPU コア数、1 = シリアル）")
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_cache()
+    corpus = load_corpus(workers=args.workers, use_cache=not args.no_cache)
+    s = corpus.stats
+    print(f"{s['files']} files: {s['cached']} from cache, {s['parsed']} parsed in {s['seconds']:.3f}s")
+    for path, error in corpus.errors.items():
+        print(f"  ERROR {os.path.relpath(path, ROOT_DIR)}: {error}")
+    sys.exit(1 if corpus.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
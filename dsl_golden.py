@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+DSL YAML ゴールデンファイル検証
+
+  1. catalog/・industry/・samples/ の全 .yml を読み込み、dsl_yaml.dump（libyaml 経由）と
+     dsl_yaml.dump_pure（純 Python）の出力がバイト単位で一致することを確認する
+  2. ジェネレーター（gen_all.REGISTRY / workflow_engine の gen_batch*.WORKFLOWS /
+     generate_all.BUILDERS）の出力をメモリ上で再生成し、リポジトリ内のファイルと一致することを確認する
+  3. 再出力がファイルと一致する（= ジェネレーター出力そのままの）ファイル数を報告する
+
+  python dsl_golden.py            # 不一致があれば終了コード 1
+"""
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_SOLUTIONS_DIR = os.path.join(ROOT_DIR, "industry", "ai-solutions")
+sys.path.insert(0, AI_SOLUTIONS_DIR)
+
+import dsl_yaml
+from dsl_corpus import corpus_files, load_corpus
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def check_emitters(files):
+    """libyaml 出力と純 Python 出力の一致を確認。(failures, accelerated, canonical, t_pure, t_fast)"""
+    corpus = load_corpus(files)
+    failures, accelerated, canonical = list(corpus.errors), 0, 0
+    t_pure = t_fast = 0.0
+    for path, doc in corpus.items():
+        text = read_text(path)
+        t0 = time.perf_counter()
+        pure = dsl_yaml.dump_pure(doc)
+        t1 = time.perf_counter()
+        fast = dsl_yaml.dump(doc)
+        t_fast += time.perf_counter() - t1
+        t_pure += t1 - t0
+        if dsl_yaml.dump_accelerated(doc) is not None:
+            accelerated += 1
+        if fast != pure:
+            failures.append(path)
+        if pure == text:
+            canonical += 1
+    return failures, accelerated, canonical, t_pure, t_fast
+
+
+def check_generators():
+    """全ジェネレーターの出力とリポジトリ内ファイルの一致を確認"""
+    import gen_all
+    from gen_batch_all import all_jobs
+    failures = []
+    targets = [(gen_all.BASE, job) for job in gen_all.catalog_jobs()]
+    targets += [(AI_SOLUTIONS_DIR, job) for job in all_jobs()]
+    for out_dir, (filename, func, arg, _) in targets:
+        path = os.path.join(out_dir, *filename.split("/"))
+        if not os.path.exists(path) or func(arg) != read_text(path):
+            failures.append(path)
+    return failures, len(targets)
+
+
+def main():
+    files = corpus_files()
+    emit_fail, accelerated, canonical, t_pure, t_fast = check_emitters(files)
+    gen_fail, gen_total = check_generators()
+
+    print(f"libyaml: {'available' if dsl_yaml.HAS_LIBYAML else 'not available (pure Python only)'}")
+    print(f"emitter : {len(files) - len(emit_fail)}/{len(files)} files identical "
+          f"({accelerated} via libyaml, {len(files) - accelerated} pure-Python fallback)")
+    print(f"          pure {t_pure:.2f}s / dsl_yaml.dump {t_fast:.2f}s")
+    print(f"generate: {gen_total - len(gen_fail)}/{gen_total} generated workflows match the repository")
+    print(f"canonical: {canonical}/{len(files)} files are byte-for-byte dump(load(file))")
+    for path in emit_fail:
+        print(f"  EMITTER MISMATCH: {os.path.relpath(path, ROOT_DIR)}")
+    for path in gen_fail:
+        print(f"  GENERATOR MISMATCH: {os.path.relpath(path, ROOT_DIR)}")
+    sys.exit(1 if emit_fail or gen_fail else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,850 @@
+#!/usr/bin/env python3
+"""
+Dify DSL ローカルインタープリター: ワークフロー YAML のグラフをそのまま実行する
+
+対応ノード:
+  start / code（python3）/ if-else（cases 形式・旧 conditions 形式）/ template-transform /
+  variable-aggregator / iteration / http-request / variable-assigner / end / answer
+  llm / knowledge-retrieval / question-classifier / parameter-extractor は Stubs に委譲する
+  （既定は決定的なダミー応答。サブクラスでメソッドを上書きして差し替える）
+
+Workflow(doc) の構築時にスコープ（トップレベル・イテレーションごと）のトポロジカル順を
+1 回だけ求め、run() はその順にノードを 1 パスで実行する。分岐ノードは選ばれた sourceHandle の
+エッジだけを有効にし、有効な入力エッジが 1 本もないノードはスキップされる（合流ノードは
+いずれかの分岐が到達すれば実行）。Code ノードのソースはソースのハッシュをキーにコンパイル結果を
+プロセス内で共有し（compile_code）、main はノードごとに初回実行時に 1 回だけ取り出す。
+template-transform は dsl_template の LRU キャッシュでソースごとに 1 回だけコンパイルする。
+イテレーションは is_parallel（旧形式 parallel_mode）なら parallel_nums 件（既定 10）までスレッドで
+同時に処理し（子に外部呼び出しのノードがある場合）、出力は項目順に並べる。
+失敗した項目は error_handle_mode に従って terminated（全体を失敗）/ continue-on-error（None）/
+remove-abnormal-output（除外）とし、RunResult.item_errors に記録する。
+
+HTTP は transport 関数（request dict → response dict）で差し替えられる。既定は urllib、
+offline_transport は通信せずに 200 / "{}" を返す。retry（または retry_config）があれば、通信エラーと
+429 / 5xx の応答を retry_interval ミリ秒おきに max_retries 回まで再送する。
+
+Workflow(doc, trace=True) なら RunResult.spans にノードごとの実行記録（開始・終了・入出力のバイト数・
+イテレーションの項目・HTTP の試行）を残す。Chrome trace / JSONL への書き出しは dsl_trace。
+
+  from dsl_interpreter import Workflow, Stubs
+  result = Workflow(doc, stubs=MyStubs()).run({"currency_pair": "USD/JPY"})
+  result.status, result.outputs, result.steps
+
+  python dsl_interpreter.py industry/banking/bnk-08-fx-rate.yml --input currency_pair=USD/JPY --offline
+  python dsl_interpreter.py --corpus -n 20          # 全ワークフローを合成入力・スタブ・オフライン HTTP で実行
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import ChainMap, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_template import TEMPLATES, TemplateError
+from dsl_validate import START_TYPES
+
+VARIABLE_REF = re.compile(r"\{\{#([^#{}]+?)#\}\}")
+
+# イテレーションの error_handle_mode（Dify の既定は terminated）
+TERMINATED, CONTINUE_ON_ERROR, REMOVE_ABNORMAL = "terminated", "continue-on-error", "remove-abnormal-output"
+DEFAULT_PARALLEL_NUMS = 10
+# 外部呼び出しの待ちが支配的なノード（並行実行で短縮できるもの）
+IO_TYPES = {"llm", "http-request", "knowledge-retrieval", "question-classifier", "parameter-extractor"}
+# http-request の再送対象（通信エラーに加えて）
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class WorkflowError(Exception):
+    """ワークフローの構築・実行エラー。node_id は失敗したノード"""
+
+    def __init__(self, message, node_id=None):
+        super().__init__(message)
+        self.node_id = node_id
+
+
+ZERO_VALUES = {"number": 0, "bool": False, "boolean": False, "select": "", "string": "", "object": {},
+               "array[string]": [], "array[number]": [], "array[object]": []}
+
+
+class Stubs:
+    """外部サービスを使うノードの応答。既定は入力から決まる固定応答（node_id はノードの ID、data はノード定義）"""
+
+    def llm(self, node_id, data, messages):
+        """messages: [{"role", "text"}] → 出力変数（text は必須）"""
+        prompt = messages[-1]["text"] if messages else ""
+        text = f"[{data.get('title', 'LLM')}] {prompt[:200]}"
+        tokens = sum(len(m["text"]) for m in messages)
+        return {"text": text, "usage": {"prompt_tokens": tokens, "completion_tokens": len(text),
+                                        "total_tokens": tokens + len(text)}}
+
+    def knowledge_retrieval(self, node_id, data, query):
+        """検索結果のリスト（各要素は {"content", "title", "metadata"}）"""
+        return []
+
+    def question_classifier(self, node_id, data, query):
+        """選ばれたクラスの id"""
+        classes = data.get("classes") or []
+        return classes[0]["id"] if classes else None
+
+    def parameter_extractor(self, node_id, data, query):
+        """{パラメータ名: 値}（既定は型ごとのゼロ値）"""
+        return {p["name"]: ZERO_VALUES.get(p.get("type"), "") for p in data.get("parameters") or []}
+
+
+def urllib_transport(request):
+    """request {"method", "url", "headers", "body"(bytes|None), "timeout", "node_id"} → {"status_code", "headers", "body"}"""
+    req = urllib.request.Request(request["url"], data=request["body"], method=request["method"],
+                                 headers=request["headers"])
+    try:
+        with urllib.request.urlopen(req, timeout=request["timeout"]) as resp:
+            return {"status_code": resp.status, "headers": dict(resp.headers), "body": resp.read()}
+    except urllib.error.HTTPError as e:  # 4xx / 5xx もレスポンスとして返す（Dify と同じ）
+        return {"status_code": e.code, "headers": dict(e.headers or {}), "body": e.read()}
+
+
+def offline_transport(request):
+    return {"status_code": 200, "headers": {"content-type": "application/json"}, "body": b"{}"}
+
+
+def to_text(value):
+    """変数参照を文字列に埋め込むときの表現"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _kv_lines(text):
+    """'key: value' 行（headers / params の旧形式）を dict にする"""
+    pairs = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip():
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+OUTPUT_TYPES = {
+    "string": str, "number": (int, float), "object": dict, "boolean": bool,
+    "array[string]": str, "array[number]": (int, float), "array[object]": dict,
+}
+
+
+def _check_output(name, value, vtype):
+    if value is None or vtype not in OUTPUT_TYPES:
+        return
+    expected = OUTPUT_TYPES[vtype]
+    if vtype.startswith("array"):
+        ok = isinstance(value, list) and all(isinstance(v, expected) for v in value if v is not None)
+    else:
+        ok = isinstance(value, expected) and not (vtype == "number" and isinstance(value, bool))
+    if not ok:
+        raise WorkflowError(f"output {name!r} must be {vtype}, got {type(value).__name__}")
+
+
+def _compare(op, actual, expected):
+    """if-else の比較演算子"""
+    if op in ("empty", "not empty"):
+        empty = actual is None or actual == "" or actual == [] or actual == {}
+        return empty if op == "empty" else not empty
+    if op in ("null", "not null"):
+        return (actual is None) if op == "null" else actual is not None
+    if op in ("contains", "not contains", "not-contains"):
+        found = actual is not None and expected in actual
+        return found if op == "contains" else not found
+    if op == "start with":
+        return isinstance(actual, str) and actual.startswith(expected)
+    if op == "end with":
+        return isinstance(actual, str) and actual.endswith(expected)
+    if op in ("is", "is not"):
+        if isinstance(actual, bool):  # 条件値は文字列で書かれる（"true" / "false"）
+            actual = "true" if actual else "false"
+        same = to_text(actual) == to_text(expected)
+        return same if op == "is" else not same
+    if op in ("in", "not in"):
+        found = actual in (expected or [])
+        return found if op == "in" else not found
+    if op == "all of":
+        return actual is not None and all(v in actual for v in expected or [])
+    if op in ("=", "≠", ">", "<", "≥", "≤"):
+        if actual is None:
+            return False
+        a, b = float(actual), float(expected)
+        return {"=": a == b, "≠": a != b, ">": a > b, "<": a < b, "≥": a >= b, "≤": a <= b}[op]
+    raise WorkflowError(f"unsupported comparison operator {op!r}")
+
+
+_CODE_CACHE = {}                 # ソースの sha1 → コードオブジェクト（全 Workflow で共有）
+CODE_CACHE_STATS = Counter()     # hits / misses
+
+
+def compile_code(source):
+    """Code ノードのソースをコンパイルする。同じソースは（別の文書・別のノードでも）1 回だけ"""
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    code = _CODE_CACHE.get(key)
+    if code is None:
+        CODE_CACHE_STATS["misses"] += 1
+        code = _CODE_CACHE[key] = compile(source, f"<code {key[:12]}>", "exec")
+    else:
+        CODE_CACHE_STATS["hits"] += 1
+    return code
+
+
+def iteration_settings(data):
+    """イテレーションの (同時実行数, error_handle_mode)。並列モードでなければ同時実行数は 1"""
+    parallel = data.get("is_parallel", data.get("parallel_mode"))
+    nums = data.get("parallel_nums") or DEFAULT_PARALLEL_NUMS
+    return (max(1, int(nums)) if parallel else 1), data.get("error_handle_mode") or TERMINATED
+
+
+def retry_settings(data):
+    """http-request の (最大再送回数, 間隔秒)。retry_config（新形式）は retry_enabled のときだけ有効"""
+    config = data.get("retry_config")
+    if config is not None:
+        if not config.get("retry_enabled"):
+            return 0, 0.0
+    else:
+        config = data.get("retry") or {}
+    return max(0, int(config.get("max_retries") or 0)), (config.get("retry_interval") or 0) / 1000
+
+
+def http_timeout(data):
+    """http-request の読み取りタイムアウト（秒）。ミリ秒で書かれた DSL もある"""
+    read = (data.get("timeout") or {}).get("read") or 60
+    return read / 1000 if read > 600 else read
+
+
+def byte_size(value):
+    """変数の値の大きさ（文字列は UTF-8、それ以外は JSON にしたときのバイト数）"""
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def collect_items(nid, outcomes, mode, result):
+    """[(出力, WorkflowError | None)]（項目順）→ output のリスト。失敗した項目は result.item_errors に記録する"""
+    output = []
+    for index, (value, error) in enumerate(outcomes):
+        if error is None:
+            output.append(value)
+            continue
+        result.item_errors.append({"iteration": nid, "index": index, "node": error.node_id, "error": str(error)})
+        if mode != REMOVE_ABNORMAL:
+            output.append(None)
+    return output
+
+
+class RunResult:
+    __slots__ = ("status", "outputs", "error", "error_node", "steps", "item_errors", "conversation", "started",
+                 "elapsed", "spans")
+
+    def __init__(self):
+        self.status = "succeeded"
+        self.outputs = {}
+        self.error = None
+        self.error_node = None
+        self.steps = []         # [(node_id, type, 開始, 終了)]（perf_counter 秒、完了順）
+        self.item_errors = []   # イテレーションで失敗した項目 [{"iteration", "index", "node", "error"}]
+        self.conversation = {}  # 実行後の会話変数
+        self.started = 0.0
+        self.elapsed = 0.0
+        # trace=True のときの実行記録 [{"kind": "node" | "item" | "attempt", "node", "type", "scope", "item",
+        #   "start", "end", "status", ...}]（kind ごとの項目は Workflow._span / _item_span / _attempt_span）
+        self.spans = []
+
+    def to_dict(self):
+        return {"status": self.status, "outputs": self.outputs, "error": self.error, "error_node": self.error_node,
+                "steps": [{"node": n, "type": t, "start_ms": round((s - self.started) * 1000, 3),
+                           "ms": round((e - s) * 1000, 3)} for n, t, s, e in self.steps],
+                "item_errors": self.item_errors,
+                "elapsed_ms": round(self.elapsed * 1000, 3)}
+
+
+class _Context:
+    __slots__ = ("inputs", "result", "answers")
+
+    def __init__(self, inputs, result):
+        self.inputs = inputs
+        self.result = result
+        self.answers = []
+
+
+class Workflow:
+    """1 文書分の実行計画。run() は何度でも呼べる（実行ごとの状態は持たない）"""
+
+    def __init__(self, doc, stubs=None, transport=urllib_transport, trace=False):
+        try:
+            workflow = doc["workflow"]
+            graph = workflow["graph"]
+        except (KeyError, TypeError):
+            raise WorkflowError("document has no workflow.graph")
+        self.mode = (doc.get("app") or {}).get("mode")
+        self.stubs = stubs or Stubs()
+        self.transport = transport
+        self.trace = trace
+        self.nodes = {}
+        self.parent = parent = {}
+        for n in graph.get("nodes") or []:
+            nid = str(n["id"])
+            self.nodes[nid] = n.get("data") or {}
+            parent[nid] = n.get("parentId")
+        self.env = {v.get("name"): v.get("value") for v in workflow.get("environment_variables") or []}
+        self.conversation = {v.get("name"): v.get("value") for v in workflow.get("conversation_variables") or []}
+
+        # 同じスコープ内のエッジだけを後続として持つ（イテレーションの子同士 / トップレベル同士）
+        self.out = {nid: [] for nid in self.nodes}
+        self.indeg = indeg = dict.fromkeys(self.nodes, 0)
+        for e in graph.get("edges") or []:
+            src, tgt = str(e.get("source")), str(e.get("target"))
+            if src in self.nodes and tgt in self.nodes and parent[src] == parent[tgt]:
+                self.out[src].append((e.get("sourceHandle") or "source", tgt))
+                indeg[tgt] += 1
+        self.order = {}
+        self.roots = {}
+        for scope in {None, *(p for p in parent.values() if p is not None)}:
+            members = [nid for nid in self.nodes if parent[nid] == scope]
+            self.order[scope] = self._topological(members, indeg)
+            if scope is None:
+                self.roots[scope] = [nid for nid in members if self.nodes[nid].get("type") in START_TYPES]
+            else:
+                start = (self.nodes.get(scope) or {}).get("start_node_id")
+                self.roots[scope] = [start] if start in self.nodes else []
+        self.io_scopes = {scope: any(self.nodes[nid].get("type") in IO_TYPES for nid in order)
+                          for scope, order in self.order.items()}
+        self._code = {}
+        self._refs = {nid: self._references(data) for nid, data in self.nodes.items()} if trace else {}
+
+    def close(self):
+        """実行をまたいで持つリソースは無い（AsyncWorkflow はスレッドプールを閉じる）"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _topological(self, members, indeg):
+        pending = {nid: indeg[nid] for nid in members}
+        queue = deque(nid for nid in members if pending[nid] == 0)
+        order = []
+        while queue:
+            nid = queue.popleft()
+            order.append(nid)
+            for _, tgt in self.out[nid]:
+                pending[tgt] -= 1
+                if pending[tgt] == 0:
+                    queue.append(tgt)
+        if len(order) < len(members):
+            raise WorkflowError("graph has a cycle")
+        return order
+
+    # ── 実行 ──
+
+    def run(self, inputs=None, query=None, conversation=None, sys_vars=None):
+        ctx, pool = self._start(inputs, query, conversation, sys_vars)
+        try:
+            self._run_scope(None, pool, ctx)
+        except WorkflowError as e:
+            return self._finish(ctx, e)
+        return self._finish(ctx)
+
+    def _start(self, inputs, query, conversation, sys_vars):
+        """1 回の実行の (コンテキスト, 変数プール)"""
+        ctx = _Context(inputs or {}, RunResult())
+        conv = dict(self.conversation)
+        conv.update(conversation or {})
+        ctx.result.conversation = conv
+        pool = {
+            "sys": {"query": query, "files": [], "user_id": "local", "conversation_id": "",
+                    "dialogue_count": 0, "app_id": "", "workflow_id": "", "workflow_run_id": "",
+                    **(sys_vars or {})},
+            "env": self.env,
+            "conversation": conv,
+        }
+        ctx.result.started = time.perf_counter()
+        return ctx, pool
+
+    def _finish(self, ctx, error=None):
+        result = ctx.result
+        if error is not None:
+            result.status, result.error, result.error_node = "failed", str(error), error.node_id
+        elif self.mode == "advanced-chat":
+            result.outputs = {"answer": "".join(ctx.answers)}
+        result.elapsed = time.perf_counter() - result.started
+        return result
+
+    def _run_scope(self, scope, pool, ctx):
+        active = set(self.roots[scope])
+        for nid in self.order[scope]:
+            if nid not in active:
+                continue
+            handles = self._execute(nid, pool, ctx)
+            for handle, tgt in self.out[nid]:
+                if handles is None or handle in handles:
+                    active.add(tgt)
+
+    def _execute(self, nid, pool, ctx):
+        start = time.perf_counter()
+        try:
+            outputs, handles = self._call(nid, pool, ctx)
+        except WorkflowError as e:
+            if self.trace:
+                self._span(ctx, nid, pool, start, time.perf_counter(), error=e)
+            raise
+        pool[nid] = outputs
+        end = time.perf_counter()
+        ctx.result.steps.append((nid, self.nodes[nid].get("type"), start, end))
+        if self.trace:
+            self._span(ctx, nid, pool, start, end, outputs)
+        return handles
+
+    def _call(self, nid, pool, ctx):
+        """ノード 1 つを実行して (出力変数, 有効にする sourceHandle の集合 | None = すべて) を返す"""
+        data = self.nodes[nid]
+        ntype = data.get("type")
+        handler = getattr(self, "_run_" + str(ntype).replace("-", "_"), None)
+        if handler is None:
+            raise WorkflowError(f"unsupported node type {ntype!r}", nid)
+        try:
+            return handler(nid, data, pool, ctx)
+        except WorkflowError as e:
+            e.node_id = e.node_id or nid
+            raise
+        except Exception as e:
+            raise WorkflowError(f"{type(e).__name__}: {e}", nid) from e
+
+    # ── トレース ──
+
+    def _references(self, data):
+        """ノード定義が参照する変数のセレクター（入力のバイト数を数えるため）"""
+        refs = set()
+
+        def walk(value, key=None):
+            if isinstance(value, dict):
+                for k, v in value.items():
+                    if k != "output_selector":  # イテレーションの出力（子の変数）は入力ではない
+                        walk(v, k)
+            elif isinstance(value, list):
+                if (len(value) >= 2 and all(isinstance(v, str) for v in value)
+                        and (value[0] in self.nodes or value[0] in ("sys", "env", "conversation"))):
+                    refs.add(tuple(value))
+                else:
+                    for v in value:
+                        walk(v)
+            elif isinstance(value, str) and "{{#" in value:
+                refs.update(tuple(m.split(".")) for m in VARIABLE_REF.findall(value))
+        walk(data)
+        return sorted(refs)
+
+    @staticmethod
+    def _position(pool, scope):
+        return pool[scope].get("index") if scope is not None and isinstance(pool.get(scope), dict) else None
+
+    def _span(self, ctx, nid, pool, start, end, outputs=None, error=None):
+        scope = self.parent[nid]
+        data = self.nodes[nid]
+        ctx.result.spans.append({
+            "kind": "node", "node": nid, "type": data.get("type"), "title": data.get("title"), "scope": scope,
+            "item": self._position(pool, scope), "start": start, "end": end,
+            "status": "failed" if error else "succeeded", "error": str(error) if error else None,
+            "in_bytes": sum(byte_size(self.resolve(pool, ref)) for ref in self._refs[nid]),
+            "out_bytes": byte_size(outputs)})
+
+    def _item_span(self, ctx, nid, index, start, end, error=None):
+        ctx.result.spans.append({
+            "kind": "item", "node": nid, "type": "iteration", "title": self.nodes[nid].get("title"),
+            "scope": nid, "item": index, "start": start, "end": end,
+            "status": "failed" if error else "succeeded", "error": str(error) if error else None})
+
+    def _attempt_span(self, ctx, nid, pool, attempt, start, end, status_code=None, error=None):
+        scope = self.parent[nid]
+        ctx.result.spans.append({
+            "kind": "attempt", "node": nid, "type": self.nodes[nid].get("type"), "title": self.nodes[nid].get("title"),
+            "scope": scope, "item": self._position(pool, scope), "attempt": attempt, "start": start, "end": end,
+            "status": "failed" if error or status_code in RETRY_STATUS else "succeeded",
+            "status_code": status_code, "error": str(error) if error else None})
+
+    # ── 変数 ──
+
+    @staticmethod
+    def resolve(pool, selector):
+        if not selector:
+            return None
+        value = pool.get(str(selector[0]))
+        for key in selector[1:]:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    def render(self, text, pool):
+        """{{#node.var#}} 参照を展開する"""
+        if not isinstance(text, str) or "{{#" not in text:
+            return text
+        return VARIABLE_REF.sub(lambda m: to_text(self.resolve(pool, m.group(1).split("."))), text)
+
+    def _variables(self, data, pool):
+        return {v["variable"]: self.resolve(pool, v.get("value_selector")) for v in data.get("variables") or []}
+
+    # ── ノード ──
+
+    def _run_start(self, nid, data, pool, ctx):
+        values = {}
+        for var in data.get("variables") or []:
+            name = var.get("variable")
+            value = ctx.inputs.get(name)
+            if value in (None, "") and var.get("required"):
+                raise WorkflowError(f"input {name!r} is required")
+            if value not in (None, "") and var.get("type") == "number" and isinstance(value, str):
+                value = float(value) if "." in value else int(value)
+            values[name] = value
+        return values, None
+
+    def _compile_code(self, nid, data):
+        if data.get("code_language", "python3") != "python3":
+            raise WorkflowError(f"unsupported code language {data.get('code_language')!r}")
+        # モジュールレベルの状態（パターンのリストなど）はノードごとに持つので、exec は Workflow のノードごとに 1 回
+        namespace = {"__name__": f"code_{nid}"}
+        exec(compile_code(data.get("code") or ""), namespace)
+        main = namespace.get("main")
+        if not callable(main):
+            raise WorkflowError("code does not define main()")
+        return main
+
+    def _run_code(self, nid, data, pool, ctx):
+        main = self._code.get(nid)
+        if main is None:
+            main = self._code[nid] = self._compile_code(nid, data)
+        result = main(**self._variables(data, pool))
+        if not isinstance(result, dict):
+            raise WorkflowError(f"main() must return a dict, got {type(result).__name__}")
+        declared = data.get("outputs") or {}
+        if not declared:
+            return result, None
+        outputs = {}
+        for name, spec in declared.items():
+            if name not in result:
+                raise WorkflowError(f"output {name!r} is missing from main() result")
+            _check_output(name, result[name], (spec or {}).get("type"))
+            outputs[name] = result[name]
+        return outputs, None
+
+    def _conditions_met(self, conditions, logical_operator, pool):
+        def met(c):
+            if "comparison_operator" not in c and "conditions" in c:  # 入れ子の条件グループ
+                return self._conditions_met(c["conditions"], c.get("logical_operator", "and"), pool)
+            return _compare(c.get("comparison_operator"), self.resolve(pool, c.get("variable_selector")),
+                            self.render(c.get("value"), pool))
+        results = map(met, conditions)
+        return any(results) if logical_operator == "or" else all(results)
+
+    def _run_if_else(self, nid, data, pool, ctx):
+        cases = data.get("cases")
+        if cases is None:  # 旧形式: conditions + logical_operator、ハンドルは true / false
+            cases = [{"case_id": "true", "conditions": data.get("conditions") or [],
+                      "logical_operator": data.get("logical_operator", "and")}]
+        for case in cases:
+            if self._conditions_met(case.get("conditions") or [], case.get("logical_operator", "and"), pool):
+                return {"result": True, "selected_case_id": case.get("case_id")}, {case.get("case_id")}
+        return {"result": False, "selected_case_id": "false"}, {"false"}
+
+    def _run_template_transform(self, nid, data, pool, ctx):
+        try:
+            render = TEMPLATES.compile(data.get("template") or "")
+        except TemplateError as e:
+            raise WorkflowError(str(e))
+        return {"output": render(self._variables(data, pool))}, None
+
+    def _run_variable_aggregator(self, nid, data, pool, ctx):
+        def first(selectors):
+            for selector in selectors or []:
+                value = self.resolve(pool, selector)
+                if value is not None:
+                    return value
+            return None
+        settings = data.get("advanced_settings") or {}
+        if settings.get("group_enabled"):
+            return {g["group_name"]: {"output": first(g.get("variables"))} for g in settings.get("groups") or []}, None
+        return {"output": first(data.get("variables"))}, None
+
+    def _run_iteration(self, nid, data, pool, ctx):
+        items = self.resolve(pool, data.get("iterator_selector"))
+        if not isinstance(items, list):
+            raise WorkflowError(f"iterator variable must be a list, got {type(items).__name__}")
+        workers, mode = iteration_settings(data)
+
+        def run_item(index):
+            local = ChainMap({nid: {"item": items[index], "index": index}}, pool)
+            start = time.perf_counter()
+            try:
+                self._run_scope(nid, local, ctx)
+            except WorkflowError as e:
+                if self.trace:
+                    self._item_span(ctx, nid, index, start, time.perf_counter(), e)
+                if mode == TERMINATED:
+                    raise
+                return None, e
+            if self.trace:
+                self._item_span(ctx, nid, index, start, time.perf_counter())
+            return self.resolve(local, data.get("output_selector")), None
+
+        # 子がすべて CPU 処理ならスレッドにしても GIL で速くならないので順に実行する
+        if workers > 1 and len(items) > 1 and self.io_scopes.get(nid):
+            with ThreadPoolExecutor(min(workers, len(items)), thread_name_prefix=f"iteration-{nid}") as executor:
+                futures = [executor.submit(run_item, i) for i in range(len(items))]
+                try:
+                    outcomes = [f.result() for f in futures]
+                except WorkflowError:
+                    for f in futures:
+                        f.cancel()
+                    raise
+        else:
+            outcomes = [run_item(i) for i in range(len(items))]
+        return {"output": collect_items(nid, outcomes, mode, ctx.result)}, None
+
+    def _run_http_request(self, nid, data, pool, ctx):
+        url = self.render(data.get("url") or "", pool)
+        headers = _kv_lines(self.render(data.get("headers") or "", pool))
+        params = _kv_lines(self.render(data.get("params") or "", pool))
+        if params:
+            url += ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+        auth = data.get("authorization") or {}
+        if auth.get("type") == "api-key":
+            config = auth.get("config") or {}
+            key = self.render(config.get("api_key") or "", pool)
+            if key:
+                kind = config.get("type", "bearer")
+                if kind == "custom":
+                    headers[config.get("header") or "Authorization"] = key
+                else:
+                    headers["Authorization"] = f"{'Basic' if kind == 'basic' else 'Bearer'} {key}"
+
+        body = data.get("body") or {}
+        btype, raw = body.get("type", "none"), body.get("data")
+        if isinstance(raw, list):  # 新形式: [{"type", "key", "value"}]
+            pairs = {self.render(p.get("key") or "", pool): self.render(p.get("value") or "", pool) for p in raw}
+            text = "".join(pairs.values()) if btype in ("json", "raw-text") else None
+        else:
+            text = self.render(raw or "", pool)
+            pairs = _kv_lines(text)
+        payload = None
+        if btype == "json":
+            payload = text.encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif btype == "raw-text":
+            payload = text.encode("utf-8")
+            headers.setdefault("Content-Type", "text/plain")
+        elif btype in ("x-www-form-urlencoded", "form-data"):
+            payload = urllib.parse.urlencode(pairs).encode("utf-8")
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+
+        request = {"method": str(data.get("method", "get")).upper(), "url": url, "headers": headers,
+                   "body": payload, "timeout": http_timeout(data), "node_id": nid}
+        retries, interval = retry_settings(data)
+        for attempt in range(retries + 1):
+            if attempt and interval:
+                time.sleep(interval)
+            start = time.perf_counter()
+            try:
+                response = self.transport(request)
+            except (OSError, urllib.error.URLError) as e:
+                if self.trace:
+                    self._attempt_span(ctx, nid, pool, attempt, start, time.perf_counter(), error=e)
+                # 再送しても結果の変わらない失敗（記録の無い再生など、retryable = False）はすぐに失敗させる
+                if attempt == retries or not getattr(e, "retryable", True):
+                    raise WorkflowError(f"HTTP request failed: {e}")
+                continue
+            if self.trace:
+                self._attempt_span(ctx, nid, pool, attempt, start, time.perf_counter(), response.get("status_code"))
+            if response.get("status_code") not in RETRY_STATUS:
+                break
+        content = response.get("body")
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", "replace")
+        return {"status_code": response.get("status_code"), "body": content,
+                "headers": dict(response.get("headers") or {}), "files": []}, None
+
+    def _run_llm(self, nid, data, pool, ctx):
+        prompts = data.get("prompt_template") or []
+        if isinstance(prompts, dict):  # completion モード
+            prompts = [{"role": "user", "text": prompts.get("text", "")}]
+        context = ""
+        if (data.get("context") or {}).get("enabled"):
+            value = self.resolve(pool, data["context"].get("variable_selector"))
+            if isinstance(value, list):
+                value = "\n".join(v.get("content", "") if isinstance(v, dict) else to_text(v) for v in value)
+            context = to_text(value)
+        messages = [{"role": p.get("role", "user"),
+                     "text": self.render(p.get("text") or "", pool).replace("{{#context#}}", context)}
+                    for p in prompts]
+        outputs = dict(self.stubs.llm(nid, data, messages))
+        outputs.setdefault("text", "")
+        return outputs, None
+
+    def _query(self, data, pool):
+        selector = data.get("query_variable_selector") or data.get("query")
+        return self.resolve(pool, selector) if isinstance(selector, list) else None
+
+    def _run_knowledge_retrieval(self, nid, data, pool, ctx):
+        return {"result": list(self.stubs.knowledge_retrieval(nid, data, self._query(data, pool)))}, None
+
+    def _run_question_classifier(self, nid, data, pool, ctx):
+        class_id = self.stubs.question_classifier(nid, data, self._query(data, pool))
+        names = {c.get("id"): c.get("name") for c in data.get("classes") or []}
+        if class_id not in names:
+            raise WorkflowError(f"classifier returned unknown class {class_id!r}")
+        return {"class_name": names[class_id], "class_id": class_id}, {class_id}
+
+    def _run_parameter_extractor(self, nid, data, pool, ctx):
+        values = dict(self.stubs.parameter_extractor(nid, data, self._query(data, pool)))
+        return {**values, "__is_success": 1, "__reason": ""}, None
+
+    def _run_variable_assigner(self, nid, data, pool, ctx):
+        target = data.get("assigned_variable_selector") or []
+        items = data.get("input")
+        if items is None:
+            items = [{"variable_selector": data.get("input_variable_selector"),
+                      "write_mode": data.get("write_mode", "over-write")}]
+        if len(target) < 2 or not isinstance(pool.get(target[0]), dict):
+            raise WorkflowError(f"cannot assign to {target!r}")
+        scope = pool[target[0]]
+        for item in items:
+            value = self.resolve(pool, item.get("variable_selector"))
+            mode = item.get("write_mode", "over-write")
+            if mode == "append":
+                scope[target[1]] = list(scope.get(target[1]) or []) + [value]
+            elif mode == "clear":
+                scope[target[1]] = None
+            else:
+                scope[target[1]] = value
+        return {}, None
+
+    def _run_end(self, nid, data, pool, ctx):
+        outputs = {o["variable"]: self.resolve(pool, o.get("value_selector")) for o in data.get("outputs") or []}
+        ctx.result.outputs.update(outputs)
+        return outputs, None
+
+    def _run_answer(self, nid, data, pool, ctx):
+        text = self.render(data.get("answer") or "", pool)
+        ctx.answers.append(text)
+        return {"answer": text}, None
+
+
+# ── コーパス実行 ──
+
+SAMPLE_TEXT = "これは動作確認用のサンプル入力です。内容を確認して処理してください。"
+
+
+def sample_inputs(doc):
+    """Start ノードの変数定義から、検証を通る程度の合成入力を作る"""
+    inputs = {}
+    for node in doc["workflow"]["graph"].get("nodes") or []:
+        data = node.get("data") or {}
+        if data.get("type") not in START_TYPES or node.get("parentId"):
+            continue
+        for var in data.get("variables") or []:
+            vtype, limit = var.get("type"), var.get("max_length") or 200
+            if vtype == "select":
+                value = (var.get("options") or [""])[0]
+            elif vtype == "number":
+                value = 1
+            else:
+                value = (SAMPLE_TEXT * 8)[:min(limit, 200 if vtype == "paragraph" else 40)]
+            inputs[var.get("variable")] = value
+    return inputs
+
+
+def run_corpus(paths=None, repeat=1, stubs=None, transport=offline_transport):
+    """[(path, RunResult)] と 1 実行あたりの平均秒数を返す"""
+    corpus = dsl_corpus.load_corpus(paths)
+    results, total_runs, total_time = [], 0, 0.0
+    for path, doc in corpus.items():
+        try:
+            workflow = Workflow(doc, stubs=stubs, transport=transport)
+        except WorkflowError as e:
+            result = RunResult()
+            result.status, result.error = "failed", str(e)
+            results.append((path, result))
+            continue
+        inputs = sample_inputs(doc)
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            result = workflow.run(inputs, query=SAMPLE_TEXT)
+        total_time += time.perf_counter() - t0
+        total_runs += repeat
+        results.append((path, result))
+    for path, error in corpus.errors.items():
+        result = RunResult()
+        result.status, result.error = "failed", error
+        results.append((path, result))
+    return results, total_runs, total_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="実行する .yml（--corpus では省略時に全コーパス）")
+    parser.add_argument("--input", action="append", default=[], metavar="NAME=VALUE", help="Start 変数（複数指定可）")
+    parser.add_argument("--inputs", help="Start 変数の JSON")
+    parser.add_argument("--query", help="sys.query（チャットフロー）")
+    parser.add_argument("--offline", action="store_true", help="HTTP を送信せず 200 / {} を返す")
+    parser.add_argument("--corpus", action="store_true", help="合成入力・スタブ・オフライン HTTP でまとめて実行する")
+    parser.add_argument("-n", "--repeat", type=int, default=1, help="--corpus で 1 ワークフローあたりの実行回数")
+    args = parser.parse_args()
+
+    if args.corpus:
+        results, runs, seconds = run_corpus(args.paths or None, args.repeat)
+        failed = [(p, r) for p, r in results if r.status != "succeeded"]
+        for path, r in failed:
+            where = f" at {r.error_node} ({r.error_node and _node_type(path, r.error_node)})" if r.error_node else ""
+            print(f"  FAIL {os.path.relpath(path, ROOT_DIR)}{where}: {r.error}")
+        steps = Counter(step[1] for _, r in results for step in r.steps)
+        print(f"\n{len(results) - len(failed)}/{len(results)} workflows succeeded; "
+              f"{runs} runs in {seconds:.2f}s ({runs / seconds if seconds else 0:,.0f} runs/s)")
+        print("node executions (last run): " + ", ".join(f"{t} {n}" for t, n in steps.most_common()))
+        cache = TEMPLATES.info()
+        print(f"template cache: {cache['size']} compiled, {cache['hits']:,} hits / {cache['misses']} misses "
+              f"(hit rate {cache['hit_rate']:.1%}, {cache['evictions']} evictions)")
+        sys.exit(1 if failed else 0)
+
+    if len(args.paths) != 1:
+        parser.error("specify one workflow file (or --corpus)")
+    inputs = json.loads(args.inputs) if args.inputs else {}
+    for item in args.input:
+        name, _, value = item.partition("=")
+        inputs[name] = value
+    doc, error = dsl_corpus.parse_file(args.paths[0])
+    if error:
+        sys.exit(error)
+    transport = offline_transport if args.offline else urllib_transport
+    result = Workflow(doc, transport=transport).run(inputs, query=args.query)
+    print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    sys.exit(0 if result.status == "succeeded" else 1)
+
+
+def _node_type(path, node_id):
+    doc, _ = dsl_corpus.parse_file(path)
+    for node in doc["workflow"]["graph"]["nodes"]:
+        if str(node["id"]) == node_id:
+            return node["data"].get("type")
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+DSL の静的レイテンシ見積もり（クリティカルパスの p50 / p95）
+
+ワークフローを実行せず、グラフの構造とノードの設定からレイテンシの分布を見積もる。
+ノード種別ごとのコストモデル（既定は DEFAULT_MODEL、--model の JSON で上書き）から各ノードの
+所要時間をモンテカルロ法で samples 回引き、1 回ごとにグラフ上の最長経路（Dify と同じく並列ブランチは
+同時に進み、合流ノードはすべての入力を待つ）を求めて、その分布の p50 / p95 を出す。
+
+  llm                 TTFT + 出力トークン数 / トークン毎秒（モデル名ごとのプロファイル、既定は
+                      dsl_llm_server.PROFILES）。出力トークン数は max_tokens × 充填率（対数正規）で max_tokens が上限
+  question-classifier / parameter-extractor  同じ LLM モデルで出力トークン数が固定（抽出はパラメータ数に比例）
+  http-request        応答時間（対数正規）。failure_rate の確率で失敗し、タイムアウト（timeout.read）まで待ってから
+                      retry_interval 後に再送する（retry / retry_config の max_retries 回まで）
+  iteration           子グラフの最長経路を items 件分引き、parallel_nums 個の枠に順に割り当てたときの完了時刻
+                      （並列モードでなければ項目の合計）
+  if-else / question-classifier の分岐はすべて候補とし、最も遅い分岐をクリティカルパスとする
+
+クリティカルパスとして表示するノードは、各ノードの所要時間の中央値で求めた最長経路上のもの。
+全コーパスを 1 つの表にまとめ、p95 の大きい順（構造を見直す優先度の順）に並べる。
+
+  python dsl_latency.py                              # 全コーパス（catalog/ industry/ samples/）
+  python dsl_latency.py industry/banking/*.yml --detail
+  python dsl_latency.py --top 20 --format json -j 0
+  python dsl_latency.py --dump-model > model.json    # 既定のコストモデルを書き出して編集し --model で渡す
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_interpreter import Workflow, WorkflowError, http_timeout, iteration_settings, retry_settings
+from dsl_llm_server import PROFILES, Z95
+
+SAMPLES = 1000
+SEED = 0
+
+# 秒。[中央値, 95 パーセンタイル] は対数正規分布、数値は固定
+DEFAULT_MODEL = {
+    "llm": {
+        "profiles": {name: {"ttft": list(p["ttft"]), "tps": list(p["tps"])}
+                     for name, p in PROFILES.items() if name != "instant"},
+        "default_profile": "gpt-4o",
+        "default_max_tokens": 4096,
+        "fill": [0.15, 0.6],                 # 出力トークン数 / max_tokens
+    },
+    "question-classifier": {"output_tokens": 16},
+    "parameter-extractor": {"output_tokens_per_parameter": 40},
+    "knowledge-retrieval": [0.4, 1.2],
+    "http-request": {"latency": [0.3, 1.5], "failure_rate": 0.02},
+    "iteration": {"items": 10, "overhead": [0.005, 0.02]},
+    "code": [0.03, 0.15],                    # サンドボックスの往復
+    "template-transform": [0.005, 0.03],
+    "default": [0.001, 0.005],               # start / end / if-else / variable-aggregator など
+}
+
+
+def load_model(path=None):
+    """DEFAULT_MODEL に JSON ファイルの内容を（dict は再帰的に）上書きしたもの"""
+    def merge(base, override):
+        if not isinstance(base, dict) or not isinstance(override, dict):
+            return override
+        return {**base, **{k: merge(base.get(k), v) for k, v in override.items()}}
+    model = json.loads(json.dumps(DEFAULT_MODEL))
+    if path:
+        with open(path, encoding="utf-8") as f:
+            model = merge(model, json.load(f))
+    return model
+
+
+def sampler(spec, z=Z95):
+    """
+    spec: 数値（固定）または [中央値, 裾]（裾は 95 パーセンタイル。z を負にすると 5 パーセンタイル）。
+    乱数生成器を受け取って 1 回分の値を返す関数にする（対数正規分布のパラメータはここで 1 回だけ計算する）
+    """
+    if not isinstance(spec, (list, tuple)):
+        value = float(spec)
+        return lambda rng: value
+    median, tail = spec
+    if median <= 0:
+        return lambda rng: 0.0
+    mu, sigma = math.log(median), (math.log(tail / median) / z if tail > 0 else 0.0)
+    if sigma <= 0:
+        return lambda rng: median
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class Estimator:
+    """1 文書分のグラフ（dsl_interpreter.Workflow の実行計画）とノードごとのコスト関数"""
+
+    def __init__(self, doc, model):
+        self.graph = Workflow(doc)
+        self.model = model
+        self.preds = {nid: [] for nid in self.graph.nodes}
+        for src, edges in self.graph.out.items():
+            for _, tgt in edges:
+                self.preds[tgt].append(src)
+        self.members = {scope: self._reachable(scope) for scope in self.graph.order}
+        self.cost = {nid: self._cost_function(data) for nid, data in self.graph.nodes.items()}
+
+    def _reachable(self, scope):
+        """ルートから（すべての分岐をたどって）到達できるノードをトポロジカル順に"""
+        reached = set(self.graph.roots[scope])
+        for nid in self.graph.order[scope]:
+            if nid in reached:
+                reached.update(tgt for _, tgt in self.graph.out[nid])
+        return [nid for nid in self.graph.order[scope] if nid in reached]
+
+    # ── ノードごとのコスト ──
+
+    def _llm(self, data, output_tokens=None):
+        config = self.model["llm"]
+        model = data.get("model") or {}
+        profile = config["profiles"].get(model.get("name")) or config["profiles"][config["default_profile"]]
+        ttft = sampler(profile["ttft"])
+        tps = sampler(profile["tps"], -Z95)   # トークン毎秒は [中央値, 5 パーセンタイル]（遅い側が裾）
+        if output_tokens is None:
+            params = model.get("completion_params") or {}
+            max_tokens = params.get("max_tokens") or config["default_max_tokens"]
+            fill = sampler(config["fill"])
+            tokens = lambda rng: max_tokens * min(1.0, fill(rng))
+        else:
+            tokens = lambda rng: output_tokens
+
+        def cost(rng):
+            rate = tps(rng)
+            return ttft(rng) + (tokens(rng) / rate if rate > 0 else 0.0)
+        return cost
+
+    def _http(self, data):
+        config = self.model["http-request"]
+        retries, interval = retry_settings(data)
+        timeout = http_timeout(data)
+        latency, failure = sampler(config["latency"]), config["failure_rate"]
+
+        def cost(rng):
+            total = 0.0
+            for attempt in range(retries + 1):
+                if attempt:
+                    total += interval
+                if rng.random() >= failure:
+                    return total + min(latency(rng), timeout)
+                total += timeout   # 失敗はタイムアウトまで待ったとみなす
+            return total
+        return cost
+
+    def _cost_function(self, data):
+        ntype = data.get("type")
+        model = self.model
+        if ntype == "llm":
+            return self._llm(data)
+        if ntype == "question-classifier":
+            return self._llm(data, model["question-classifier"]["output_tokens"])
+        if ntype == "parameter-extractor":
+            count = max(1, len(data.get("parameters") or []))
+            return self._llm(data, model["parameter-extractor"]["output_tokens_per_parameter"] * count)
+        if ntype == "http-request":
+            return self._http(data)
+        if ntype == "iteration":
+            return sampler(model["iteration"]["overhead"])
+        return sampler(model.get(ntype, model["default"]))
+
+    # ── 最長経路 ──
+
+    def sample(self, rng, scope=None, durations=None):
+        """1 回分の所要時間を引いて scope の最長経路の長さを返す（durations にノードごとの所要時間を追記する）"""
+        finish = {}
+        for nid in self.members[scope]:
+            start = max((finish[p] for p in self.preds[nid] if p in finish), default=0.0)
+            if self.graph.nodes[nid].get("type") == "iteration":
+                took = self._iteration(rng, nid, durations)
+            else:
+                took = self.cost[nid](rng)
+            if durations is not None:
+                durations.setdefault(nid, []).append(took)
+            finish[nid] = start + took
+        return max(finish.values(), default=0.0)
+
+    def _iteration(self, rng, nid, durations):
+        workers, _ = iteration_settings(self.graph.nodes[nid])
+        items = self.model["iteration"]["items"]
+        slots = [0.0] * min(workers, items)
+        for _ in range(items):
+            free = heapq.heappop(slots)
+            heapq.heappush(slots, free + self.sample(rng, nid, durations))
+        return max(slots, default=0.0) + self.cost[nid](rng)
+
+    def critical_path(self, medians, scope=None):
+        """ノードごとの所要時間の中央値で求めた最長経路 [(ノード ID, 子の経路 | None)]"""
+        finish, via = {}, {}
+        for nid in self.members[scope]:
+            ran = [p for p in self.preds[nid] if p in finish]
+            best = max(ran, key=finish.get, default=None)
+            finish[nid] = (finish[best] if best else 0.0) + medians.get(nid, 0.0)
+            via[nid] = best
+        if not finish:
+            return []
+        path, nid = [], max(finish, key=finish.get)
+        while nid is not None:
+            inner = self.critical_path(medians, nid) if self.graph.nodes[nid].get("type") == "iteration" else None
+            path.append((nid, inner))
+            nid = via[nid]
+        return path[::-1]
+
+
+def estimate(doc, model, samples=SAMPLES, seed=SEED):
+    """{"p50", "p95", "nodes", "path": [{"node", "type", "title", "p50", "p95", "path"?}]}（秒）"""
+    est = Estimator(doc, model)
+    rng = random.Random(seed)
+    durations = {}
+    totals = [est.sample(rng, None, durations) for _ in range(samples)]
+    medians = {nid: percentile(values, 0.5) for nid, values in durations.items()}
+
+    def describe(path):
+        out = []
+        for nid, inner in path:
+            data = est.graph.nodes[nid]
+            entry = {"node": nid, "type": data.get("type"), "title": data.get("title"),
+                     "p50": round(medians.get(nid, 0.0), 3), "p95": round(percentile(durations.get(nid, ()), 0.95), 3)}
+            if inner:
+                entry["path"] = describe(inner)
+            out.append(entry)
+        return out
+    return {"p50": round(percentile(totals, 0.5), 3), "p95": round(percentile(totals, 0.95), 3),
+            "nodes": len(est.graph.nodes), "path": describe(est.critical_path(medians))}
+
+
+def _estimate_item(item):
+    path, doc, error, model, samples, seed = item
+    if error is not None:
+        return path, {"error": error}
+    try:
+        # ファイルごとに乱数列を固定する（並列数や処理順によらず同じ結果）
+        return path, estimate(doc, model, samples, seed ^ zlib.crc32(os.path.relpath(path, ROOT_DIR).encode()))
+    except WorkflowError as e:
+        return path, {"error": str(e)}
+
+
+def estimate_corpus(paths=None, model=None, samples=SAMPLES, seed=SEED, workers=1):
+    """[(path, 見積もり)] を p95 の大きい順に返す（エラーは末尾）"""
+    model = model or load_model()
+    corpus = dsl_corpus.load_corpus(paths, workers=workers)
+    items = ([(p, d, None, model, samples, seed) for p, d in corpus.items()]
+             + [(p, None, e, model, samples, seed) for p, e in corpus.errors.items()])
+    workers = min(os.cpu_count() or 1, len(items)) if workers is None or workers <= 0 else workers
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_estimate_item, items, chunksize=max(1, len(items) // (workers * 4))))
+    else:
+        results = [_estimate_item(item) for item in items]
+    results.sort(key=lambda r: (-r[1].get("p95", -1), r[0]))
+    return results
+
+
+def _path_text(path):
+    parts = []
+    for step in path:
+        if step["type"] in ("start", "end", "answer"):
+            continue
+        text = f"{step['title'] or step['node']}({step['type']} {step['p50']:.1f}s)"
+        if step.get("path"):
+            text += " [" + _path_text(step["path"]) + "]"
+        parts.append(text)
+    return " → ".join(parts)
+
+
+def _print_detail(path, indent="      "):
+    for step in path:
+        print(f"{indent}{step['p50']:8.2f}s {step['p95']:8.2f}s  {step['type']:<20} {step['title'] or ''} ({step['node']})")
+        if step.get("path"):
+            print(f"{indent}  iteration item:")
+            _print_detail(step["path"], indent + "    ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="見積もる .yml（省略時は全コーパス）")
+    parser.add_argument("--model", help="コストモデルの JSON（DEFAULT_MODEL に上書き）")
+    parser.add_argument("--dump-model", action="store_true", help="コストモデル（--model 適用後）を JSON で表示して終了")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help=f"モンテカルロの試行回数（既定 {SAMPLES}）")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--top", type=int, help="上位 N 件だけ表示する")
+    parser.add_argument("--detail", action="store_true", help="クリティカルパスのノードを 1 行ずつ表示する")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="並列数（0 = CPU コア数、1 = シリアル）")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    if args.dump_model:
+        json.dump(model, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    results = estimate_corpus(args.paths or None, model, args.samples, args.seed, args.workers)
+    errors = [(p, r) for p, r in results if "error" in r]
+    ranked = [(p, r) for p, r in results if "error" not in r][:args.top]
+
+    if args.format == "json":
+        json.dump({"model": model, "samples": args.samples,
+                   "workflows": [{"path": os.path.relpath(p, ROOT_DIR), **r} for p, r in ranked + errors]},
+                  sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        print(f"{'p50':>8} {'p95':>8} {'nodes':>5}  workflow")
+        for path, r in ranked:
+            print(f"{r['p50']:7.1f}s {r['p95']:7.1f}s {r['nodes']:5d}  {os.path.relpath(path, ROOT_DIR)}")
+            if args.detail:
+                _print_detail(r["path"])
+            else:
+                print(f"{'':24}{_path_text(r['path'])}")
+        for path, r in errors:
+            print(f"{'-':>8} {'-':>8} {'-':>5}  {os.path.relpath(path, ROOT_DIR)}: {r['error']}")
+        on_path = Counter()
+        for _, r in results:
+            for step in r.get("path", ()):
+                on_path[step["type"]] += step["p50"]
+        total = sum(on_path.values())
+        print(f"\n{len(results) - len(errors)} workflows estimated ({args.samples} samples each), {len(errors)} errors")
+        if total:
+            print("critical-path time by node type (top level, p50): "
+                  + ", ".join(f"{t} {s / total:.0%}" for t, s in on_path.most_common(6)))
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+OpenAI 互換のローカル LLM スタンドイン（chat completions サーバー）
+
+ネットワークなしで Dify（provider: openai / openai_api_compatible）や dsl_interpreter から
+LLM ノードを負荷試験するためのサーバー。標準ライブラリ（http.server）だけで動く。
+
+  POST /v1/chat/completions   stream: true なら SSE（data: {...} … data: [DONE]）
+  GET  /v1/models
+  GET  /metrics               リクエスト数・トークン数・実測 TTFT など
+
+応答は決定的で、リクエスト（model + messages）のハッシュだけで決まる。内容はシステムプロンプトの
+出力形式（「## 出力」「## 出力フォーマット」などの節）をなぞって作る:
+  見出し・箇条書きはそのまま、表はヘッダーを保ってデータ行を埋め、「高/中/低」のような選択肢は
+  1 つを選ぶ（リスクレベル行など）。JSON 形式を求めるプロンプト（または response_format: json_object）には
+  プロンプト中の JSON の例をそのまま返す。max_tokens で打ち切る。
+
+待ち時間はプロファイル（初回トークンまでの時間 TTFT と トークン/秒 の対数正規分布）で決まる。
+  instant      待ちなし（既定）
+  gpt-4o-mini  TTFT p50 0.35s / p95 0.9s、p50 90 tok/s / p5 45 tok/s
+  gpt-4o       TTFT p50 0.5s / p95 1.4s、p50 60 tok/s / p5 30 tok/s
+  slow         TTFT p50 1.5s / p95 4.0s、p50 25 tok/s / p5 10 tok/s
+（数値は目安。--ttft / --tps で上書きできる）
+
+  python dsl_llm_server.py --port 8089 --profile gpt-4o-mini
+  python dsl_llm_server.py --profile gpt-4o-mini --bench 200 -c 20      # サーバーを起動して負荷試験
+  python dsl_batch.py WORKFLOW INPUT -o OUT --stubs dsl_llm_server:ServerStubs   # LLM_SERVER_URL で接続先を指定
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+from dsl_interpreter import Stubs
+
+DEFAULT_PORT = 8089
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}/v1"
+DEFAULT_BACKLOG = 128  # listen() の待ち行列。socketserver の既定 5 では同時接続が多いと接続がリセットされる
+
+PROFILES = {
+    "instant": {"ttft": (0.0, 0.0), "tps": (0.0, 0.0)},
+    "gpt-4o-mini": {"ttft": (0.35, 0.9), "tps": (90.0, 45.0)},
+    "gpt-4o": {"ttft": (0.5, 1.4), "tps": (60.0, 30.0)},
+    "slow": {"ttft": (1.5, 4.0), "tps": (25.0, 10.0)},
+}
+Z95 = 1.6449  # 標準正規分布の 95 パーセンタイル
+
+TOKEN = re.compile(r"\s*[A-Za-z0-9_]+|\s*[^\sA-Za-z0-9_]|\s+")
+OUTPUT_HEADING = re.compile(r"^(#{1,4})\s*.*(出力|フォーマット|形式|output|format)", re.I)
+HEADING = re.compile(r"^(#{1,6})\s")
+CHOICES = re.compile(r"[^\s|/／（）()「」:：,、]+(?:\s*[/／]\s*[^\s|/／（）()「」:：,、]+)+")
+# 表のセル全体・「ラベル: 」の値全体が（説明）や … になっている箇所
+PLACEHOLDER = re.compile(r"(^|[|:：]\s*)([（(][^）)]*[）)]|\.\.\.|…)(?=\s*(\||$))")
+
+
+def tokenize(text):
+    return TOKEN.findall(text)
+
+
+# ── 応答の生成 ──
+
+def _json_example(text):
+    """プロンプト中で最初に見つかる、解析できる JSON オブジェクトの例"""
+    for start in (m.start() for m in re.finditer(r"\{", text)):
+        depth = 0
+        for i in range(start, len(text)):
+            depth += {"{": 1, "}": -1}.get(text[i], 0)
+            if depth == 0:
+                try:
+                    return json.loads(text[start:i + 1])
+                except ValueError:
+                    break
+    return None
+
+
+def _output_section(system):
+    """システムプロンプトの出力形式の節（見つからなければ None）"""
+    lines = system.splitlines()
+    for i, line in enumerate(lines):
+        m = OUTPUT_HEADING.match(line)
+        if m:
+            level, body = len(m.group(1)), []
+            for rest in lines[i + 1:]:
+                h = HEADING.match(rest)
+                if h and len(h.group(1)) <= level:
+                    break
+                body.append(rest)
+            return body
+    return None
+
+
+def _fill(line, rng):
+    line = CHOICES.sub(lambda m: rng.choice(re.split(r"\s*[/／]\s*", m.group(0))), line)
+    return PLACEHOLDER.sub(lambda m: m.group(1) + rng.choice(["要確認", "概ね良好", "対応が必要", "特記事項なし"]), line)
+
+
+def _table(header, rows, rng):
+    cells = [c.strip() for c in header.strip().strip("|").split("|")]
+    out = [header.strip(), "|" + "|".join("---" for _ in cells) + "|"]
+    if rows:
+        out += [_fill(r, rng) for r in rows]
+    else:
+        for n in range(1, 4):
+            out.append("| " + " | ".join(f"{c}{n}" if c not in ("#", "No", "No.") else str(n) for c in cells) + " |")
+    return out
+
+
+def shape_response(messages, model="", json_mode=False):
+    """messages（OpenAI 形式）に対する決定的な応答本文"""
+    digest = hashlib.sha256(json.dumps([model, messages], ensure_ascii=False, sort_keys=True).encode()).digest()
+    rng = random.Random(digest)
+    system = "\n".join(_content(m) for m in messages if m.get("role") == "system")
+    user = _content(messages[-1]) if messages else ""
+
+    if json_mode or re.search(r"JSON(形式| format| object)", system, re.I):
+        example = _json_example(system)
+        return json.dumps(example if example is not None else {"result": user[:80]}, ensure_ascii=False)
+
+    section = _output_section(system)
+    if not section or not any(l.strip() for l in section):
+        summary = re.sub(r"\s+", " ", user)[:120]
+        return f"ご依頼の内容を確認しました。\n\n## 回答\n{summary}\n\n- 要点を整理して回答しました。"
+
+    out, i = [], 0
+    while i < len(section):
+        line = section[i]
+        if line.lstrip().startswith("|"):
+            header, rows, i = line, [], i + 1
+            while i < len(section) and section[i].lstrip().startswith("|"):
+                if not re.fullmatch(r"\s*\|[\s|:-]+\|\s*", section[i]):
+                    rows.append(section[i])
+                i += 1
+            out += _table(header, rows, rng)
+            continue
+        out.append(_fill(line, rng))
+        i += 1
+    return "\n".join(out).strip()
+
+
+def _content(message):
+    content = message.get("content")
+    if isinstance(content, list):  # [{"type": "text", "text": ...}]
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+# ── 待ち時間 ──
+
+class Latency:
+    """TTFT（秒）とトークン/秒を対数正規分布から引く"""
+
+    def __init__(self, ttft=(0.0, 0.0), tps=(0.0, 0.0), seed=None):
+        self.ttft, self.tps = ttft, tps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lognormal(rng, median, tail):
+        """median と tail（95 パーセンタイル。tps では 5 パーセンタイル）を満たす対数正規分布"""
+        if median <= 0:
+            return 0.0
+        sigma = abs(math.log(tail / median)) / Z95 if tail > 0 else 0.0
+        return rng.lognormvariate(math.log(median), sigma)
+
+    def sample(self):
+        """(TTFT 秒, 1 トークンあたりの秒数)"""
+        with self._lock:
+            ttft = self._lognormal(self._rng, *self.ttft)
+            tps = self._lognormal(self._rng, *self.tps)
+        return ttft, (1.0 / tps if tps > 0 else 0.0)
+
+
+# ── サーバー ──
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = self.streamed = self.prompt_tokens = self.completion_tokens = 0
+        self.ttft = []
+
+    def add(self, prompt_tokens, completion_tokens, ttft, stream):
+        with self.lock:
+            self.requests += 1
+            self.streamed += stream
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.ttft.append(ttft)
+            del self.ttft[:-10000]
+
+    def snapshot(self):
+        with self.lock:
+            ttft = sorted(self.ttft)
+            pct = lambda q: round(ttft[min(len(ttft) - 1, int(q * len(ttft)))], 4) if ttft else None
+            return {"requests": self.requests, "streamed": self.streamed, "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": self.completion_tokens, "ttft_p50": pct(0.5), "ttft_p95": pct(0.95)}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "dsl-llm-server/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._json(status, {"error": {"message": message, "type": "invalid_request_error"}})
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            models = sorted(set(PROFILES) - {"instant"})
+            self._json(200, {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "local"}
+                                                         for m in models]})
+        elif self.path.rstrip("/") == "/metrics":
+            self._json(200, self.server.metrics.snapshot())
+        else:
+            self._error(404, f"unknown path {self.path}")
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            return self._error(404, f"unknown path {self.path}")
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            messages = request["messages"]
+            if not isinstance(messages, list):
+                raise TypeError("messages must be a list")
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, f"invalid request: {e}")
+
+        model = request.get("model") or "gpt-4o-mini"
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        tokens = tokenize(shape_response(messages, model, json_mode))
+        limit = request.get("max_tokens") or request.get("max_completion_tokens")
+        finish = "stop"
+        if isinstance(limit, int) and 0 < limit < len(tokens):
+            tokens, finish = tokens[:limit], "length"
+        prompt_tokens = sum(len(tokenize(_content(m))) for m in messages)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        ttft, per_token = self.server.latency.sample()
+        base = {"id": "chatcmpl-" + hashlib.sha1(repr((time.time(), id(self))).encode()).hexdigest()[:24],
+                "created": int(time.time()), "model": model}
+
+        if not request.get("stream"):
+            time.sleep(ttft + per_token * len(tokens))
+            self.server.metrics.add(prompt_tokens, len(tokens), ttft, False)
+            return self._json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                 "finish_reason": finish}]})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk = {**base, "object": "chat.completion.chunk"}
+        try:
+            time.sleep(ttft)
+            self._event({**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""},
+                                                "finish_reason": None}]})
+            for token in tokens:
+                if per_token:
+                    time.sleep(per_token)
+                self._event({**chunk, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+            final = {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": finish}]}
+            if (request.get("stream_options") or {}).get("include_usage"):
+                final["usage"] = usage
+            self._event(final)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        self.server.metrics.add(prompt_tokens, len(tokens), ttft, True)
+
+    def _event(self, payload):
+        self._write_chunk(b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class LLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=None, verbose=False, backlog=DEFAULT_BACKLOG):
+        self.request_queue_size = backlog  # server_activate() の listen() より前に設定する
+        super().__init__(address, Handler)
+        self.latency = latency or Latency()
+        self.metrics = Metrics()
+        self.verbose = verbose
+
+
+def serve_in_thread(port=0, latency=None, backlog=DEFAULT_BACKLOG):
+    """バックグラウンドでサーバーを起動して (server, base_url) を返す（テスト・ベンチマーク用）"""
+    server = LLMServer(("127.0.0.1", port), latency, backlog=backlog)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+# ── クライアント ──
+
+class ServerStubs(Stubs):
+    """LLM ノードをこのサーバー（または任意の OpenAI 互換 API）に送る dsl_interpreter 用のスタブ"""
+
+    def __init__(self, base_url=None, timeout=120):
+        self.base_url = (base_url or os.environ.get("LLM_SERVER_URL") or DEFAULT_URL).rstrip("/")
+        self.timeout = timeout
+
+    def llm(self, node_id, data, messages):
+        model = data.get("model") or {}
+        params = model.get("completion_params") or {}
+        request = {"model": model.get("name") or "gpt-4o-mini",
+                   "messages": [{"role": m["role"], "content": m["text"]} for m in messages]}
+        for key in ("max_tokens", "temperature", "top_p"):
+            if key in params:
+                request[key] = params[key]
+        req = urllib.request.Request(self.base_url + "/chat/completions", method="POST",
+                                     data=json.dumps(request, ensure_ascii=False).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            body = json.loads(resp.read())
+        return {"text": body["choices"][0]["message"]["content"], "usage": body.get("usage") or {}}
+
+
+def _stream(base_url, request):
+    """SSE で 1 リクエストを送り (TTFT 秒, 全体秒数, 受信トークン数) を返す"""
+    t0 = time.perf_counter()
+    req = urllib.request.Request(base_url + "/chat/completions", method="POST",
+                                 data=json.dumps({**request, "stream": True}).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    ttft, tokens = None, 0
+    with urllib.request.urlopen(req, timeout=300) as resp:
+        for line in resp:
+            if not line.startswith(b"data: ") or line.strip() == b"data: [DONE]":
+                continue
+            delta = json.loads(line[6:])["choices"][0]["delta"]
+            if delta.get("content"):
+                tokens += 1
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+    return ttft or 0.0, time.perf_counter() - t0, tokens
+
+
+def bench(base_url, requests, concurrency, max_tokens):
+    system = "あなたはリスク評価の専門家です。\n## 出力\n### 判定\nリスクレベル: 高/中/低\n| 項目 | 評価 | 理由 |\n"
+    payloads = [{"model": "gpt-4o-mini", "max_tokens": max_tokens,
+                 "messages": [{"role": "system", "content": system}, {"role": "user", "content": f"案件 {i}"}]}
+                for i in range(requests)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda p: _stream(base_url, p), payloads))
+    wall = time.perf_counter() - t0
+    ttfts = sorted(r[0] for r in results)
+    tokens = sum(r[2] for r in results)
+    pct = lambda q: ttfts[min(len(ttfts) - 1, int(q * len(ttfts)))]
+    print(f"{requests} streamed requests, concurrency {concurrency}: {wall:.2f}s "
+          f"({requests / wall:,.1f} req/s, {tokens / wall:,.0f} tok/s); "
+          f"client TTFT p50 {pct(0.5) * 1000:.0f}ms / p95 {pct(0.95) * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="instant", help="待ち時間のプロファイル")
+    parser.add_argument("--ttft", metavar="P50,P95", help="TTFT（秒）の中央値と 95 パーセンタイル")
+    parser.add_argument("--tps", metavar="P50,P5", help="トークン/秒の中央値と 5 パーセンタイル（0 で待ちなし）")
+    parser.add_argument("--seed", type=int, help="待ち時間の乱数シード")
+    parser.add_argument("--bench", type=int, metavar="N", help="サーバーを起動して N 件のストリーミング要求を送る")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="--bench の同時接続数")
+    parser.add_argument("--max-tokens", type=int, default=256, help="--bench の max_tokens")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help=f"接続の待ち行列の長さ（listen() の backlog、既定 {DEFAULT_BACKLOG}）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="アクセスログを表示する")
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    for key in ("ttft", "tps"):
+        value = getattr(args, key)
+        if value:
+            profile[key] = tuple(float(v) for v in value.split(","))
+    latency = Latency(profile["ttft"], profile["tps"], args.seed)
+
+    if args.bench:
+        server, base_url = serve_in_thread(0, latency, args.backlog)
+        bench(base_url, args.bench, args.concurrency, args.max_tokens)
+        print("server metrics:", json.dumps(server.metrics.snapshot()))
+        server.shutdown()
+        return
+
+    server = LLMServer((args.host, args.port), latency, args.verbose, args.backlog)
+    print(f"OpenAI-compatible stand-in on http://{args.host}:{args.port}/v1 "
+          f"(profile {args.profile}: TTFT {profile['ttft']}, tok/s {profile['tps']})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+LLM・HTTP 呼び出しの記録／再生キャッシュ
+
+外部呼び出しを正規化したリクエストのハッシュ（SHA-256）をキーにして、応答をディスクに保存する。
+キーに含めるもの:
+
+  http : ノード ID、メソッド、URL（ホスト名は小文字、クエリはキー順）、本文（JSON ならキー順に整形）
+  llm  : ノード ID、ノード定義（モデル・パラメータなど）、描画済みのプロンプト
+  call : ノード ID、関数名、引数（スクリプト内のスタブ関数など）
+
+ヘッダーはキーに含めない（認証トークンなどで毎回変わるため）。応答は zlib 圧縮した JSON で
+.dsl-cache/replay（環境変数 DSL_REPLAY_DIR で変更可）/<キー先頭 2 桁>/<残り> に 1 件 1 ファイルで保存し、合計が max_bytes を超えたら
+最終利用時刻（ヒットのたびに mtime を更新）の古い順に 90% まで削除する。
+
+モード:
+  record : 常に実際に呼び出して記録し直す
+  replay : 記録だけを返す。記録が無ければ ReplayMiss（再送しても結果は同じなので http-request の再送もしない）。
+           ReplayCache 自体はソケットに触れない。from_env() と dsl_batch --replay replay は block_sockets() で
+           ソケットの接続も禁止する（接続しようとした回数を数える）
+  auto   : 記録があれば返し、無ければ呼び出して記録する
+
+  from dsl_replay import ReplayCache, ReplayStubs
+  cache = ReplayCache(mode="replay")
+  wf = Workflow(doc, stubs=ReplayStubs(Stubs(), cache), transport=cache.transport(urllib_transport))
+  cache.urlopen(req, timeout=10)        # urllib.request.urlopen の代わり
+  cache.wrap(node_llm_stub, "30400000000005")
+
+  DSL_REPLAY=record python industry/banking/test-env/scripts/run-phase-bc.py   # モックサーバーへ送って記録
+  DSL_REPLAY=replay python industry/banking/test-env/scripts/run-phase-bc.py   # ソケットを開かずに再生
+
+  python dsl_replay.py                   # 件数・サイズ
+  python dsl_replay.py --clear
+  python dsl_replay.py --max-mb 16       # 上限を下げて古い記録から削除する
+"""
+import argparse
+import atexit
+import base64
+import hashlib
+import http.client
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_DIR = os.path.join(ROOT_DIR, ".dsl-cache", "replay")
+MAX_BYTES = 64 * 1024 * 1024
+MODES = ("record", "replay", "auto")
+# 上限を超えたときに削除して残す割合（1 件ごとに削除が走らないよう余裕を持たせる）
+EVICT_TO = 0.9
+
+
+class ReplayMiss(urllib.error.URLError):
+    """
+    replay モードで記録の無いリクエスト（呼び出し側からはネットワークエラーに見える）。
+    retryable = False なので dsl_interpreter の http-request は再送せずに失敗する
+    """
+    retryable = False
+
+
+def _canonical_body(body):
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        return {"json": json.loads(body)}
+    except ValueError:
+        return {"sha256": hashlib.sha256(body).hexdigest()}
+
+
+def normalize_url(url):
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def http_request_key(method, url, body):
+    return {"method": (method or "GET").upper(), "url": normalize_url(url), "body": _canonical_body(body)}
+
+
+class _Response:
+    """記録から作った urlopen の戻り値（with 文・status・headers・read に対応）"""
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = self.code = status
+        self.headers = self.msg = _headers(headers)
+        self._body = io.BytesIO(body)
+
+    def read(self, amt=None):
+        return self._body.read(amt)
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _headers(pairs):
+    message = http.client.HTTPMessage()
+    for name, value in pairs:
+        message[name] = value
+    return message
+
+
+class ReplayCache:
+    def __init__(self, path=None, mode="auto", max_bytes=MAX_BYTES):
+        if mode not in MODES:
+            raise ValueError(f"unknown replay mode: {mode} (choose from {', '.join(MODES)})")
+        self.path = path or os.environ.get("DSL_REPLAY_DIR") or CACHE_DIR
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.stats = Counter()   # hits / misses / recorded / evicted / blocked_sockets
+        self._lock = threading.Lock()
+        self._bytes = None       # 最初の書き込み時に数える
+
+    # ── 保存 ──
+
+    @staticmethod
+    def key(kind, node_id, request):
+        text = json.dumps([kind, node_id, request], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key[2:])
+
+    def load(self, key):
+        """記録された値（無ければ None）。ヒットしたファイルは mtime を更新して LRU の順序に反映する"""
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                record = json.loads(zlib.decompress(f.read()))
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            return None
+        return record
+
+    def store(self, key, record):
+        data = zlib.compress(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats["recorded"] += 1
+            if self._bytes is None:
+                self._bytes = self.size()[1]
+            else:
+                self._bytes += len(data) - previous
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """[(mtime, サイズ, パス)]"""
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        target = self.max_bytes * EVICT_TO
+        for _, size, path in sorted(self._entries()):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._bytes -= size
+            self.stats["evicted"] += 1
+
+    def size(self):
+        """(件数, バイト数)"""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
+        self._bytes = 0
+
+    # ── 呼び出し ──
+
+    def call(self, kind, node_id, request, fn, encode=lambda v: v, decode=lambda v: v):
+        """request（JSON にできる値）をキーに fn() の結果を記録・再生する"""
+        key = self.key(kind, node_id, request)
+        if self.mode != "record":
+            record = self.load(key)
+            if record is not None:
+                self.stats["hits"] += 1
+                return decode(record["value"])
+        self.stats["misses"] += 1
+        if self.mode == "replay":
+            detail = json.dumps(request, ensure_ascii=False, default=str)[:200]
+            raise ReplayMiss(f"no recording for {kind} {node_id or ''} {detail}")
+        value = fn()
+        self.store(key, {"kind": kind, "node_id": node_id, "value": encode(value)})
+        return value
+
+    def wrap(self, fn, node_id=None, kind="call"):
+        """関数 fn(*args, **kwargs) の結果を引数ごとに記録・再生する"""
+        def wrapper(*args, **kwargs):
+            request = {"function": fn.__name__, "args": args, "kwargs": kwargs}
+            return self.call(kind, node_id, request, lambda: fn(*args, **kwargs))
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+
+    def transport(self, inner):
+        """dsl_interpreter の transport を記録・再生付きにする"""
+        def transport(request):
+            key = http_request_key(request["method"], request["url"], request["body"])
+            return self.call("http", request.get("node_id"), key, lambda: inner(request),
+                             _encode_response, _decode_response)
+        return transport
+
+    def urlopen(self, url, data=None, timeout=None, node_id=None):
+        """urllib.request.urlopen の代わり。4xx / 5xx の記録は HTTPError として送出する"""
+        req = url if isinstance(url, urllib.request.Request) else urllib.request.Request(url, data=data)
+        body = req.data if data is None else data
+        key = http_request_key(req.get_method(), req.full_url, body)
+
+        def fetch():
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            try:
+                with urllib.request.urlopen(req, data, **kwargs) as resp:
+                    return {"status_code": resp.status, "headers": resp.headers.items(), "body": resp.read()}
+            except urllib.error.HTTPError as e:
+                return {"status_code": e.code, "headers": (e.headers or _headers([])).items(), "body": e.read()}
+
+        response = self.call("http", node_id, key, fetch, _encode_response, _decode_response)
+        headers = response["headers"]
+        pairs = headers.items() if isinstance(headers, dict) else headers
+        if response["status_code"] >= 400:
+            raise urllib.error.HTTPError(req.full_url, response["status_code"], http.client.responses.get(
+                response["status_code"], ""), _headers(pairs), io.BytesIO(response["body"]))
+        return _Response(req.full_url, response["status_code"], pairs, response["body"])
+
+    # ── ソケットの禁止（replay モード） ──
+
+    def block_sockets(self):
+        """
+        以後の接続をすべて拒否する（試みた回数は stats["blocked_sockets"]）。元に戻す関数を返す:
+          restore = cache.block_sockets()
+          try: ... finally: restore()
+        """
+        saved = (socket.socket.connect, socket.socket.connect_ex, socket.create_connection)
+
+        def refuse(*args, **kwargs):
+            self.stats["blocked_sockets"] += 1
+            raise ReplayMiss("network access is disabled in replay mode")
+
+        def restore():
+            socket.socket.connect, socket.socket.connect_ex, socket.create_connection = saved
+        socket.socket.connect = refuse
+        socket.socket.connect_ex = refuse
+        socket.create_connection = refuse
+        return restore
+
+    def summary(self):
+        s = self.stats
+        total = s["hits"] + s["misses"]
+        rate = f" ({s['hits'] / total:.0%} hit)" if total else ""
+        return (f"replay[{self.mode}]: {s['hits']} hits, {s['misses']} misses{rate}, {s['recorded']} recorded, "
+                f"{s['evicted']} evicted, {s['blocked_sockets']} sockets blocked")
+
+
+def _encode_response(response):
+    headers = response.get("headers") or {}
+    return {"status_code": response["status_code"],
+            "headers": list(headers.items()) if isinstance(headers, dict) else [list(p) for p in headers],
+            "body": base64.b64encode(response.get("body") or b"").decode("ascii")}
+
+
+def _decode_response(value):
+    return {"status_code": value["status_code"], "headers": [tuple(p) for p in value["headers"]],
+            "body": base64.b64decode(value["body"])}
+
+
+class ReplayStubs:
+    """
+    別の Stubs の応答を記録・再生する（キーはノード ID・ノード定義・プロンプト／クエリ）。
+    dsl_interpreter.Stubs のメソッドをすべて委譲するので継承しない（HTTP の記録・再生だけを使う
+    スクリプトが dsl_interpreter や PyYAML なしで import できるように）
+    """
+
+    def __init__(self, inner, cache):
+        self.inner = inner
+        self.cache = cache
+
+    def llm(self, node_id, data, messages):
+        return self.cache.call("llm", node_id, {"data": data, "messages": messages},
+                               lambda: self.inner.llm(node_id, data, messages))
+
+    def knowledge_retrieval(self, node_id, data, query):
+        return self.cache.call("knowledge_retrieval", node_id, {"data": data, "query": query},
+                               lambda: self.inner.knowledge_retrieval(node_id, data, query))
+
+    def question_classifier(self, node_id, data, query):
+        return self.cache.call("question_classifier", node_id, {"data": data, "query": query},
+                               lambda: self.inner.question_classifier(node_id, data, query))
+
+    def parameter_extractor(self, node_id, data, query):
+        return self.cache.call("parameter_extractor", node_id, {"data": data, "query": query},
+                               lambda: self.inner.parameter_extractor(node_id, data, query))
+
+
+def from_env(environ=os.environ):
+    """
+    環境変数 DSL_REPLAY=record|replay|auto から ReplayCache を作る。未設定なら None。
+    replay ならソケットを禁止し、終了時に集計を標準エラーに表示する
+    """
+    mode = environ.get("DSL_REPLAY")
+    if not mode:
+        return None
+    cache = ReplayCache(environ.get("DSL_REPLAY_DIR"), mode)
+    if mode == "replay":
+        cache.block_sockets()
+    atexit.register(lambda: print(cache.summary(), file=sys.stderr))
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help=f"保存先（既定 $DSL_REPLAY_DIR または {os.path.relpath(CACHE_DIR, ROOT_DIR)}）")
+    parser.add_argument("--clear", action="store_true", help="記録をすべて削除する")
+    parser.add_argument("--max-mb", type=float, help="上限を超えていれば古い記録から削除する")
+    args = parser.parse_args()
+
+    cache = ReplayCache(args.dir)
+    if args.clear:
+        cache.clear()
+    if args.max_mb is not None:
+        cache.max_bytes = int(args.max_mb * 1024 * 1024)
+        cache._bytes = cache.size()[1]
+        with cache._lock:
+            cache._evict()
+    count, size = cache.size()
+    print(f"{cache.path}: {count:,} recordings, {size / 1024:,.1f} KB"
+          + (f", {cache.stats['evicted']} evicted" if cache.stats["evicted"] else ""))
+
+
+if __name__ == "__main__":
+    main()
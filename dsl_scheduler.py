@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+DSL 並列スケジューラー: dsl_interpreter のワークフローを asyncio で並行実行する
+
+dsl_interpreter.Workflow の実行計画とノード実装をそのまま使い、実行順だけを入れ替える。
+各ノードの未解決の入力エッジ数（入次数）を数え、先行ノードが完了するたびにエッジを
+「有効」または「スキップ」として解決する。入力エッジがすべて解決したノードから実行可能になり、
+有効なエッジが 1 本もなければ実行せずにスキップを後続へ伝える。したがって合流ノード
+（variable-aggregator / end など）は、到達しうるすべての分岐が終わるまで待ってから 1 回だけ実行される。
+
+外部呼び出しを伴うノード（IO_TYPES）はスレッドプールで実行し、それ以外はイベントループ上で
+そのまま実行する。イテレーションの子グラフも同じスケジューラーで実行し、並列モードなら
+parallel_nums 件まで項目を同時に処理する（出力は項目順、失敗は error_handle_mode に従う）。
+
+  from dsl_scheduler import AsyncWorkflow, parallelism
+  with AsyncWorkflow(doc, stubs=MyStubs()) as wf:     # 終了時（または close()）にスレッドプールを閉じる
+      result = wf.run(inputs)                          # または await wf.run_async(inputs)
+  parallelism(result)   # {"wall_ms", "busy_ms", "average", "peak"}
+
+  python dsl_scheduler.py samples/v11-parallel-llm.yml --input topic=量子計算 --latency 0.2
+      # dsl_interpreter（分岐を順に実行）と並行実行の所要時間・並列度を比較する
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import ChainMap, deque
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_interpreter import (IO_TYPES, TERMINATED, Stubs, Workflow, WorkflowError, collect_items, iteration_settings,
+                             offline_transport, sample_inputs, urllib_transport)
+
+MAX_WORKERS = 32
+
+
+class AsyncWorkflow(Workflow):
+    """入次数ベースで実行可能なノードを並行に実行する Workflow"""
+
+    def __init__(self, doc, stubs=None, transport=urllib_transport, max_workers=MAX_WORKERS, trace=False):
+        super().__init__(doc, stubs, transport, trace)
+        self.max_workers = max_workers
+        self._executor = None
+
+    def run(self, inputs=None, query=None, conversation=None, sys_vars=None):
+        return asyncio.run(self.run_async(inputs, query, conversation, sys_vars))
+
+    def close(self):
+        """IO ノード用のスレッドプールを閉じる（次の run でまた作られる）"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def run_async(self, inputs=None, query=None, conversation=None, sys_vars=None):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="dsl-node")
+        ctx, pool = self._start(inputs, query, conversation, sys_vars)
+        try:
+            await self._schedule(None, pool, ctx)
+        except WorkflowError as e:
+            return self._finish(ctx, e)
+        return self._finish(ctx)
+
+    async def _schedule(self, scope, pool, ctx):
+        members = self.order[scope]
+        pending = {nid: self.indeg[nid] for nid in members}
+        reached = set(self.roots[scope])   # 有効な入力エッジがある（またはルートの）ノード
+        ready = deque(nid for nid in members if pending[nid] == 0)
+        running = {}
+
+        def resolve(nid, handles):
+            for handle, tgt in self.out[nid]:
+                if handles is None or handle in handles:
+                    reached.add(tgt)
+                pending[tgt] -= 1
+                if pending[tgt] == 0:
+                    ready.append(tgt)
+
+        try:
+            while ready or running:
+                while ready:
+                    nid = ready.popleft()
+                    if nid in reached:
+                        running[asyncio.ensure_future(self._execute_async(nid, pool, ctx))] = nid
+                    else:
+                        resolve(nid, ())  # スキップ: 後続のエッジもすべてスキップ
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    nid = running.pop(task)
+                    resolve(nid, task.result())
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _execute_async(self, nid, pool, ctx):
+        ntype = self.nodes[nid].get("type")
+        start = time.perf_counter()
+        try:
+            if ntype == "iteration":
+                outputs, handles = await self._iterate(nid, pool, ctx)
+            elif ntype in IO_TYPES:
+                loop = asyncio.get_running_loop()
+                outputs, handles = await loop.run_in_executor(self._executor, self._call, nid, pool, ctx)
+            else:
+                outputs, handles = self._call(nid, pool, ctx)
+        except WorkflowError as e:
+            if self.trace:
+                self._span(ctx, nid, pool, start, time.perf_counter(), error=e)
+            raise
+        pool[nid] = outputs
+        end = time.perf_counter()
+        ctx.result.steps.append((nid, ntype, start, end))
+        if self.trace:
+            self._span(ctx, nid, pool, start, end, outputs)
+        return handles
+
+    async def _iterate(self, nid, pool, ctx):
+        data = self.nodes[nid]
+        items = self.resolve(pool, data.get("iterator_selector"))
+        if not isinstance(items, list):
+            raise WorkflowError(f"iterator variable must be a list, got {type(items).__name__}", nid)
+        workers, mode = iteration_settings(data)
+        gate = asyncio.Semaphore(workers)
+
+        async def run_item(index, item):
+            async with gate:
+                local = ChainMap({nid: {"item": item, "index": index}}, pool)
+                start = time.perf_counter()
+                try:
+                    await self._schedule(nid, local, ctx)
+                except WorkflowError as e:
+                    if self.trace:
+                        self._item_span(ctx, nid, index, start, time.perf_counter(), e)
+                    if mode == TERMINATED:
+                        raise
+                    return None, e
+                if self.trace:
+                    self._item_span(ctx, nid, index, start, time.perf_counter())
+                return self.resolve(local, data.get("output_selector")), None
+
+        tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(items)]
+        try:
+            outcomes = await asyncio.gather(*tasks)
+        except WorkflowError:
+            for task in tasks:
+                task.cancel()
+            raise
+        return {"output": collect_items(nid, outcomes, mode, ctx.result)}, None
+
+
+def parallelism(result):
+    """
+    実行の並列度。busy はノード実行時間の合計（イテレーションは子ノードと二重に数えないよう除く）、
+    average = busy / wall、peak は同時に実行中だったノード数の最大
+    """
+    spans = [(s, e) for _, t, s, e in result.steps if t != "iteration"]
+    busy = sum(e - s for s, e in spans)
+    events = sorted([(s, 1) for s, _ in spans] + [(e, -1) for _, e in spans])
+    peak = level = 0
+    for _, delta in events:
+        level += delta
+        peak = max(peak, level)
+    wall = result.elapsed
+    return {"wall_ms": round(wall * 1000, 3), "busy_ms": round(busy * 1000, 3),
+            "average": round(busy / wall, 2) if wall else 0.0, "peak": peak}
+
+
+class LatencyStubs(Stubs):
+    """既定のスタブ応答に固定の待ち時間を加える（並列化の効果を測るため）"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def llm(self, node_id, data, messages):
+        time.sleep(self.seconds)
+        return super().llm(node_id, data, messages)
+
+    def knowledge_retrieval(self, node_id, data, query):
+        time.sleep(self.seconds)
+        return super().knowledge_retrieval(node_id, data, query)
+
+    def question_classifier(self, node_id, data, query):
+        time.sleep(self.seconds)
+        return super().question_classifier(node_id, data, query)
+
+    def parameter_extractor(self, node_id, data, query):
+        time.sleep(self.seconds)
+        return super().parameter_extractor(node_id, data, query)
+
+
+def latency_transport(seconds):
+    def transport(request):
+        time.sleep(seconds)
+        return offline_transport(request)
+    return transport
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="実行する .yml")
+    parser.add_argument("--input", action="append", default=[], metavar="NAME=VALUE",
+                        help="Start 変数（省略した変数は合成入力で補う）")
+    parser.add_argument("--query", help="sys.query（チャットフロー）")
+    parser.add_argument("--latency", type=float, default=0.1,
+                        help="LLM・検索・HTTP などの外部呼び出し 1 回の待ち時間（秒、既定 0.1）")
+    args = parser.parse_args()
+
+    stubs, transport = LatencyStubs(args.latency), latency_transport(args.latency)
+    print(f"{'workflow':<44} {'serial':>9} {'async':>9} {'speedup':>8} {'avg':>5} {'peak':>4}")
+    for path in args.paths:
+        doc, error = dsl_corpus.parse_file(path)
+        if error:
+            print(f"{os.path.relpath(path, ROOT_DIR):<44} {error}")
+            continue
+        inputs = sample_inputs(doc)
+        for item in args.input:
+            name, _, value = item.partition("=")
+            inputs[name] = value
+        query = args.query or inputs.get("query") or "サンプルの質問です"
+        serial = Workflow(doc, stubs=stubs, transport=transport).run(inputs, query=query)
+        with AsyncWorkflow(doc, stubs=stubs, transport=transport) as wf:
+            result = wf.run(inputs, query=query)
+        if result.status != "succeeded" or serial.outputs != result.outputs:
+            detail = result.error or "outputs differ from serial run"
+            print(f"{os.path.relpath(path, ROOT_DIR):<44} FAIL {detail}")
+            continue
+        p = parallelism(result)
+        print(f"{os.path.relpath(path, ROOT_DIR):<44} {serial.elapsed * 1000:7.0f}ms {result.elapsed * 1000:7.0f}ms "
+              f"{serial.elapsed / result.elapsed:7.2f}x {p['average']:5.2f} {p['peak']:4d}")
+        if len(args.paths) == 1:
+            print(json.dumps(result.to_dict()["steps"], ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+template-transform ノードのテンプレートエンジン（コンパイル済みテンプレートの LRU キャッシュ）
+
+テンプレートのソース文字列をキーに、コンパイル結果を最大 maxsize 件保持する。
+同じソースは（別のノード・別の文書でも）1 回だけコンパイルし、以降は変数 dict を渡して描画するだけになる。
+
+jinja2 がインストールされていれば jinja2 でコンパイルする（Dify と同じ既定設定: autoescape なし・
+末尾の改行 1 つを除去・未定義変数は空文字）。無い環境では {{ 変数 }}（{{- -}} の空白制御を含む）だけの
+テンプレートを内蔵のレンダラーで処理し、それ以外の Jinja 構文は TemplateError にする。
+
+  from dsl_template import TEMPLATES
+  TEMPLATES.render(source, {"name": "値"})
+  TEMPLATES.info()   # {"hits", "misses", "evictions", "size", "maxsize", "hit_rate"}
+"""
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    import jinja2
+except ImportError:  # {{ 変数 }} だけのテンプレートは内蔵のレンダラーで処理する
+    jinja2 = None
+
+PLAIN_VARIABLE = re.compile(r"\{\{(-?)\s*([A-Za-z_]\w*)\s*(-?)\}\}")
+JINJA_SYNTAX = re.compile(r"\{%|\{#|\{\{(?!-?\s*[A-Za-z_]\w*\s*-?\}\})")
+MAXSIZE = 512
+
+
+class TemplateError(Exception):
+    pass
+
+
+def _plain(source):
+    """{{ 変数 }} だけのテンプレートを (リテラル, 変数名, …, リテラル) に分解した描画関数にする"""
+    if JINJA_SYNTAX.search(source):
+        raise TemplateError("jinja2 is required to render this template")
+    parts = PLAIN_VARIABLE.split(source)   # [literal, '-', name, '-', literal, ...]
+    literals, names = parts[0::4], parts[2::4]
+    for i, (left, right) in enumerate(zip(parts[1::4], parts[3::4])):
+        if left:
+            literals[i] = literals[i].rstrip()
+        if right:
+            literals[i + 1] = literals[i + 1].lstrip()
+    if literals[-1].endswith("\n"):
+        literals[-1] = literals[-1][:-1]   # jinja2 の keep_trailing_newline=False と同じ
+    head, pairs = literals[0], list(zip(names, literals[1:]))
+
+    def render(values):
+        out = [head]
+        for name, literal in pairs:
+            value = values.get(name)
+            out.append("" if value is None and name not in values else str(value))
+            out.append(literal)
+        return "".join(out)
+    return render
+
+
+class TemplateCache:
+    def __init__(self, maxsize=MAXSIZE):
+        self.maxsize = maxsize
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        self._env = jinja2.Environment(autoescape=False) if jinja2 is not None else None
+        self.hits = self.misses = self.evictions = 0
+
+    def compile(self, source):
+        """描画関数 render(values) を返す（キャッシュ済みならそれを使う）"""
+        with self._lock:
+            render = self._compiled.get(source)
+            if render is not None:
+                self.hits += 1
+                self._compiled.move_to_end(source)
+                return render
+            self.misses += 1
+        if self._env is not None:
+            try:
+                template = self._env.from_string(source)
+            except jinja2.TemplateSyntaxError as e:
+                raise TemplateError(f"template syntax error: {e}") from e
+            render = lambda values: template.render(values)
+        else:
+            render = _plain(source)
+        with self._lock:
+            self._compiled[source] = render
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+        return render
+
+    def render(self, source, values):
+        return self.compile(source)(values)
+
+    def info(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._compiled), "maxsize": self.maxsize,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+TEMPLATES = TemplateCache()
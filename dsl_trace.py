@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+ワークフロー実行のトレース: ノードごとの実行記録を Chrome trace / JSONL に書き出す
+
+dsl_interpreter.Workflow（--async なら dsl_scheduler.AsyncWorkflow）を trace=True で実行し、
+RunResult.spans（ノードの開始・終了、入出力のバイト数、イテレーションの項目、HTTP の試行）を書き出す。
+
+  Chrome trace : chrome://tracing または https://ui.perfetto.dev で開く JSON（trace event 形式）。
+                 ワークフローごとに 1 プロセス、重なって実行された区間は別の行に並べる
+  JSONL        : 1 行 1 区間の平たい dict（ms 単位、実行開始からの相対時刻）。複数実行の集計用
+
+あわせてクリティカルパス（最後に終わったノードから、各ノードの入力エッジのうち最も遅く終わった
+先行ノードをたどった経路）を表示する。イテレーションは最も遅かった項目の中の経路も表示する。
+
+  python dsl_trace.py industry/banking/bnk-04-fraud-alert.yml -o bnk04.trace.json --latency 0.2
+  python dsl_trace.py industry/banking/bnk-05-branch-report.yml --async --latency 0.1 --jsonl spans.jsonl
+  python dsl_trace.py samples/*.yml --jsonl spans.jsonl -n 5        # 複数ワークフロー・複数回の区間をまとめて書き出す
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+from dsl_interpreter import Workflow, WorkflowError, offline_transport, sample_inputs, urllib_transport
+from dsl_scheduler import AsyncWorkflow, LatencyStubs, latency_transport
+
+SPAN_ARGS = ("node", "type", "scope", "item", "attempt", "status", "status_code", "error", "in_bytes", "out_bytes")
+
+
+def span_name(span):
+    title = span.get("title") or span["node"]
+    if span["kind"] == "item":
+        return f"{title} [{span['item']}]"
+    if span["kind"] == "attempt":
+        return f"{title} attempt {span['attempt'] + 1}"
+    return title if span.get("item") is None else f"{title} [{span['item']}]"
+
+
+def _lanes(spans):
+    """重なる区間を別の行（tid）に割り当てる。完全に内側に収まる区間（子ノード・試行）は同じ行に入れ子にする"""
+    lanes, assigned = [], []   # lanes: 行ごとの開いている区間の終了時刻のスタック
+    for span in sorted(spans, key=lambda s: (s["start"], -s["end"])):
+        for tid, stack in enumerate(lanes):
+            while stack and stack[-1] <= span["start"]:
+                stack.pop()
+            if not stack or span["end"] <= stack[-1]:
+                stack.append(span["end"])
+                break
+        else:
+            tid = len(lanes)
+            lanes.append([span["end"]])
+        assigned.append((tid, span))
+    return assigned
+
+
+def trace_events(result, name, pid=1):
+    """1 回の実行の Chrome trace イベント（ts / dur はマイクロ秒、実行開始が 0）"""
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}]
+    lanes = set()
+    for tid, span in _lanes(result.spans):
+        lanes.add(tid)
+        events.append({
+            "name": span_name(span), "cat": span["kind"] if span["kind"] != "node" else span["type"], "ph": "X",
+            "pid": pid, "tid": tid, "ts": round((span["start"] - result.started) * 1e6, 1),
+            "dur": round((span["end"] - span["start"]) * 1e6, 1),
+            "args": {k: span[k] for k in SPAN_ARGS if span.get(k) is not None}})
+    events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"lane {tid}"}}
+                  for tid in sorted(lanes))
+    return events
+
+
+def chrome_trace(runs):
+    """[(名前, RunResult)] → Chrome trace の JSON オブジェクト（実行ごとに別プロセス）"""
+    events = []
+    for pid, (name, result) in enumerate(runs, 1):
+        events.extend(trace_events(result, name, pid))
+    return {"traceEvents": events, "displayTimeUnit": "ms",
+            "otherData": {"runs": [{"name": name, "status": r.status, "elapsed_ms": round(r.elapsed * 1000, 3)}
+                                   for name, r in runs]}}
+
+
+def span_records(result, workflow, run=0):
+    """平たい区間の dict（JSONL の 1 行）を実行開始順に返す"""
+    for span in sorted(result.spans, key=lambda s: s["start"]):
+        record = {"workflow": workflow, "run": run, "kind": span["kind"], "name": span_name(span)}
+        record.update((k, span.get(k)) for k in SPAN_ARGS)
+        record["start_ms"] = round((span["start"] - result.started) * 1000, 3)
+        record["ms"] = round((span["end"] - span["start"]) * 1000, 3)
+        yield record
+
+
+def critical_path(workflow, spans, scope=None, item=None):
+    """
+    scope（None = トップレベル、イテレーション ID なら item 番目の項目）のクリティカルパス。
+    [(ノードの区間, イテレーションなら最も遅かった項目の経路 | None)] を実行順に返す
+    """
+    done = {s["node"]: s for s in spans
+            if s["kind"] == "node" and s["scope"] == scope and (scope is None or s["item"] == item)}
+    if not done:
+        return []
+    preds = {}
+    for src, edges in workflow.out.items():
+        for _, tgt in edges:
+            preds.setdefault(tgt, []).append(src)
+    path = []
+    span = max(done.values(), key=lambda s: s["end"])
+    while span is not None:
+        inner = None
+        if span["type"] == "iteration":
+            items = [s for s in spans if s["kind"] == "item" and s["node"] == span["node"]]
+            if items:
+                slowest = max(items, key=lambda s: s["end"] - s["start"])
+                inner = (slowest["item"], critical_path(workflow, spans, span["node"], slowest["item"]))
+        path.append((span, inner))
+        ran = [done[p] for p in preds.get(span["node"], ()) if p in done]
+        span = max(ran, key=lambda s: s["end"]) if ran else None
+    return path[::-1]
+
+
+def print_path(path, wall, indent="  "):
+    for span, inner in path:
+        ms = (span["end"] - span["start"]) * 1000
+        share = f"{ms / (wall * 1000):6.1%}" if wall else "     -"
+        print(f"{indent}{ms:9.2f}ms {share}  {span['type']:<20} {span.get('title') or ''} ({span['node']})"
+              f"  in {span['in_bytes']:,}B / out {span['out_bytes']:,}B")
+        if inner:
+            index, sub = inner
+            print(f"{indent}    slowest item [{index}]:")
+            print_path(sub, wall, indent + "    ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="実行する .yml")
+    parser.add_argument("--input", action="append", default=[], metavar="NAME=VALUE",
+                        help="Start 変数（省略した変数は合成入力で補う）")
+    parser.add_argument("--query", help="sys.query（チャットフロー）")
+    parser.add_argument("-o", "--output", help="Chrome trace の JSON（ワークフローごとに最後の実行）を書き出す")
+    parser.add_argument("--jsonl", help="すべての実行の区間を JSONL で書き出す")
+    parser.add_argument("-n", "--repeat", type=int, default=1, help="1 ワークフローあたりの実行回数")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="dsl_scheduler で並行実行する")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="LLM・検索・HTTP などの外部呼び出し 1 回に加える待ち時間（秒）")
+    parser.add_argument("--http", choices=("offline", "live"), default="offline",
+                        help="http-request ノードを送信しない（offline、既定）か実際に送信する（live）")
+    parser.add_argument("--quiet", action="store_true", help="クリティカルパスを表示しない")
+    args = parser.parse_args()
+
+    stubs = LatencyStubs(args.latency) if args.latency else None
+    if args.http == "live":
+        transport = urllib_transport
+    else:
+        transport = latency_transport(args.latency) if args.latency else offline_transport
+    cls = AsyncWorkflow if args.use_async else Workflow
+    runs = []
+    jsonl = open(args.jsonl, "w", encoding="utf-8") if args.jsonl else None
+    try:
+        for path in args.paths:
+            name = os.path.relpath(path, ROOT_DIR)
+            doc, error = dsl_corpus.parse_file(path)
+            if error:
+                print(f"{name}: {error}", file=sys.stderr)
+                continue
+            try:
+                workflow = cls(doc, stubs=stubs, transport=transport, trace=True)
+            except WorkflowError as e:
+                print(f"{name}: {e}", file=sys.stderr)
+                continue
+            inputs = sample_inputs(doc)
+            for item in args.input:
+                key, _, value = item.partition("=")
+                inputs[key] = value
+            query = args.query or inputs.get("query") or "サンプルの質問です"
+            with workflow:
+                for run in range(args.repeat):
+                    result = workflow.run(inputs, query=query)
+                    if jsonl:
+                        for record in span_records(result, name, run):
+                            jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            runs.append((name, result))
+            if not args.quiet:
+                failed = f" FAILED at {result.error_node}: {result.error}" if result.status != "succeeded" else ""
+                print(f"{name}: {result.elapsed * 1000:.2f}ms, {len(result.spans)} spans{failed}")
+                print_path(critical_path(workflow, result.spans), result.elapsed)
+    finally:
+        if jsonl:
+            jsonl.close()
+    if args.output and runs:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(chrome_trace(runs), f, ensure_ascii=False)
+    sys.exit(0 if runs and all(r.status == "succeeded" for _, r in runs) else 1)
+
+
+if __name__ == "__main__":
+    main()
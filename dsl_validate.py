@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Dify DSL 静的バリデーター（DIFY_WORKFLOW_GOLDEN_RULES.md 準拠）
+
+グラフごとに ID 索引・隣接リストを 1 回作り、到達可能性（BFS）・閉路検出と
+トポロジカル順（Kahn 法）を O(V+E) で求める。上流判定（variables.8）だけは線形ではない:
+任意の DAG で「ref は上流か」に正確に答えるには推移閉包が要り、区間ラベルやトポロジカル順の
+添字では木でない DAG の到達可能性を判定できない。そこで上流ノード集合をビット集合（V ビットの
+整数）としてトポロジカル順に辺ごとに OR で伝播し（O(E·⌈V/w⌉)、w は整数の 1 桁のビット数 30）、
+参照ごとの判定を O(1) の AND にしている。Dify のワークフローはノード数が数十（コーパスの最大は
+12）なので 1 ノードの集合は 1〜2 桁に収まり、実際には O(V+E) と同じ手間で済む。
+コーパスは dsl_corpus のキャッシュから読み、ファイル単位でプロセスプールに分散する。
+
+チェック項目（rule はゴールデンルール第 10 章の節と番号）:
+  structure.1  Start（または Trigger）ノードがちょうど 1 つ
+  structure.2  workflow は end、advanced-chat は answer で終了する（逆のノードは不可）
+  structure.3  閉路がない（DAG）
+  structure.4  ノード ID が文字列かつ一意
+  structure.5  エッジの source / target が存在するノードを指す
+  structure.6  ノードの type が custom
+  variables.8  value_selector / {{#ID.var#}} の参照先が存在し、上流にあり、その出力を持つ
+  variables.10 value_selector が [NODE_ID, variable] 形式
+  variables.11 API キー等がノード内にハードコードされていない（warning）
+  llm.13/14/15/16/17  モデル指定・prompt_template 形式・temperature・max_tokens・memory 構造
+  llm.18       dataset_ids にプレースホルダーがない
+  edges.17     sourceType / targetType がノードの data.type と一致
+  edges.18     IF/ELSE の sourceHandle が case_id（旧形式は true）または false
+  edges.19     Question Classifier の sourceHandle がクラス ID
+  edges.20     targetHandle が target
+  design.23    並列ブランチ 10 本以下・イテレーションのネスト 3 段以下（warning）
+  design.24    Iteration の start_node_id が自身の子ノード
+  design.25    Iteration の並列数 10 以下
+  design.27    HTTP URL にコードノードを経由しない入力値を埋め込んでいない（warning）
+  design.28    HTTP JSON Body に LLM 出力を直接埋め込んでいない（warning）
+  design.29    LLM 自由文に contains で分岐していない（warning）
+  design.30    Iteration 内で {{#ITER.items#}} を使っていない
+  variables.12 会話変数への書き込みは Variable Assigner だけ・Chatflow のみ・宣言済みの会話変数に限る
+  sensitive-words  features.sensitive_word_avoidance（第 1 章）: type・config（単数形の dict）・
+               keywords（改行区切りの文字列、100 行・10,000 文字以内）・preset_response（100 文字以内）・
+               api 方式の api_based_extension_id
+  end-outputs  End ノードに outputs がある
+  unreachable  Start から到達できないノードがない
+
+  python dsl_validate.py                          # 全コーパス（catalog/ industry/ samples/）
+  python dsl_validate.py catalog/energy/*.yml     # ファイル指定
+  python dsl_validate.py --format json -j 0       # 機械可読出力・CPU コア数で並列
+  python dsl_validate.py --strict                 # warning でも終了コード 1
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+
+ERROR, WARNING = "error", "warning"
+
+START_TYPES = {"start", "trigger-schedule", "trigger-webhook", "trigger-plugin"}
+# ノード種別ごとの出力変数（None = 種別の設定から決まる / 検査しない）
+FIXED_OUTPUTS = {
+    "llm": {"text", "usage", "reasoning_content", "structured_output"},
+    "template-transform": {"output"},
+    "knowledge-retrieval": {"result"},
+    "http-request": {"body", "status_code", "headers", "files", "size"},
+    "question-classifier": {"class_name", "class_id", "usage"},
+    "variable-aggregator": {"output"},
+    "iteration": {"output"},
+    "agent": {"text", "files", "json", "usage"},
+    "end": set(),
+    "answer": {"answer", "files"},
+    "variable-assigner": set(),
+}
+ITERATION_ITEM_VARS = {"item", "index"}
+SPECIAL_SELECTORS = {"sys", "env", "ENV", "conversation"}
+SELECTOR_KEYS = {"value_selector", "variable_selector", "query_variable_selector",
+                 "iterator_selector", "output_selector", "assigned_variable_selector"}
+TEMPLATE_REF = re.compile(r"\{\{#([^#{}.]+)\.([^#{}]+)#\}\}")
+PLACEHOLDER_ID = re.compile(r"(?i)placeholder|your[-_]|dataset[-_]uuid|xxx|^todo|^dummy|^sample[-_]?id")
+SECRET = re.compile(r"\b(sk-[A-Za-z0-9_-]{16,}|xox[bp]-[A-Za-z0-9-]{10,}|AKIA[0-9A-Z]{16})\b"
+                    r"|Bearer\s+(?!\{\{)[A-Za-z0-9._-]{16,}")
+MAX_PARALLEL = 10
+MAX_NESTING = 3
+ASSIGNER_TYPES = {"variable-assigner", "assigner"}
+MODERATION_TYPES = {"keywords", "openai_moderation", "api"}
+MAX_KEYWORD_LINES, MAX_KEYWORD_CHARS, MAX_PRESET_RESPONSE = 100, 10000, 100
+
+
+def _iter_strings(obj, path=()):
+    """(キーパス, 文字列) を再帰的に列挙する"""
+    if isinstance(obj, str):
+        yield path, obj
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            yield from _iter_strings(v, path + (k,))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            yield from _iter_strings(v, path + (i,))
+
+
+def _iter_selectors(obj, key=None):
+    """(キー名, selector) を再帰的に列挙する。variable-aggregator の variables（selector のリスト）も含む"""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if k in SELECTOR_KEYS and isinstance(v, list):
+                yield k, v
+            elif isinstance(v, (dict, list)):
+                yield from _iter_selectors(v, k)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _iter_selectors(v, key)
+
+
+class GraphChecker:
+    """1 文書分のチェック。issues に結果を溜める"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.issues = []
+
+    def add(self, severity, rule, code, message, node=None, edge=None):
+        self.issues.append({"severity": severity, "rule": rule, "code": code, "message": message,
+                            "node": node, "edge": edge})
+
+    # ── 索引 ──
+
+    def run(self):
+        doc = self.doc
+        if not isinstance(doc, dict):
+            self.add(ERROR, "structure.0", "not-a-mapping", "document is not a mapping")
+            return self.issues
+        app = doc.get("app") or {}
+        workflow = doc.get("workflow") or {}
+        graph = workflow.get("graph") or {}
+        self.mode = app.get("mode")
+        for key, value in (("app.name", app.get("name")), ("app.mode", self.mode)):
+            if not value:
+                self.add(ERROR, "structure.0", "missing-field", f"{key} is required")
+        nodes = graph.get("nodes")
+        edges = graph.get("edges")
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            self.add(ERROR, "structure.0", "missing-graph", "workflow.graph.nodes / edges must be lists")
+            return self.issues
+        self.env_vars = {v.get("name") for v in workflow.get("environment_variables") or [] if isinstance(v, dict)}
+        self.conv_vars = {v.get("name") for v in workflow.get("conversation_variables") or [] if isinstance(v, dict)}
+
+        self.index_nodes(nodes)
+        self.index_edges(edges)
+        self.check_structure()
+        order = self.topological_order()
+        self.check_reachability()
+        self.check_nodes(order)
+        features = workflow.get("features") or doc.get("features") or {}
+        self.check_sensitive_words(features.get("sensitive_word_avoidance"))
+        return self.issues
+
+    def index_nodes(self, nodes):
+        self.nodes = {}           # id -> node
+        self.types = {}           # id -> data.type
+        self.children = {}        # iteration id -> [child ids]
+        for n in nodes:
+            if not isinstance(n, dict):
+                self.add(ERROR, "structure.4", "invalid-node", "node is not a mapping")
+                continue
+            nid = n.get("id")
+            if not isinstance(nid, str) or not nid:
+                self.add(ERROR, "structure.4", "invalid-node-id", f"node id must be a non-empty string: {nid!r}")
+                nid = str(nid)
+            if nid in self.nodes:
+                self.add(ERROR, "structure.4", "duplicate-node-id", f"duplicate node id {nid}", node=nid)
+                continue
+            data = n.get("data") if isinstance(n.get("data"), dict) else {}
+            self.nodes[nid] = n
+            self.types[nid] = data.get("type")
+            if n.get("type") != "custom":
+                self.add(ERROR, "structure.6", "node-type-not-custom",
+                         f"node type must be 'custom' (got {n.get('type')!r})", node=nid)
+            parent = n.get("parentId")
+            if parent is not None:
+                self.children.setdefault(parent, []).append(nid)
+
+    def index_edges(self, edges):
+        self.out = {nid: [] for nid in self.nodes}
+        self.inc = {nid: 0 for nid in self.nodes}
+        self.edges = []
+        for e in edges:
+            if not isinstance(e, dict):
+                self.add(ERROR, "structure.5", "invalid-edge", "edge is not a mapping")
+                continue
+            eid = e.get("id") or f"{e.get('source')}-{e.get('target')}"
+            src, tgt = e.get("source"), e.get("target")
+            missing = [k for k, v in (("source", src), ("target", tgt)) if v not in self.nodes]
+            if missing:
+                for k in missing:
+                    self.add(ERROR, "structure.5", f"edge-{k}-missing",
+                             f"edge {k} {e.get(k)!r} does not exist", edge=eid)
+                continue
+            data = e.get("data") if isinstance(e.get("data"), dict) else {}
+            for key, nid in (("sourceType", src), ("targetType", tgt)):
+                if data.get(key) != self.types[nid]:
+                    self.add(ERROR, "edges.17", "edge-type-mismatch",
+                             f"data.{key} {data.get(key)!r} != node type {self.types[nid]!r}", edge=eid)
+            if e.get("targetHandle", "target") != "target":
+                self.add(ERROR, "edges.20", "target-handle", f"targetHandle must be 'target' (got {e.get('targetHandle')!r})",
+                         edge=eid)
+            self.edges.append((eid, src, tgt, e.get("sourceHandle", "source")))
+            self.out[src].append(tgt)
+            self.inc[tgt] += 1
+
+    # ── 構造 ──
+
+    def check_structure(self):
+        top = [nid for nid, n in self.nodes.items() if n.get("parentId") is None]
+        starts = [nid for nid in top if self.types[nid] in START_TYPES]
+        if len(starts) != 1:
+            self.add(ERROR, "structure.1", "start-count", f"expected exactly one start/trigger node, found {len(starts)}")
+        self.starts = starts
+        terminal, forbidden = ("end", "answer") if self.mode == "workflow" else ("answer", "end")
+        if self.mode in ("workflow", "advanced-chat"):
+            if not any(self.types[nid] == terminal for nid in self.nodes):
+                self.add(ERROR, "structure.2", "no-terminal", f"{self.mode} must end with an '{terminal}' node")
+            for nid, t in self.types.items():
+                if t == forbidden:
+                    self.add(ERROR, "structure.2", "wrong-terminal", f"'{t}' node is not allowed in {self.mode} mode",
+                             node=nid)
+
+        for eid, src, tgt, handle in self.edges:
+            stype = self.types[src]
+            data = self.nodes[src].get("data") or {}
+            if stype == "if-else":
+                allowed = {c.get("case_id") for c in data.get("cases") or [] if isinstance(c, dict)} or {"true"}
+                allowed.add("false")
+                if handle not in allowed:
+                    self.add(ERROR, "edges.18", "if-else-handle",
+                             f"sourceHandle {handle!r} does not match a case_id or 'false' ({sorted(allowed)})", edge=eid)
+            elif stype == "question-classifier":
+                allowed = {c.get("id") for c in data.get("classes") or [] if isinstance(c, dict)}
+                if handle not in allowed:
+                    self.add(ERROR, "edges.19", "classifier-handle",
+                             f"sourceHandle {handle!r} is not a class id ({sorted(allowed)})", edge=eid)
+            elif handle != "source":
+                self.add(ERROR, "edges.18", "source-handle", f"sourceHandle must be 'source' for {stype} (got {handle!r})",
+                         edge=eid)
+
+        fanout = Counter((src, handle) for _, src, _, handle in self.edges)
+        for (src, handle), count in fanout.items():
+            if count > MAX_PARALLEL:
+                self.add(WARNING, "design.23", "too-many-branches",
+                         f"{count} parallel branches from handle {handle!r} (max {MAX_PARALLEL})", node=src)
+
+    def topological_order(self):
+        """Kahn 法。親イテレーション → 子ノードを暗黙の辺として扱う。閉路上のノードは順序に含まれない"""
+        indeg = dict(self.inc)
+        succ = {nid: list(t) for nid, t in self.out.items()}
+        for parent, kids in self.children.items():
+            if parent in succ:
+                for kid in kids:
+                    succ[parent].append(kid)
+                    indeg[kid] += 1
+        self.succ = succ
+        queue = deque(nid for nid, d in indeg.items() if d == 0)
+        order = []
+        while queue:
+            nid = queue.popleft()
+            order.append(nid)
+            for tgt in succ[nid]:
+                indeg[tgt] -= 1
+                if indeg[tgt] == 0:
+                    queue.append(tgt)
+        if len(order) < len(self.nodes):
+            cyclic = sorted(nid for nid, d in indeg.items() if d > 0)
+            self.add(ERROR, "structure.3", "cycle", f"graph has a cycle through {len(cyclic)} node(s): {', '.join(cyclic[:5])}")
+        # 上流ノード集合（ビット集合）: ancestors[n] = OR(ancestors[p] | bit(p))。辺ごとに V ビットの OR で O(V·E/w)
+        bit = {nid: 1 << i for i, nid in enumerate(self.nodes)}
+        anc = {nid: 0 for nid in order}
+        for nid in order:
+            mask = anc[nid] | bit[nid]
+            for tgt in succ[nid]:
+                if tgt in anc:
+                    anc[tgt] |= mask
+        self.bit, self.ancestors = bit, anc
+        return order
+
+    def check_reachability(self):
+        # 子ノードはイテレーションの start_node_id から辿る（親→start_node_id を暗黙の辺とする）
+        succ = {nid: list(t) for nid, t in self.out.items()}
+        for parent in self.children:
+            start = ((self.nodes.get(parent) or {}).get("data") or {}).get("start_node_id")
+            if parent in succ and start in self.nodes:
+                succ[parent].append(start)
+        seen = set(self.starts)
+        queue = deque(self.starts)
+        while queue:
+            for tgt in succ[queue.popleft()]:
+                if tgt not in seen:
+                    seen.add(tgt)
+                    queue.append(tgt)
+        if self.starts:
+            for nid in self.nodes:
+                if nid not in seen:
+                    self.add(ERROR, "unreachable", "unreachable", f"{self.types[nid]} node is not reachable from start",
+                             node=nid)
+
+    # ── ノード設定 ──
+
+    def outputs_of(self, nid):
+        """参照可能な出力変数の集合（None = 検査しない）"""
+        t = self.types[nid]
+        data = self.nodes[nid].get("data") or {}
+        if t in FIXED_OUTPUTS:
+            outs = set(FIXED_OUTPUTS[t])
+            if t == "variable-aggregator" and (data.get("advanced_settings") or {}).get("group_enabled"):
+                outs |= {g.get("group_name") for g in data["advanced_settings"].get("groups") or [] if isinstance(g, dict)}
+            return outs
+        if t == "start":
+            return {v.get("variable") for v in data.get("variables") or [] if isinstance(v, dict)}
+        if t == "code":
+            return set(data.get("outputs") or {})
+        if t == "parameter-extractor":
+            return ({p.get("name") for p in data.get("parameters") or [] if isinstance(p, dict)}
+                    | {"__is_success", "__reason", "__usage"})
+        return None
+
+    def check_ref(self, nid, ref_node, var, how, key=None):
+        """nid から ref_node.var への参照を検査する"""
+        if ref_node in SPECIAL_SELECTORS:
+            if ref_node in ("env", "ENV") and self.env_vars is not None and var not in self.env_vars:
+                self.add(ERROR, "variables.8", "unknown-env-var", f"{how} references undefined env var {var!r}", node=nid)
+            elif ref_node == "conversation" and var not in self.conv_vars:
+                self.add(ERROR, "variables.8", "unknown-conversation-var",
+                         f"{how} references undefined conversation var {var!r}", node=nid)
+            return
+        if ref_node not in self.nodes:
+            self.add(ERROR, "variables.8", "ref-missing-node", f"{how} references missing node {ref_node}.{var}", node=nid)
+            return
+        base = var.split(".", 1)[0]
+        node = self.nodes[nid]
+        parent = node.get("parentId")
+        if key == "output_selector":
+            # Iteration の output_selector は自身の子ノードを指す
+            if self.nodes[ref_node].get("parentId") != nid:
+                self.add(ERROR, "variables.8", "output-selector-not-child",
+                         f"output_selector {ref_node}.{var} is not a child of this iteration", node=nid)
+        elif ref_node == parent and self.types[ref_node] == "iteration":
+            if base == "items":
+                self.add(ERROR, "design.30", "iteration-items", f"{how} uses {ref_node}.items; use .item for the current element",
+                         node=nid)
+            elif base not in ITERATION_ITEM_VARS:
+                self.add(ERROR, "variables.8", "ref-missing-output",
+                         f"{how} references {ref_node}.{var}; iteration children can use item/index", node=nid)
+            return
+        elif nid in self.ancestors and not (self.ancestors[nid] & self.bit[ref_node]):
+            self.add(ERROR, "variables.8", "ref-not-upstream", f"{how} references {ref_node}.{var} which is not upstream",
+                     node=nid)
+            return
+        outs = self.outputs_of(ref_node)
+        if outs is not None and base not in outs:
+            self.add(ERROR, "variables.8", "ref-missing-output",
+                     f"{how} references {ref_node}.{var} but {self.types[ref_node]} node has no output {base!r}", node=nid)
+
+    def check_nodes(self, order):
+        depth = {}
+        for nid in order:
+            parent = self.nodes[nid].get("parentId")
+            depth[nid] = depth.get(parent, 0) + 1 if parent else 0
+        for nid, n in self.nodes.items():
+            data = n.get("data") if isinstance(n.get("data"), dict) else {}
+            t = self.types[nid]
+
+            for key, sel in _iter_selectors(data):
+                if not sel and key == "variable_selector":
+                    continue  # context 無効時の空 selector
+                if len(sel) < 2 or not all(isinstance(s, str) for s in sel):
+                    self.add(ERROR, "variables.10", "bad-selector", f"{key} must be [NODE_ID, variable] (got {sel!r})",
+                             node=nid)
+                    continue
+                self.check_ref(nid, sel[0], ".".join(sel[1:]), key, key)
+            if t == "variable-aggregator":
+                for sel in data.get("variables") or []:
+                    if isinstance(sel, list) and len(sel) >= 2 and all(isinstance(s, str) for s in sel):
+                        self.check_ref(nid, sel[0], ".".join(sel[1:]), "variables")
+                    elif not isinstance(sel, dict):
+                        self.add(ERROR, "variables.10", "bad-selector", f"aggregator variable must be [NODE_ID, variable] (got {sel!r})",
+                                 node=nid)
+            for path, text in _iter_strings(data):
+                if "{{#" in text:
+                    for ref_node, var in TEMPLATE_REF.findall(text):
+                        self.check_ref(nid, ref_node, var, "{{#" + ref_node + "." + var + "#}}")
+                if SECRET.search(text):
+                    self.add(WARNING, "variables.11", "hardcoded-secret",
+                             f"possible hard-coded secret in data.{'.'.join(map(str, path))}", node=nid)
+
+            self.check_conversation_writes(nid, t, data)
+            check = getattr(self, "check_" + (t or "").replace("-", "_"), None)
+            if check:
+                check(nid, data)
+            if depth.get(nid, 0) > MAX_NESTING:
+                self.add(WARNING, "design.23", "nesting-depth", f"nesting depth {depth[nid]} exceeds {MAX_NESTING}", node=nid)
+
+    def check_conversation_writes(self, nid, t, data):
+        """変数を書き換える設定（assigned_variable_selector / assignments[].target / items[].variable_selector）"""
+        targets = [data.get("assigned_variable_selector")]
+        targets += [a.get("target") for a in data.get("assignments") or [] if isinstance(a, dict)]
+        targets += [i.get("variable_selector") for i in data.get("items") or []
+                    if isinstance(i, dict) and "operation" in i]
+        for target in targets:
+            if not isinstance(target, list) or not target:
+                continue
+            if len(target) == 1:  # 会話変数名だけの旧形式
+                target = ["conversation", target[0]]
+            if target[0] != "conversation":
+                continue
+            if t not in ASSIGNER_TYPES:
+                self.add(ERROR, "variables.12", "conversation-write-outside-assigner",
+                         f"{t} node writes conversation.{target[1]}; only variable-assigner may", node=nid)
+            elif self.mode != "advanced-chat":
+                self.add(ERROR, "variables.12", "conversation-var-in-workflow",
+                         f"conversation variables exist only in chatflows (app.mode is {self.mode})", node=nid)
+            elif len(target) >= 2 and target[1] not in self.conv_vars:
+                self.add(ERROR, "variables.12", "unknown-conversation-var",
+                         f"assigns undefined conversation var {target[1]!r}", node=nid)
+
+    def check_sensitive_words(self, swa):
+        if not isinstance(swa, dict) or not swa.get("enabled"):
+            return
+        rule = "sensitive-words"
+        kind = swa.get("type")
+        if kind not in MODERATION_TYPES:
+            self.add(ERROR, rule, "invalid-type", f"type must be one of {sorted(MODERATION_TYPES)} (got {kind!r})")
+        if "configs" in swa:
+            self.add(ERROR, rule, "configs-plural", "use config (singular), not configs")
+        config = swa.get("config")
+        if not isinstance(config, dict):
+            self.add(ERROR, rule, "config-not-mapping", f"config must be a mapping (got {type(config).__name__})")
+            return
+        if kind == "keywords":
+            keywords = config.get("keywords")
+            if not isinstance(keywords, str):
+                self.add(ERROR, rule, "keywords-not-string", "keywords must be a newline-separated string")
+            elif len(keywords.splitlines()) > MAX_KEYWORD_LINES or len(keywords) > MAX_KEYWORD_CHARS:
+                self.add(ERROR, rule, "too-many-keywords",
+                         f"keywords must be at most {MAX_KEYWORD_LINES} lines and {MAX_KEYWORD_CHARS} characters")
+        elif kind == "api" and not config.get("api_based_extension_id"):
+            self.add(ERROR, rule, "missing-extension-id", "api moderation requires config.api_based_extension_id")
+        for key in ("inputs_config", "outputs_config"):
+            preset = (config.get(key) or {}).get("preset_response") if isinstance(config.get(key), dict) else None
+            if isinstance(preset, str) and len(preset) > MAX_PRESET_RESPONSE:
+                self.add(ERROR, rule, "preset-response-too-long",
+                         f"{key}.preset_response is {len(preset)} characters (max {MAX_PRESET_RESPONSE})")
+
+    def check_end(self, nid, data):
+        if not data.get("outputs"):
+            self.add(ERROR, "end-outputs", "end-no-outputs", "end node has no outputs", node=nid)
+
+    def check_llm(self, nid, data):
+        model = data.get("model") or {}
+        if not model.get("provider") or not model.get("name"):
+            self.add(ERROR, "llm.13", "model-unset", "model.provider and model.name are required", node=nid)
+        params = model.get("completion_params") or {}
+        temp = params.get("temperature")
+        if temp is not None and not (isinstance(temp, (int, float)) and 0 <= temp <= 2):
+            self.add(ERROR, "llm.15", "temperature-range", f"temperature {temp!r} is outside 0..2", node=nid)
+        mt = params.get("max_tokens")
+        if mt is not None and not (isinstance(mt, int) and mt > 0):
+            self.add(ERROR, "llm.16", "max-tokens", f"max_tokens must be a positive integer (got {mt!r})", node=nid)
+        prompts = data.get("prompt_template")
+        if isinstance(prompts, dict):
+            prompts = [prompts] if "text" in prompts else None  # completion モード
+            if prompts is None:
+                self.add(ERROR, "llm.14", "prompt-template", "prompt_template must have text", node=nid)
+        elif not isinstance(prompts, list) or not prompts or not all(
+                isinstance(p, dict) and p.get("role") and "text" in p for p in prompts):
+            self.add(ERROR, "llm.14", "prompt-template", "prompt_template must be a list of {role, text}", node=nid)
+        memory = data.get("memory")
+        if memory is not None and not (isinstance(memory, dict) and "window" in memory and "role_prefix" in memory):
+            self.add(ERROR, "llm.17", "incomplete-memory",
+                     "memory must include window and role_prefix (or omit the key)", node=nid)
+
+    def check_knowledge_retrieval(self, nid, data):
+        for ds in data.get("dataset_ids") or []:
+            if not isinstance(ds, str) or PLACEHOLDER_ID.search(ds):
+                self.add(ERROR, "llm.18", "placeholder-dataset", f"dataset_ids contains a placeholder: {ds!r}", node=nid)
+        if not data.get("dataset_ids"):
+            self.add(ERROR, "llm.18", "placeholder-dataset", "dataset_ids is empty", node=nid)
+
+    def check_iteration(self, nid, data):
+        start = data.get("start_node_id")
+        kids = self.children.get(nid, [])
+        if not start:
+            self.add(ERROR, "design.24", "iteration-no-start", "iteration has no start_node_id", node=nid)
+        elif start not in kids:
+            self.add(ERROR, "design.24", "iteration-bad-start", f"start_node_id {start} is not a child of this iteration",
+                     node=nid)
+        nums = data.get("parallel_nums")
+        if data.get("is_parallel", data.get("parallel_mode")) and isinstance(nums, int) and nums > MAX_PARALLEL:
+            self.add(ERROR, "design.25", "iteration-parallelism", f"parallel_nums {nums} exceeds {MAX_PARALLEL}", node=nid)
+
+    def _ref_types(self, text):
+        return [(ref, var, self.types.get(ref)) for ref, var in TEMPLATE_REF.findall(text or "")]
+
+    def check_http_request(self, nid, data):
+        for ref, var, rtype in self._ref_types(data.get("url") if isinstance(data.get("url"), str) else ""):
+            if rtype == "iteration":
+                src = ((self.nodes[ref].get("data") or {}).get("iterator_selector") or [None])[0]
+                rtype = self.types.get(src)
+            if rtype not in (None, "code") and ref not in SPECIAL_SELECTORS:
+                self.add(WARNING, "design.27", "url-unencoded-input",
+                         f"URL embeds {ref}.{var} ({rtype}) without URL-encoding in a code node", node=nid)
+        body = data.get("body") if isinstance(data.get("body"), dict) else {}
+        if body.get("type") == "json":
+            raw = body.get("data")
+            raw = raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False)
+            for ref, var, rtype in self._ref_types(raw):
+                if rtype == "llm":
+                    self.add(WARNING, "design.28", "json-body-llm-output",
+                             f"JSON body embeds LLM output {ref}.{var}; build it with json.dumps in a code node", node=nid)
+
+    def check_if_else(self, nid, data):
+        conditions = list(data.get("conditions") or [])
+        for case in data.get("cases") or []:
+            if isinstance(case, dict):
+                conditions += case.get("conditions") or []
+        for cond in conditions:
+            if not isinstance(cond, dict):
+                continue
+            sel = cond.get("variable_selector") or []
+            if (sel and self.types.get(sel[0]) == "llm"
+                    and cond.get("comparison_operator") in ("contains", "not contains", "not-contains")):
+                self.add(WARNING, "design.29", "contains-on-llm-output",
+                         f"branches on free-form LLM output {sel[0]}.{sel[-1]} with {cond['comparison_operator']!r}; "
+                         f"extract with a code node and compare with 'is'", node=nid)
+
+
+def validate_doc(doc):
+    return GraphChecker(doc).run()
+
+
+def _validate_item(item):
+    path, doc, error = item
+    if error is not None:
+        return path, [{"severity": ERROR, "rule": "yaml", "code": "parse-error", "message": error,
+                       "node": None, "edge": None}]
+    return path, validate_doc(doc)
+
+
+def validate_corpus(paths=None, workers=1):
+    """[(path, issues)] をパス順に返す"""
+    corpus = dsl_corpus.load_corpus(paths, workers=workers)
+    items = [(p, d, None) for p, d in corpus.items()] + [(p, None, e) for p, e in corpus.errors.items()]
+    items.sort(key=lambda item: item[0])
+    workers = min(os.cpu_count() or 1, len(items)) if workers is None or workers <= 0 else workers
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_validate_item, items, chunksize=max(1, len(items) // (workers * 4))))
+    return [_validate_item(item) for item in items]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="検査する .yml（省略時は全コーパス）")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="並列数（0 = CPU コア数、1 = シリアル）")
+    parser.add_argument("--strict", action="store_true", help="warning でも終了コード 1 にする")
+    parser.add_argument("--errors-only", action="store_true", help="warning を表示しない")
+    args = parser.parse_args()
+
+    results = validate_corpus(args.paths or None, args.workers)
+    if args.errors_only:
+        results = [(p, [i for i in issues if i["severity"] == ERROR]) for p, issues in results]
+    counts = Counter(i["severity"] for _, issues in results for i in issues)
+    failed = counts[ERROR] > 0 or (args.strict and counts[WARNING] > 0)
+
+    if args.format == "json":
+        json.dump({
+            "files": [{"path": os.path.relpath(p, ROOT_DIR), "issues": issues} for p, issues in results],
+            "summary": {"files": len(results),
+                        "files_with_errors": sum(1 for _, iss in results if any(i["severity"] == ERROR for i in iss)),
+                        "errors": counts[ERROR], "warnings": counts[WARNING],
+                        "by_code": dict(Counter(i["code"] for _, iss in results for i in iss).most_common())},
+        }, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        for path, issues in results:
+            for i in issues:
+                where = i["node"] and f" node {i['node']}" or i["edge"] and f" edge {i['edge']}" or ""
+                print(f"{os.path.relpath(path, ROOT_DIR)}:{where} {i['severity']} [{i['rule']}/{i['code']}] {i['message']}")
+        print(f"\n{len(results)} files: {counts[ERROR]} errors, {counts[WARNING]} warnings")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
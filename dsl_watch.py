@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+DSL ウォッチモード: ソースを監視して、変更の影響を受けるワークフローだけを再生成・再検証する
+
+ポーリング（os.scandir + stat の (mtime_ns, size) 比較）だけで動き、inotify などの
+OS 固有の仕組みや追加パッケージは使わない。変更の種類ごとの処理:
+
+  ジェネレーター（gen_batch1.py など dify_gen.SOURCES のモジュール）
+      → モジュールを reload して dify_gen の対象を作り直し、gen_build.write_jobs で生成。
+        マニフェストが入力ハッシュを比較するので、書き換えた cfg の分だけが出力される
+  共有モジュール（workflow_engine.py / gen_layout.py / gen_graph.py / dsl_yaml.py など）
+      → import 関係（ast で静的に解析）を辿って、依存するジェネレーターをすべて再生成
+        （gen_build.job_version が import 先のソースもハッシュするので、マニフェストも無効になる）
+  dsl_validate.py
+      → reload してコーパス全体を再検証
+  .yml（industry/banking の手書き DSL、生成済みファイルの手修正など）
+      → そのファイルだけを再検証
+  再生成で書き換わった .yml も再検証する。検証は dsl_validate（解析は dsl_corpus のキャッシュ経由）。
+
+  python dsl_watch.py                 # Ctrl-C で終了
+  python dsl_watch.py --interval 0.1  # ポーリング間隔（秒）
+  python dsl_watch.py --once          # 起動時に全件を生成・検証して終了（CI 用、エラーがあれば終了コード 1）
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dify_gen
+import dsl_corpus
+import dsl_validate
+import gen_build
+
+# 監視するディレクトリ（.py はルートと ai-solutions のみ、.yml はコーパス全体）
+PY_DIRS = (ROOT_DIR, dify_gen.AI_SOLUTIONS_DIR)
+YML_DIRS = tuple(os.path.join(ROOT_DIR, d) for d in dsl_corpus.CORPUS_DIRS)
+SKIP_DIRS = {".git", "__pycache__", ".dsl-cache", "test-env", "node_modules"}
+
+
+def _scan(path, suffix, recursive, stamps):
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if recursive and entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                _scan(entry.path, suffix, recursive, stamps)
+        elif entry.name.endswith(suffix):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stamps[entry.path] = (st.st_mtime_ns, st.st_size)
+
+
+def snapshot():
+    """{絶対パス: (mtime_ns, size)}"""
+    stamps = {}
+    for d in PY_DIRS:
+        _scan(d, ".py", False, stamps)
+    for d in YML_DIRS:
+        _scan(d, ".yml", True, stamps)
+    return stamps
+
+
+def local_modules():
+    """{モジュール名: ファイルパス}（監視対象ディレクトリ直下の .py）"""
+    modules = {}
+    for d in PY_DIRS:
+        for name in os.listdir(d):
+            if name.endswith(".py"):
+                modules.setdefault(name[:-3], os.path.join(d, name))
+    return modules
+
+
+def import_graph(modules):
+    """{モジュール名: そのモジュールが import するローカルモジュール名の集合}"""
+    return {name: (gen_build.imported_modules(path) & modules.keys()) - {name} for name, path in modules.items()}
+
+
+def dependents(graph, changed):
+    """changed とそれに（推移的に）依存するモジュールを、依存される側が先になる順で返す"""
+    rdeps = {}
+    for name, deps in graph.items():
+        for dep in deps:
+            rdeps.setdefault(dep, set()).add(name)
+    affected, stack = set(changed), list(changed)
+    while stack:
+        for user in rdeps.get(stack.pop(), ()):
+            if user not in affected:
+                affected.add(user)
+                stack.append(user)
+    order, done = [], set()
+
+    def visit(name):
+        if name in done:
+            return
+        done.add(name)
+        for dep in sorted(graph.get(name, ())):
+            if dep in affected:
+                visit(dep)
+        order.append(name)
+    for name in sorted(affected):
+        visit(name)
+    return order
+
+
+class Watcher:
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.modules = local_modules()
+        self.graph = import_graph(self.modules)
+        self.paths = {path: name for name, path in self.modules.items()}
+        self.stamps = snapshot()
+        self.last_build = (0, 0)   # 直近の regenerate の (生成件数, スキップ件数)
+
+    def poll(self):
+        """前回からの変更 (変更・追加された .py, .yml, 削除されたパス)"""
+        stamps = snapshot()
+        changed = [p for p, s in stamps.items() if self.stamps.get(p) != s]
+        removed = [p for p in self.stamps if p not in stamps]
+        self.stamps = stamps
+        return ([p for p in changed if p.endswith(".py")], [p for p in changed if p.endswith(".yml")], removed)
+
+    def reload(self, names):
+        """変更のあったモジュールと依存モジュールを依存順に reload する。失敗したモジュール名を返す"""
+        failed = []
+        for name in names:
+            mod = sys.modules.get(name)
+            if mod is None or name == "__main__":
+                continue
+            try:
+                importlib.reload(mod)
+            except Exception as e:  # 編集途中の構文エラーなど。次の保存で再試行される
+                print(f"  ! reload {name}: {type(e).__name__}: {e}")
+                failed.append(name)
+        gen_build._VERSIONS.clear()
+        gen_build._ORIGINS.clear()
+        return failed
+
+    def regenerate(self, source_modules):
+        """
+        ジェネレーターを実行し、書き換えられた .yml の絶対パスを返す。
+        マニフェストで最新と判定された（入力ハッシュが変わらない）ワークフローは生成しない
+        """
+        before = dict(self.stamps)
+        built = skipped = 0
+        for module in source_modules:
+            out_rel = next(out for m, out, _ in dify_gen.SOURCES if m == module)
+            targets = [t for t in dify_gen.discover(categories=[out_rel]) if t["source"] == module]
+            print(f"  = {module} → {out_rel} ({len(targets)} workflows)")
+            n = gen_build.write_jobs([t["job"] for t in targets], targets[0]["out_dir"], workers=self.workers,
+                                     label="    ✓ {}", prune=True)
+            built += n
+            skipped += len(targets) - n
+        print(f"  → regenerated: {built} built, {skipped} skipped (up to date)")
+        self.last_build = (built, skipped)
+        # 生成物は次回のポーリングで「変更」として拾わないよう、ここでスナップショットを取り直す
+        self.stamps = snapshot()
+        return [p for p, s in self.stamps.items() if p.endswith(".yml") and before.get(p) != s]
+
+    def handle(self, changed_py, changed_yml):
+        """1 回分の変更を処理し、検証結果 [(path, issues)] を返す"""
+        names = {self.paths[p] for p in changed_py if p in self.paths}
+        new = [p for p in changed_py if p not in self.paths]
+        if new:  # 新規モジュール: 索引と import グラフを作り直す
+            self.modules = local_modules()
+            self.paths = {path: name for name, path in self.modules.items()}
+            names |= {self.paths[p] for p in new if p in self.paths}
+        if names:
+            self.graph = import_graph(self.modules)
+        affected = dependents(self.graph, names)
+        failed = set(self.reload(affected))
+
+        to_validate = set(changed_yml)
+        if "dsl_validate" in affected and "dsl_validate" not in failed:
+            to_validate.update(dsl_corpus.corpus_files())
+        sources = [m for m, _, _ in dify_gen.SOURCES if m in affected and m not in failed]
+        if sources:
+            try:
+                to_validate.update(self.regenerate(sources))
+            except Exception as e:
+                print(f"  ! generate: {type(e).__name__}: {e}")
+                self.stamps = snapshot()
+        return validate(sorted(to_validate))
+
+
+def validate(paths):
+    if not paths:
+        return []
+    corpus = dsl_corpus.load_corpus(paths, workers=1)
+    results = [(p, [{"severity": dsl_validate.ERROR, "rule": "yaml", "code": "parse-error", "message": e,
+                     "node": None, "edge": None}]) for p, e in corpus.errors.items()]
+    results += [(p, dsl_validate.validate_doc(doc)) for p, doc in corpus.items()]
+    return sorted(results, key=lambda r: r[0])
+
+
+def report(results, elapsed, verbose=False):
+    counts = Counter(i["severity"] for _, issues in results for i in issues)
+    for path, issues in results:
+        rel = os.path.relpath(path, ROOT_DIR)
+        if not issues and verbose:
+            print(f"  ok {rel}")
+        for i in issues:
+            where = i["node"] and f" node {i['node']}" or i["edge"] and f" edge {i['edge']}" or ""
+            print(f"  {rel}:{where} {i['severity']} [{i['rule']}/{i['code']}] {i['message']}")
+    print(f"  → {len(results)} validated: {counts[dsl_validate.ERROR]} errors, "
+          f"{counts[dsl_validate.WARNING]} warnings ({elapsed * 1000:.0f} ms)", flush=True)
+    return counts[dsl_validate.ERROR]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=0.2, help="ポーリング間隔（秒、既定 0.2）")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="再生成の並列ワーカー数（0 = CPU コア数、既定 1 = シリアル）")
+    parser.add_argument("--once", action="store_true", help="全件を生成・検証して終了する")
+    parser.add_argument("-v", "--verbose", action="store_true", help="問題のないファイルも表示する")
+    args = parser.parse_args()
+
+    watcher = Watcher(args.workers)
+    if args.once:
+        t0 = time.perf_counter()
+        to_validate = set(watcher.regenerate([m for m, _, _ in dify_gen.SOURCES])) | set(dsl_corpus.corpus_files())
+        errors = report(validate(sorted(to_validate)), time.perf_counter() - t0, args.verbose)
+        sys.exit(1 if errors else 0)
+
+    print(f"watching {len(watcher.stamps)} files every {args.interval}s (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(args.interval)
+            changed_py, changed_yml, removed = watcher.poll()
+            if not (changed_py or changed_yml or removed):
+                continue
+            t0 = time.perf_counter()
+            print(f"[{time.strftime('%H:%M:%S')}] "
+                  + ", ".join(os.path.relpath(p, ROOT_DIR) for p in changed_py + changed_yml + removed))
+            report(watcher.handle(changed_py, changed_yml), time.perf_counter() - t0, args.verbose)
+    except KeyboardInterrupt:
+        print()
+
+
+if __name__ == "__main__":
+    main()
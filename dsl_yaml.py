@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Dify DSL YAML 出力レイヤー（gen_core / workflow_engine / generate_all 共通）
+
+改行を含む文字列はシリアライズ時に判定してリテラルブロック（|）で出力する。
+文書ツリーを事前にコピーして LiteralStr に包む convert_multiline は不要。
+
+libyaml が使える環境では C エミッター（yaml.CDumper）で出力し、使えなければ
+純 Python の yaml.Dumper にフォールバックする。どちらでも出力はバイト単位で同一:
+  - libyaml は U+10000 以上の文字（絵文字アイコン等）を \\U エスケープしてしまうため、
+    表現時に私用領域の文字へ一時的に置き換え、出力後に元へ戻す
+  - ブロックスタイルにできない複数行文字列や制御文字など、両エミッターの
+    クォート・折り返し規則が一致する保証のない文字列を含む文書は純 Python で出力する
+同一性は dsl_golden.py で catalog/・industry/・samples/ の全ファイルについて検証する。
+
+gen_graph の Graph / Node / Edge は出力時に to_dsl() で DSL の dict に展開する。
+"""
+import os
+import re
+
+import yaml
+
+from gen_graph import Edge, Graph, Node
+
+STR_TAG = 'tag:yaml.org,2002:str'
+
+DUMP_OPTIONS = dict(default_flow_style=False, allow_unicode=True, sort_keys=False, width=200)
+
+
+class BlockStyleDumper(yaml.Dumper):
+    """改行を含む文字列をリテラルブロックスタイルで表現する Dumper"""
+
+    def represent_str(self, data):
+        if '\n' in data:
+            return self.represent_scalar(STR_TAG, data, style='|')
+        return self.represent_scalar(STR_TAG, data)
+
+
+def represent_graph_object(dumper, obj):
+    return dumper.represent_dict(obj.to_dsl())
+
+
+GRAPH_TYPES = (Graph, Node, Edge)
+
+BlockStyleDumper.add_representer(str, BlockStyleDumper.represent_str)
+for _cls in GRAPH_TYPES:
+    BlockStyleDumper.add_representer(_cls, represent_graph_object)
+
+
+try:
+    from yaml import CDumper as _CDumper
+except ImportError:  # libyaml なしでビルドされた PyYAML
+    _CDumper = None
+
+# DSL_YAML_PURE=1 で C エミッターを無効化（比較・切り分け用）
+HAS_LIBYAML = _CDumper is not None and not os.environ.get('DSL_YAML_PURE')
+
+_ASTRAL = re.compile('[\\U00010000-\\U0010FFFF]')
+_PUA_FIRST, _PUA_LAST = 0xE000, 0xF8FF
+# 純 Python と libyaml で表現が一致する保証がない文字（制御文字・タブ・CR・NEL・行/段落区切り・
+# BOM・サロゲート）と、マスク用に予約する私用領域
+_UNSAFE_CHARS = re.compile('[\\x00-\\x09\\x0b-\\x1f\\x7f-\\x9f\\u2028\\u2029\\ud800-\\udfff'
+                           '\\ufeff\\ufffe\\uffff\\ue000-\\uf8ff]')
+
+
+class _NeedsPurePython(Exception):
+    """C エミッターでは純 Python と同一出力にならない可能性がある文書"""
+
+
+def _block_safe(data):
+    """PyYAML がそのままリテラルブロックで出せる複数行文字列か（インデント指示子の付く先頭空白/改行は除外）"""
+    return not (' \n' in data or data.endswith(' ') or data.startswith((' ', '\n')))
+
+
+if _CDumper is not None:
+    class CBlockStyleDumper(_CDumper):
+        """BlockStyleDumper と同一出力になる範囲でのみ使う libyaml 版"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.masked = {}
+
+        def represent_str(self, data):
+            if _UNSAFE_CHARS.search(data):
+                raise _NeedsPurePython
+            if not data.isascii() and _ASTRAL.search(data):
+                data = _ASTRAL.sub(self._mask, data)
+            if '\n' in data:
+                if not _block_safe(data):
+                    raise _NeedsPurePython
+                return self.represent_scalar(STR_TAG, data, style='|')
+            return self.represent_scalar(STR_TAG, data)
+
+        def _mask(self, match):
+            ch = match.group()
+            if ch not in self.masked:
+                code = _PUA_FIRST + len(self.masked)
+                if code > _PUA_LAST:
+                    raise _NeedsPurePython
+                self.masked[ch] = chr(code)
+            return self.masked[ch]
+
+    CBlockStyleDumper.add_representer(str, CBlockStyleDumper.represent_str)
+    for _cls in GRAPH_TYPES:
+        CBlockStyleDumper.add_representer(_cls, represent_graph_object)
+
+
+def dump_pure(doc):
+    """純 Python エミッターで YAML 文字列を返す（基準実装）"""
+    return yaml.dump(doc, Dumper=BlockStyleDumper, **DUMP_OPTIONS)
+
+
+def dump_accelerated(doc):
+    """libyaml で YAML 文字列を返す。libyaml がない・同一出力を保証できない文書は None"""
+    if not HAS_LIBYAML:
+        return None
+    dumpers = []
+
+    def make_dumper(*args, **kwargs):
+        dumpers.append(CBlockStyleDumper(*args, **kwargs))
+        return dumpers[-1]
+
+    try:
+        text = yaml.dump(doc, Dumper=make_dumper, **DUMP_OPTIONS)
+    except _NeedsPurePython:
+        return None
+    masked = dumpers[0].masked
+    if masked:
+        text = text.translate({ord(v): k for k, v in masked.items()})
+    return text
+
+
+def dump(doc, stream=None):
+    """DSL 文書を YAML 化する（可能なら libyaml）。stream 省略時は文字列を返す"""
+    text = dump_accelerated(doc)
+    if text is None:
+        text = dump_pure(doc)
+    if stream is None:
+        return text
+    stream.write(text)
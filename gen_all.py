@@ -1,20 +1,47 @@
 #!/usr/bin/env python3
-"""全50ワークフローの定義と生成"""
+"""
+全50ワークフロー（AIS-121〜170）の定義と生成
+
+import 時は定義（メタデータ）を REGISTRY に登録するだけで、DSL の組み立てや
+YAML の書き込みは行わない。カタログ資料・検証・統計などのツールは
+  import gen_all
+  for w in gen_all.workflows('energy'): print(w.num, w.name)
+  dsl = gen_all.materialize(147)          # 必要なものだけ DSL dict を組み立てる
+のように安価に列挙できる。YAML の生成は python gen_all.py（または dify_gen.py）。
+"""
 import sys, os
 sys.path.insert(0, os.path.dirname(__file__))
 from gen_core import *
+import gen_core
+from gen_graph import export_doc
+
+CATEGORIES = ['cross-functional', 'automotive', 'pharma', 'energy', 'travel', 'agriculture']
+
+# AIS 番号 → WorkflowDef（登録順）
+REGISTRY = {}
 
 def V(name, vtype, required=True, options=None, ml=None):
     return make_var(name, vtype, required, options, ml)
 
-def build(cat, num, slug, name, icon, bg, desc, vars_, main_var, sys_p, usr_p, out_t):
-    dsl = gen_workflow(num, slug, name, icon, bg, desc, vars_, main_var, sys_p, usr_p, out_t)
-    save_workflow(cat, num, slug, dsl)
+def register(cat, num, slug, name, icon, bg, desc, vars_, main_var, sys_p, usr_p, out_t):
+    if num in REGISTRY:
+        raise ValueError(f"AIS-{num} is already registered ({REGISTRY[num].slug})")
+    REGISTRY[num] = WorkflowDef(cat, num, slug, name, icon, bg, desc, vars_, main_var, sys_p, usr_p, out_t)
+
+def workflows(category=None):
+    return [w for w in REGISTRY.values() if category is None or w.category == category]
+
+def materialize(num):
+    return export_doc(workflow_dsl(REGISTRY[num]))
+
+def catalog_jobs(defs=None):
+    """gen_build.write_jobs 用のジョブリスト（出力先は catalog/ からの相対パス）"""
+    return [(workflow_relpath(w.category, w.num, w.slug), gen_core.render_definition, w, 'gen_all')
+            for w in (workflows() if defs is None else defs)]
 
 # ═══ CROSS-FUNCTIONAL (121-130) ═══
-print("=== Cross-Functional ===")
 
-build('cross-functional', 121, 'document-proofreading', 'AI文書校正・品質改善', '✏️', '#E3F2FD',
+register('cross-functional', 121, 'document-proofreading', 'AI文書校正・品質改善', '✏️', '#E3F2FD',
     'ビジネス文書の誤字脱字・文法・表現・トーンを分析しスコア付きで改善提案を行う。Grammarly/文賢に相当する機能。',
     [V('document_text','paragraph'), V('document_type','select',True,['ビジネスメール','報告書','提案書','プレスリリース']),
      V('tone','select',True,['フォーマル','カジュアル','ニュートラル'])],
@@ -45,7 +72,7 @@ build('cross-functional', 121, 'document-proofreading', 'AI文書校正・品質
     '文書タイプ: {{#' + nid(121,1) + '.document_type#}}\nトーン: {{#' + nid(121,1) + '.tone#}}\n\n校正対象の文書:\n{{#' + nid(121,1) + '.document_text#}}',
     'AI文書校正レポート')
 
-build('cross-functional', 122, 'sales-call-analysis', '商談録音AI分析・コーチング', '🎙️', '#FFF3E0',
+register('cross-functional', 122, 'sales-call-analysis', '商談録音AI分析・コーチング', '🎙️', '#FFF3E0',
     '商談の文字起こしテキストを入力し、トーク比率・キーワード・ネクストアクション・コーチングポイントを分析する。',
     [V('transcript_text','paragraph'), V('deal_stage','select',True,['初回商談','提案','クロージング','フォロー'])],
     'transcript_text',
@@ -67,7 +94,7 @@ build('cross-functional', 122, 'sales-call-analysis', '商談録音AI分析・
     '商談ステージ: {{#' + nid(122,1) + '.deal_stage#}}\n\n商談文字起こし:\n{{#' + nid(122,1) + '.transcript_text#}}',
     '商談AI分析レポート')
 
-build('cross-functional', 123, 'multilingual-localization', '多言語翻訳・ローカライズ', '🌐', '#E8F5E9',
+register('cross-functional', 123, 'multilingual-localization', '多言語翻訳・ローカライズ', '🌐', '#E8F5E9',
     '文化的コンテキストを考慮したローカライズ翻訳を行う。DeepL/WOVNに相当する機能。',
     [V('source_text','paragraph'), V('source_lang','select',True,['日本語','英語','中国語','韓国語']),
      V('target_lang','select',True,['英語','日本語','中国語','韓国語']), V('context','text-input',False)],
@@ -92,7 +119,7 @@ build('cross-functional', 123, 'multilingual-localization', '多言語翻訳・
     '原文言語: {{#' + nid(123,1) + '.source_lang#}}\n翻訳先言語: {{#' + nid(123,1) + '.target_lang#}}\nコンテキスト: {{#' + nid(123,1) + '.context#}}\n\n原文:\n{{#' + nid(123,1) + '.source_text#}}',
     '多言語ローカライズ結果')
 
-build('cross-functional', 124, 'invoice-journal-entry', '請求書AI読取→仕訳提案', '🧾', '#FFF8E1',
+register('cross-functional', 124, 'invoice-journal-entry', '請求書AI読取→仕訳提案', '🧾', '#FFF8E1',
     '請求書テキストから取引先・金額・勘定科目を抽出し仕訳ドラフトを生成する。',
     [V('invoice_text','paragraph'), V('accounting_standard','select',True,['日本基準','IFRS'])],
     'invoice_text',
@@ -115,7 +142,7 @@ build('cross-functional', 124, 'invoice-journal-entry', '請求書AI読取→仕
     '会計基準: {{#' + nid(124,1) + '.accounting_standard#}}\n\n請求書テキスト:\n{{#' + nid(124,1) + '.invoice_text#}}',
     '仕訳ドラフト')
 
-build('cross-functional', 125, 'brand-monitoring', 'SNSブランドモニタリング', '📱', '#F3E5F5',
+register('cross-functional', 125, 'brand-monitoring', 'SNSブランドモニタリング', '📱', '#F3E5F5',
     'ブランドに関するSNSデータを分析し、言及分析・感情推移・リスク検知レポートを生成する。',
     [V('brand_name','text-input'), V('monitoring_period','select',True,['直近1週間','直近1ヶ月','直近3ヶ月']),
      V('sns_data','paragraph')],
@@ -138,7 +165,7 @@ build('cross-functional', 125, 'brand-monitoring', 'SNSブランドモニタリ
     'ブランド名: {{#' + nid(125,1) + '.brand_name#}}\n分析期間: {{#' + nid(125,1) + '.monitoring_period#}}\n\nSNSデータ:\n{{#' + nid(125,1) + '.sns_data#}}',
     'ブランドモニタリングレポート')
 
-build('cross-functional', 126, 'lead-scoring', 'リードスコアリング', '🎯', '#E8EAF6',
+register('cross-functional', 126, 'lead-scoring', 'リードスコアリング', '🎯', '#E8EAF6',
     'リード情報をスコアリングし優先対応リストを生成する。',
     [V('lead_info','paragraph'), V('scoring_criteria','select',True,['BANT','MEDDIC','CHAMP'])],
     'lead_info',
@@ -158,7 +185,7 @@ build('cross-functional', 126, 'lead-scoring', 'リードスコアリング', '
     'スコアリング基準: {{#' + nid(126,1) + '.scoring_criteria#}}\n\nリード情報:\n{{#' + nid(126,1) + '.lead_info#}}',
     'リードスコアリングレポート')
 
-build('cross-functional', 127, 'rfp-response', 'RFP自動回答ジェネレーター', '📋', '#E0F2F1',
+register('cross-functional', 127, 'rfp-response', 'RFP自動回答ジェネレーター', '📋', '#E0F2F1',
     'RFP質問項目に対し自社情報に基づいた根拠付き回答ドラフトを生成する。',
     [V('rfp_questions','paragraph'), V('company_info','paragraph'), V('product_info','paragraph')],
     'rfp_questions',
@@ -178,7 +205,7 @@ build('cross-functional', 127, 'rfp-response', 'RFP自動回答ジェネレー
     'RFP質問:\n{{#' + nid(127,1) + '.rfp_questions#}}\n\n自社情報:\n{{#' + nid(127,1) + '.company_info#}}\n\n製品情報:\n{{#' + nid(127,1) + '.product_info#}}',
     'RFP回答ドラフト')
 
-build('cross-functional', 128, 'esg-report', 'ESGレポート生成', '🌱', '#E8F5E9',
+register('cross-functional', 128, 'esg-report', 'ESGレポート生成', '🌱', '#E8F5E9',
     'ESGデータからガイドライン準拠のレポートドラフトを生成する。',
     [V('esg_data','paragraph'), V('reporting_standard','select',True,['GRI','SASB','TCFD','統合報告']),
      V('fiscal_year','text-input')],
@@ -200,7 +227,7 @@ build('cross-functional', 128, 'esg-report', 'ESGレポート生成', '🌱', '#
     '報告基準: {{#' + nid(128,1) + '.reporting_standard#}}\n対象年度: {{#' + nid(128,1) + '.fiscal_year#}}\n\nESGデータ:\n{{#' + nid(128,1) + '.esg_data#}}',
     'ESGレポートドラフト')
 
-build('cross-functional', 129, 'dashboard-narrative', '経営ダッシュボードナラティブ', '📊', '#E3F2FD',
+register('cross-functional', 129, 'dashboard-narrative', '経営ダッシュボードナラティブ', '📊', '#E3F2FD',
     'KPIデータから経営層向けの「数字が語るストーリー」ナラティブレポートを生成する。',
     [V('kpi_data','paragraph'), V('report_period','select',True,['月次','四半期','年次']),
      V('audience','select',True,['経営会議','取締役会','全社'])],
@@ -222,7 +249,7 @@ build('cross-functional', 129, 'dashboard-narrative', '経営ダッシュボー
     'レポート期間: {{#' + nid(129,1) + '.report_period#}}\n対象: {{#' + nid(129,1) + '.audience#}}\n\nKPIデータ:\n{{#' + nid(129,1) + '.kpi_data#}}',
     '経営ナラティブレポート')
 
-build('cross-functional', 130, 'policy-revision', '社内規程AI検索・改訂ドラフト', '📜', '#FFF3E0',
+register('cross-functional', 130, 'policy-revision', '社内規程AI検索・改訂ドラフト', '📜', '#FFF3E0',
     '現行規程と法改正情報を照合し改訂ドラフトと改訂理由を生成する。',
     [V('current_policy','paragraph'), V('revision_reason','paragraph'), V('applicable_law','text-input')],
     'current_policy',
@@ -243,7 +270,6 @@ build('cross-functional', 130, 'policy-revision', '社内規程AI検索・改訂
     '規程改訂ドラフト')
 
 # ═══ AUTOMOTIVE (131-138) ═══
-print("=== Automotive ===")
 
 AUTO = [
     (131,'drbfm-analysis','品質不具合分析レポート(DRBFM)','🔍','#FFEBEE',
@@ -301,10 +327,9 @@ AUTO = [
 
 for num,slug,name,icon,bg,desc,vars_,main_var,usr_tmpl,sys_p in AUTO:
     usr = usr_tmpl.replace('ID', nid(num,1))
-    build('automotive',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
+    register('automotive',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
 
 # ═══ PHARMA (139-146) ═══
-print("=== Pharma ===")
 
 PHARMA = [
     (139,'clinical-protocol-summary','治験プロトコル要約生成','🧪','#E8EAF6',
@@ -362,10 +387,9 @@ PHARMA = [
 
 for num,slug,name,icon,bg,desc,vars_,main_var,usr_tmpl,sys_p in PHARMA:
     usr = usr_tmpl.replace('ID', nid(num,1))
-    build('pharma',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
+    register('pharma',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
 
 # ═══ ENERGY (147-154) ═══
-print("=== Energy ===")
 
 ENERGY = [
     (147,'plant-inspection','プラント巡視点検レポート','🏗️','#E3F2FD',
@@ -425,10 +449,9 @@ ENERGY = [
 
 for num,slug,name,icon,bg,desc,vars_,main_var,usr_tmpl,sys_p in ENERGY:
     usr = usr_tmpl.replace('ID', nid(num,1))
-    build('energy',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
+    register('energy',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
 
 # ═══ TRAVEL (155-162) ═══
-print("=== Travel ===")
 
 TRAVEL = [
     (155,'travel-plan','旅行プラン自動提案','✈️','#E3F2FD',
@@ -488,10 +511,9 @@ TRAVEL = [
 
 for num,slug,name,icon,bg,desc,vars_,main_var,usr_tmpl,sys_p in TRAVEL:
     usr = usr_tmpl.replace('ID', nid(num,1))
-    build('travel',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
+    register('travel',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
 
 # ═══ AGRICULTURE (163-170) ═══
-print("=== Agriculture ===")
 
 AGRI = [
     (163,'cultivation-record','栽培記録・出荷記録生成','🌾','#E8F5E9',
@@ -549,13 +571,17 @@ AGRI = [
 
 for num,slug,name,icon,bg,desc,vars_,main_var,usr_tmpl,sys_p in AGRI:
     usr = usr_tmpl.replace('ID', nid(num,1))
-    build('agriculture',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
-
-# ═══ SUMMARY ═══
-print("\n=== Generation Complete ===")
-import glob
-total = len(glob.glob(os.path.join(BASE, '**', 'ais-*.yml'), recursive=True))
-print(f"Total YAML files generated: {total}")
-for cat in ['cross-functional','automotive','pharma','energy','travel','agriculture']:
-    count = len(glob.glob(os.path.join(BASE, cat, 'ais-*.yml')))
-    print(f"  {cat}: {count} files")
+    register('agriculture',num,slug,name,icon,bg,desc,vars_,main_var,sys_p,usr,name)
+
+# ═══ 生成 ═══
+if __name__ == '__main__':
+    import glob
+    from gen_build import batch_arg_parser, write_jobs
+    args = batch_arg_parser(__doc__).parse_args()
+    write_jobs(catalog_jobs(), BASE, workers=args.workers, label="  Created: {}", force=args.force)
+    print("\n=== Generation Complete ===")
+    total = len(glob.glob(os.path.join(BASE, '**', 'ais-*.yml'), recursive=True))
+    print(f"Total YAML files generated: {total}")
+    for cat in CATEGORIES:
+        count = len(glob.glob(os.path.join(BASE, cat, 'ais-*.yml')))
+        print(f"  {cat}: {count} files")
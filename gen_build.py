@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+DSL YAML 一括生成の共通ランナー（gen_all / workflow_engine / dify_gen 共通）
+
+ジョブは (filename, func, arg, scope) のタプル:
+  filename : out_dir からの相対パス（/ 区切り）
+  func(arg): DSL YAML テキストを返すモジュールレベル関数（ワーカープロセスから import できること）
+  scope    : 定義元（gen_all, gen_batch1 …）。定義が消えたファイルの削除範囲になる
+
+write_jobs は .gen-manifest.json（gen_manifest）で入力ハッシュを比較して変更分だけを生成し、
+workers > 1 ならプロセスプールで並列化する。書き込みとログ出力は入力順。
+"""
+import argparse
+import ast
+import importlib.util
+import os
+import sys
+import sysconfig
+from concurrent.futures import ProcessPoolExecutor
+
+import dsl_yaml
+import gen_manifest
+from gen_manifest import MANIFEST_NAME, Manifest, input_digest, source_version
+
+
+def _run_job(job):
+    func, arg = job
+    return func(arg)
+
+
+def resolve_workers(workers):
+    """ワーカー数を正規化する（0 以下は CPU コア数）"""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def render_jobs(jobs, workers=1):
+    """
+    (func, arg) のリストを評価し、入力順のままテキストを返すイテレータ。
+    workers > 1 のときはプロセスプールに分散するが、結果の順序は常に入力順。
+    """
+    workers = min(resolve_workers(workers), len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            yield _run_job(job)
+        return
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_run_job, jobs, chunksize=chunksize)
+
+
+_VERSIONS = {}
+_ORIGINS = {}   # モジュール名 → ローカルなソースファイルのパス（標準ライブラリ・site-packages・未発見は None）
+_LIBRARY_DIRS = tuple(os.path.abspath(p) + os.sep for k, p in sysconfig.get_paths().items()
+                      if k in ("stdlib", "platstdlib", "purelib", "platlib"))
+
+
+def imported_modules(path):
+    """ソースファイルが import するトップレベルのモジュール名の集合（ast で静的に解析。関数内の import も含む）"""
+    names = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return names
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def _local_origin(name):
+    if name not in _ORIGINS:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        origin = spec.origin if spec is not None and spec.has_location else None
+        if origin is not None and (not origin.endswith(".py") or origin.startswith(_LIBRARY_DIRS)):
+            origin = None
+        _ORIGINS[name] = origin and os.path.abspath(origin)
+    return _ORIGINS[name]
+
+
+def local_sources(path):
+    """path と、そこから推移的に import するローカルモジュール（標準ライブラリ・site-packages 以外）のパスの集合"""
+    seen, stack = {os.path.abspath(path)}, [os.path.abspath(path)]
+    while stack:
+        for name in imported_modules(stack.pop()):
+            origin = _local_origin(name)
+            if origin is not None and origin not in seen:
+                seen.add(origin)
+                stack.append(origin)
+    return seen
+
+
+def job_version(func):
+    """
+    func を定義しているモジュールと、それが推移的に import するローカルモジュール（gen_layout /
+    gen_graph / workflow_engine など）+ 出力レイヤー + 本ランナーのソースから算出するバージョン
+    """
+    path = os.path.abspath(sys.modules[func.__module__].__file__)
+    if path not in _VERSIONS:
+        paths = local_sources(path) | {os.path.abspath(__file__), os.path.abspath(dsl_yaml.__file__),
+                                       os.path.abspath(gen_manifest.__file__)}
+        _VERSIONS[path] = source_version(*sorted(paths))
+    return _VERSIONS[path]
+
+
+def job_digest(func, arg):
+    # __main__ 実行時もモジュール import 時も同じハッシュになるよう、モジュール名ではなくファイル名を使う
+    module_file = os.path.basename(sys.modules[func.__module__].__file__)
+    return input_digest([module_file, func.__qualname__, arg], job_version(func))
+
+
+def write_jobs(jobs, out_dir, workers=1, label="  ✓ {}", force=False, prune=True):
+    """
+    ジョブをインクリメンタルに生成・書き込みし、生成件数を返す。
+
+    out_dir/.gen-manifest.json に入力ハッシュを記録し、変更のないものはスキップする
+    （force=True で全件再生成）。prune=True なら今回のジョブに含まれる scope で
+    定義が消えたファイルを削除する（一部だけを選んで生成するときは False にする）。
+    ファイル書き込みとログ出力はメインプロセスが入力順に行うため、
+    出力ファイルもコンソールログもシリアル実行と同一になる。
+    """
+    manifest = Manifest(os.path.join(out_dir, MANIFEST_NAME))
+    pending = []
+    for filename, func, arg, scope in jobs:
+        digest = job_digest(func, arg)
+        if not force and manifest.is_current(filename, digest):
+            manifest.skip(filename, scope)
+        else:
+            pending.append((filename, func, arg, scope, digest))
+
+    rendered = render_jobs([(func, arg) for _, func, arg, _, _ in pending], workers)
+    for (filename, _, _, scope, digest), text in zip(pending, rendered):
+        filepath = os.path.join(out_dir, *filename.split("/"))
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(text)
+        manifest.record(filename, digest, scope, text)
+        print(label.format(filename))
+
+    if prune:
+        for filename in manifest.prune({job[3] for job in jobs}):
+            print(f"  - {filename} (removed)")
+    manifest.save()
+    print(f"  [{manifest.summary()}]")
+    return len(manifest.built)
+
+
+def batch_arg_parser(description=None):
+    """生成スクリプト共通のコマンドライン引数"""
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="並列ワーカー数（0 = CPU コア数、既定 1 = シリアル）")
+    parser.add_argument("--force", action="store_true",
+                        help="マニフェストを無視して全件再生成する")
+    return parser
@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """Dify DSL YAML生成コアエンジン"""
-import yaml, os
+import os
+from collections import namedtuple
+import dsl_yaml
+from gen_graph import Edge, Graph, Node
+from gen_ids import format_id
+from gen_layout import layout
 
 BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog")
 
@@ -33,21 +38,13 @@ def make_var(name, vtype, required=True, options=None, max_length=None):
     return v
 
 def nid(wf_num, seq):
-    return str(wf_num * 100000000 + seq)
+    return format_id('catalog', wf_num, seq)
 
 def make_edge(src, tgt, src_type, tgt_type, src_handle='source'):
-    return {
-        'data': {'sourceType': src_type, 'targetType': tgt_type, 'isInIteration': False},
-        'id': f'e-{src}-{tgt}', 'source': src, 'sourceHandle': src_handle,
-        'target': tgt, 'targetHandle': 'target', 'type': 'custom'
-    }
+    return Edge(src, tgt, src_type, tgt_type, src_handle)
 
-def make_node(node_id, data, x, y, h=97, w=243):
-    return {
-        'data': data, 'height': h, 'id': node_id, 'type': 'custom',
-        'position': {'x': x, 'y': y}, 'positionAbsolute': {'x': x, 'y': y},
-        'selected': False, 'sourcePosition': 'right', 'targetPosition': 'left', 'width': w
-    }
+def make_node(node_id, data, h=97, w=243):
+    return Node(node_id, data, height=h, width=w)
 
 def validation_code(main_var):
     return f'''import re
@@ -67,7 +64,8 @@ def main({main_var}: str) -> dict:
             return {{'is_valid': 'false', 'error_message': '不正な入力パターンが検出されました。'}}
     return {{'is_valid': 'true', 'error_message': ''}}'''
 
-def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, system_prompt, user_prompt_template, output_title):
+def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, system_prompt, user_prompt_template, output_title,
+                 provider='openai', model='gpt-4o-mini', temperature=0.5, max_tokens=4096, features=FEATURES):
     ids = [nid(wf_num, i) for i in range(1, 8)]
     # ids: 0=start, 1=code, 2=if-else, 3=llm, 4=template, 5=error-template, 6=end
 
@@ -86,7 +84,7 @@ def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, s
         make_node(ids[0], {
             'desc': '入力パラメータを受け取る', 'selected': False, 'title': '開始',
             'type': 'start', 'variables': variables
-        }, 80, 282, 149),
+        }, 149),
         # Code validation
         make_node(ids[1], {
             'desc': '入力テキストの検証とインジェクション検出を行う', 'selected': False,
@@ -94,7 +92,7 @@ def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, s
             'code': validation_code(main_var),
             'variables': [{'value_selector': [ids[0], main_var], 'variable': main_var}],
             'outputs': {'is_valid': {'type': 'string'}, 'error_message': {'type': 'string'}}
-        }, 380, 282),
+        }),
         # IF-ELSE
         make_node(ids[2], {
             'desc': '入力検証結果で分岐する', 'selected': False, 'title': '検証結果分岐',
@@ -103,36 +101,36 @@ def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, s
                 {'id': 'cond_valid', 'variable_selector': [ids[1], 'is_valid'],
                  'comparison_operator': 'is', 'value': 'true'}
             ]}]
-        }, 680, 282, 125),
+        }, 125),
         # LLM
         make_node(ids[3], {
             'desc': desc, 'selected': False, 'title': 'AI生成', 'type': 'llm',
             'context': {'enabled': False, 'variable_selector': []},
             'model': {
-                'completion_params': {'frequency_penalty': 0, 'max_tokens': 4096,
-                                      'presence_penalty': 0, 'temperature': 0.5, 'top_p': 1},
-                'mode': 'chat', 'name': 'gpt-4o-mini', 'provider': 'openai'
+                'completion_params': {'frequency_penalty': 0, 'max_tokens': max_tokens,
+                                      'presence_penalty': 0, 'temperature': temperature, 'top_p': 1},
+                'mode': 'chat', 'name': model, 'provider': provider
             },
             'prompt_template': [
                 {'role': 'system', 'text': system_prompt},
                 {'role': 'user', 'text': user_prompt_template}
             ],
             'variables': [], 'vision': {'enabled': False}
-        }, 980, 182),
+        }),
         # Template output
         make_node(ids[4], {
             'desc': '生成結果にメタ情報を付与して整形する', 'selected': False,
             'title': '出力整形', 'type': 'template-transform',
             'template': f'# {output_title}\n\n---\n\n{{{{ result }}}}\n\n---\n*AIが生成したドラフトです。専門家の確認を行ってからご使用ください。*',
             'variables': [{'value_selector': [ids[3], 'text'], 'variable': 'result'}]
-        }, 1280, 182),
+        }),
         # Error template
         make_node(ids[5], {
             'desc': '入力検証エラー時のメッセージを整形する', 'selected': False,
             'title': 'エラー応答', 'type': 'template-transform',
             'template': '## 入力エラー\n\n処理を開始できませんでした。\n\n**エラー詳細**: {{ error_message }}\n\n入力内容を修正して再度お試しください。',
             'variables': [{'value_selector': [ids[1], 'error_message'], 'variable': 'error_message'}]
-        }, 980, 432),
+        }),
         # End
         make_node(ids[6], {
             'desc': '結果またはエラーメッセージを出力する', 'selected': False,
@@ -141,7 +139,7 @@ def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, s
                 {'value_selector': [ids[4], 'output'], 'variable': 'result'},
                 {'value_selector': [ids[5], 'output'], 'variable': 'error_message'}
             ]
-        }, 1580, 282, 89),
+        }, 89),
     ]
 
     dsl = {
@@ -153,15 +151,42 @@ def gen_workflow(wf_num, slug, name, icon, icon_bg, desc, variables, main_var, s
         },
         'workflow': {
             'environment_variables': [], 'conversation_variables': [],
-            'features': FEATURES,
-            'graph': {'edges': edges, 'nodes': nodes, 'viewport': {'x': 0, 'y': 0, 'zoom': 1}}
+            'features': features,
+            'graph': layout(Graph(nodes, edges))
         }
     }
 
     return dsl
 
+def workflow_relpath(category, wf_num, slug):
+    return f'{category}/ais-{wf_num}-{slug}.yml'
+
+def dump_workflow(dsl):
+    # プロンプト等の複数行文字列はダンプ時にリテラルブロック（|）で出力する
+    return dsl_yaml.dump(dsl)
+
+# カタログ登録用のワークフロー定義（メタデータのみ。DSL は workflow_dsl() で必要時に組み立てる）
+WorkflowDef = namedtuple('WorkflowDef', [
+    'category', 'num', 'slug', 'name', 'icon', 'icon_bg', 'desc', 'variables', 'main_var',
+    'system_prompt', 'user_prompt', 'output_title'])
+
+def sensitive_words_features(keywords):
+    # 機密ワードのキーワードだけを差し替えた features
+    swa = FEATURES['sensitive_word_avoidance']
+    return {**FEATURES, 'sensitive_word_avoidance': {**swa, 'config': {**swa['config'], 'keywords': '\n'.join(keywords)}}}
+
+def workflow_dsl(wdef, **llm):
+    # llm: provider / model / temperature / max_tokens / features（バリアント生成用）
+    return gen_workflow(*wdef[1:], **llm)
+
+def render_definition(wdef):
+    # WorkflowDef から YAML テキストまで（gen_build のワーカープロセスでも実行される）
+    return dump_workflow(workflow_dsl(wdef))
+
 def save_workflow(category, wf_num, slug, dsl):
     path = os.path.join(BASE, category, f'ais-{wf_num}-{slug}.yml')
+    text = dump_workflow(dsl)
     with open(path, 'w', encoding='utf-8') as f:
-        yaml.dump(dsl, f, default_flow_style=False, allow_unicode=True, sort_keys=False, width=200)
+        f.write(text)
     print(f"  Created: {path}")
+    return text
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+ワークフローグラフの中間表現（gen_core / workflow_engine / generate_all 共通）
+
+ノード・エッジは __slots__ のオブジェクトで保持し、DSL の dict（position /
+positionAbsolute / sourcePosition … を含む）は YAML 出力時に dsl_yaml が
+to_dsl() を呼んで組み立てる。Graph は ID → ノード、ノード → 入出力エッジの
+索引を持つため、後続ノードや参照先の検索にノード一覧の線形走査は不要。
+
+出力のキー順は Dify のエクスポートと同じアルファベット順。
+"""
+
+VIEWPORT = {'x': 0, 'y': 0, 'zoom': 1}
+
+
+class Node:
+    """DSL の graph.nodes 1 件。data はノード種別ごとの設定 dict"""
+    __slots__ = ('id', 'data', 'x', 'y', 'height', 'width', 'extra', 'absolute')
+
+    def __init__(self, node_id, data, x=0, y=0, height=97, width=243, extra=None, absolute=None):
+        self.id = node_id
+        self.data = data
+        self.x = x  # 座標は gen_layout.layout が接続関係から決める
+        self.y = y
+        self.height = height
+        self.width = width
+        self.extra = extra  # 既存 DSL から読み込んだ際の上記以外のキー（parentId, zIndex 等）と既定値と異なる固定キー
+        self.absolute = absolute  # (x, y)。親（イテレーション）内の子ノードのみ。None なら position と同じ
+
+    @property
+    def type(self):
+        return self.data.get('type')
+
+    def to_dsl(self):
+        ax, ay = self.absolute or (self.x, self.y)
+        node = {
+            'data': self.data, 'height': self.height, 'id': self.id,
+            'position': {'x': self.x, 'y': self.y}, 'positionAbsolute': {'x': ax, 'y': ay},
+            'selected': False, 'sourcePosition': 'right', 'targetPosition': 'left',
+            'type': 'custom', 'width': self.width,
+        }
+        if self.extra:
+            node.update(self.extra)
+        return node
+
+    @classmethod
+    def from_dsl(cls, node):
+        pos = node.get('position') or {}
+        x, y = pos.get('x', 0), pos.get('y', 0)
+        absolute = node.get('positionAbsolute') or {}
+        absolute = (absolute.get('x', x), absolute.get('y', y))
+        extra = {k: v for k, v in node.items() if k not in _NODE_KEYS or _NODE_DEFAULTS.get(k, v) != v}
+        return cls(node['id'], node.get('data') or {}, x, y, node.get('height', 97), node.get('width', 243),
+                   extra or None, absolute if absolute != (x, y) else None)
+
+    def __repr__(self):
+        return f'Node({self.id!r}, {self.type!r})'
+
+
+_NODE_KEYS = frozenset(Node(None, {}).to_dsl())
+# to_dsl が固定値で出力するキー。これと異なる値は extra に残す
+_NODE_DEFAULTS = {'selected': False, 'sourcePosition': 'right', 'targetPosition': 'left', 'type': 'custom'}
+
+
+class Edge:
+    """DSL の graph.edges 1 件"""
+    __slots__ = ('source', 'target', 'source_type', 'target_type', 'source_handle', 'in_iteration', 'edge_id',
+                 'extra')
+
+    def __init__(self, source, target, source_type, target_type, source_handle='source', in_iteration=False,
+                 edge_id=None, extra=None):
+        self.source = source
+        self.target = target
+        self.source_type = source_type
+        self.target_type = target_type
+        self.source_handle = source_handle
+        self.in_iteration = in_iteration  # None なら data.isInIteration を出力しない（既存 DSL で省略されていた場合）
+        self.edge_id = edge_id  # None なら e-{source}-{target}
+        self.extra = extra  # 既存 DSL から読み込んだ際の上記以外のキー（zIndex, targetHandle 等。data 内は 'data' に入れる）
+
+    @property
+    def id(self):
+        return self.edge_id or f'e-{self.source}-{self.target}'
+
+    def to_dsl(self):
+        data = {'sourceType': self.source_type, 'targetType': self.target_type}
+        if self.in_iteration is not None:
+            data['isInIteration'] = self.in_iteration
+        edge = {
+            'data': data, 'id': self.id, 'source': self.source, 'sourceHandle': self.source_handle,
+            'target': self.target, 'targetHandle': 'target', 'type': 'custom',
+        }
+        if self.extra:
+            for key, value in self.extra.items():
+                if key == 'data':
+                    data.update(value)
+                else:
+                    edge[key] = value
+        return edge
+
+    @classmethod
+    def from_dsl(cls, edge):
+        data = edge.get('data') or {}
+        extra = {k: v for k, v in edge.items() if k not in _EDGE_KEYS or _EDGE_DEFAULTS.get(k, v) != v}
+        data_extra = {k: v for k, v in data.items() if k not in _EDGE_DATA_KEYS}
+        if data_extra:
+            extra['data'] = data_extra
+        edge_id = edge.get('id')
+        return cls(edge['source'], edge['target'], data.get('sourceType'), data.get('targetType'),
+                   edge.get('sourceHandle', 'source'), data.get('isInIteration'),
+                   edge_id if edge_id != f"e-{edge['source']}-{edge['target']}" else None, extra or None)
+
+    def __repr__(self):
+        return f'Edge({self.source!r} -[{self.source_handle}]-> {self.target!r})'
+
+
+_EDGE_KEYS = frozenset(('data', 'id', 'source', 'sourceHandle', 'target', 'targetHandle', 'type'))
+_EDGE_DEFAULTS = {'targetHandle': 'target', 'type': 'custom'}  # これと異なる値は extra に残す
+_EDGE_DATA_KEYS = frozenset(('sourceType', 'targetType', 'isInIteration'))
+
+
+class Graph:
+    """ノード・エッジと隣接索引。workflow.graph に置くと出力時に DSL へ展開される"""
+    __slots__ = ('nodes', 'edges', 'viewport', '_index', '_out', '_in')
+
+    def __init__(self, nodes=(), edges=(), viewport=None):
+        self.nodes = []
+        self.edges = []
+        self.viewport = viewport or VIEWPORT
+        self._index = {}
+        self._out = {}
+        self._in = {}
+        for node in nodes:
+            self.add_node(node)
+        for edge in edges:
+            self.add_edge(edge)
+
+    def add_node(self, node):
+        if node.id in self._index:
+            raise ValueError(f'duplicate node id: {node.id}')
+        self.nodes.append(node)
+        self._index[node.id] = node
+        return node
+
+    def add_edge(self, edge):
+        self.edges.append(edge)
+        self._out.setdefault(edge.source, []).append(edge)
+        self._in.setdefault(edge.target, []).append(edge)
+        return edge
+
+    def __contains__(self, node_id):
+        return node_id in self._index
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def node(self, node_id):
+        return self._index[node_id]
+
+    def get(self, node_id, default=None):
+        return self._index.get(node_id, default)
+
+    def out_edges(self, node_id):
+        return self._out.get(node_id, ())
+
+    def in_edges(self, node_id):
+        return self._in.get(node_id, ())
+
+    def successors(self, node_id, handle=None):
+        return [self._index[e.target] for e in self.out_edges(node_id)
+                if handle is None or e.source_handle == handle]
+
+    def predecessors(self, node_id):
+        return [self._index[e.source] for e in self.in_edges(node_id)]
+
+    def nodes_of_type(self, node_type):
+        return [n for n in self.nodes if n.type == node_type]
+
+    def to_dsl(self):
+        return {'edges': [e.to_dsl() for e in self.edges], 'nodes': [n.to_dsl() for n in self.nodes],
+                'viewport': self.viewport}
+
+    @classmethod
+    def from_dsl(cls, graph):
+        """読み込んだ DSL の workflow.graph から構築する（解析・検証ツール用。to_dsl() で同じ dict に戻る）"""
+        graph = graph or {}
+        return cls([Node.from_dsl(n) for n in graph.get('nodes') or []],
+                   [Edge.from_dsl(e) for e in graph.get('edges') or []],
+                   graph.get('viewport'))
+
+
+def export_doc(doc):
+    """workflow.graph が Graph の文書を、素の dict だけで構成された DSL 文書に変換する"""
+    graph = doc.get('workflow', {}).get('graph')
+    if not isinstance(graph, Graph):
+        return doc
+    return {**doc, 'workflow': {**doc['workflow'], 'graph': graph.to_dsl()}}
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+ノード ID の一元管理: ID 体系・コーパス全体の ID 索引・割り当て・一括リマップ
+
+ID 体系（format_id(scheme, ns, seq)）:
+  catalog   gen_core.nid                  ns * 10^8 + seq                  12100000001     (11 桁)
+  ais       workflow_engine.nid /         5 * 10^13 + ns * 10^11 + seq     51100000000001  (14 桁)
+            generate_all.make_node_id     （AIS-100 以上は 6… になり samples/ の v06 等と重なる）
+  industry  industry/ の手書き DSL        {業界}{番号:02X}{seq:011d}        30A00000000002  (14 桁)
+            （業界: 2=manufacturing 3=banking 4=insurance/common 5=retail …、ns = 業界 * 256 + 番号）
+
+索引は catalog/・industry/・samples/ の全 .yml のノード ID を {ID: ファイル} で持ち、
+.dsl-cache/node-ids.json に (mtime_ns, size) と共に保存する（変更のあったファイルだけ再解析）。
+ID の使用有無の確認は dict 参照で O(1)。
+
+ワークフローを合成・統合するときは remap_doc / combine で衝突する ID を一括で振り直す。
+ID そのものの文字列（source / target / parentId / start_node_id / selector 先頭など）と
+{{#ID.var#}} 参照、エッジ ID 内のトークンを 1 パスで書き換える。
+
+  python gen_ids.py                      # 索引を更新して統計と衝突（複数ファイルで使われている ID）を表示
+  python gen_ids.py --check              # 衝突があれば終了コード 1
+  python gen_ids.py --alloc ais 171 -n 3 # 未使用の ID を 3 件表示
+  python gen_ids.py --verify             # 全コーパスで全 ID を振り直し、検証結果が変わらないことを確認
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_corpus
+
+INDEX_PATH = os.path.join(dsl_corpus.CACHE_DIR, "node-ids.json")
+INDEX_FORMAT = 1
+
+SCHEMES = {
+    "catalog": lambda ns, seq: str(ns * 100000000 + seq),
+    "ais": lambda ns, seq: str(ns * 100000000000 + 50000000000000 + seq),
+    "industry": lambda ns, seq: f"{ns >> 8}{ns & 0xFF:02X}{seq:011d}",
+}
+SCHEME_PATTERNS = [
+    ("catalog", re.compile(r"\d{11}")),
+    ("ais", re.compile(r"[56]\d{13}")),
+    ("industry", re.compile(r"[1-9][0-9A-F]\d{12}")),
+]
+
+
+def format_id(scheme, ns, seq):
+    return SCHEMES[scheme](ns, seq)
+
+
+def scheme_of(node_id):
+    """ID の体系名（どれにも当てはまらなければ None）。ais は industry の 5 番台・samples/ と形式上区別できない"""
+    node_id = str(node_id)
+    for name, pattern in SCHEME_PATTERNS:
+        if pattern.fullmatch(node_id):
+            return name
+    return None
+
+
+def doc_node_ids(doc):
+    try:
+        nodes = doc["workflow"]["graph"]["nodes"]
+    except (KeyError, TypeError):
+        return []
+    return [str(n["id"]) for n in nodes if isinstance(n, dict) and "id" in n]
+
+
+class IdIndex:
+    """コーパス全体のノード ID 索引。ids[ID] = その ID を使っているファイル（相対パス）のリスト"""
+
+    def __init__(self):
+        self.files = {}   # 相対パス -> [(mtime_ns, size), [ID, ...]]
+        self.ids = {}
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, refresh=True):
+        index = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == INDEX_FORMAT:
+                index.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        if refresh:
+            if index.refresh():
+                index.save(path)
+        else:
+            index._rebuild()
+        return index
+
+    def refresh(self, paths=None):
+        """変更・追加・削除されたファイルを反映する。変更があれば True"""
+        paths = dsl_corpus.corpus_files() if paths is None else paths
+        current, stale = {}, []
+        for path in paths:
+            rel = os.path.relpath(path, ROOT_DIR)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = [st.st_mtime_ns, st.st_size]
+            entry = self.files.get(rel)
+            if entry is not None and entry[0] == stamp:
+                current[rel] = entry
+            else:
+                stale.append((rel, path, stamp))
+        if stale:
+            corpus = dsl_corpus.load_corpus([p for _, p, _ in stale], workers=1)
+            for rel, path, stamp in stale:
+                current[rel] = [stamp, doc_node_ids(corpus.get(path))]
+        changed = bool(stale) or current.keys() != self.files.keys()
+        self.files = current
+        self._rebuild()
+        return changed
+
+    def _rebuild(self):
+        self.ids = {}
+        for rel, (_, ids) in self.files.items():
+            for node_id in ids:
+                self.ids.setdefault(node_id, []).append(rel)
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": INDEX_FORMAT, "files": self.files}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def __contains__(self, node_id):
+        return str(node_id) in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def owners(self, node_id):
+        return self.ids.get(str(node_id), [])
+
+    def collisions(self):
+        """{ID: [ファイル, ...]}（複数ファイルで使われている ID）"""
+        return {i: files for i, files in self.ids.items() if len(set(files)) > 1}
+
+    def duplicates(self):
+        """{ファイル: [ID, ...]}（同一ファイル内で重複している ID）"""
+        dups = {}
+        for rel, (_, ids) in self.files.items():
+            counts = Counter(ids)
+            if len(counts) < len(ids):
+                dups[rel] = sorted(i for i, n in counts.items() if n > 1)
+        return dups
+
+
+class Allocator:
+    """索引と割り当て済み ID を避けて新しい ID を払い出す"""
+
+    def __init__(self, index=None, reserved=()):
+        self.index = index if index is not None else IdIndex()
+        self.reserved = set(map(str, reserved))
+        self._next = {}
+
+    def taken(self, node_id):
+        node_id = str(node_id)
+        return node_id in self.reserved or node_id in self.index
+
+    def reserve(self, node_id):
+        node_id = str(node_id)
+        if self.taken(node_id):
+            raise ValueError(f"node id already in use: {node_id}")
+        self.reserved.add(node_id)
+        return node_id
+
+    def allocate(self, scheme="ais", ns=0):
+        """scheme / ns の範囲で未使用の次の ID"""
+        seq = self._next.get((scheme, ns), 1)
+        while True:
+            node_id = format_id(scheme, ns, seq)
+            seq += 1
+            if not self.taken(node_id):
+                self._next[(scheme, ns)] = seq
+                self.reserved.add(node_id)
+                return node_id
+
+
+_TEMPLATE_REF = re.compile(r"\{\{#([^#{}.]+)\.")
+
+
+def _rewrite(obj, mapping):
+    if isinstance(obj, str):
+        if obj in mapping:
+            return mapping[obj]
+        if "{{#" in obj:
+            return _TEMPLATE_REF.sub(lambda m: "{{#" + mapping.get(m.group(1), m.group(1)) + ".", obj)
+        return obj
+    if isinstance(obj, dict):
+        return {k: _rewrite(v, mapping) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_rewrite(v, mapping) for v in obj]
+    return obj
+
+
+def apply_mapping(doc, mapping):
+    """mapping（旧 ID → 新 ID）で文書中のノード ID と参照を書き換えた新しい文書を返す"""
+    if not mapping:
+        return doc
+    mapping = {str(k): v for k, v in mapping.items()}
+    doc = _rewrite(doc, mapping)
+    alternatives = "|".join(re.escape(k) for k in sorted(mapping, key=len, reverse=True))
+    token = re.compile(r"(?<![0-9A-Za-z_])(?:" + alternatives + r")(?![0-9A-Za-z_])")
+    for edge in doc["workflow"]["graph"].get("edges") or []:
+        if isinstance(edge.get("id"), str):
+            edge["id"] = token.sub(lambda m: mapping[m.group(0)], edge["id"])
+    return doc
+
+
+def remap_doc(doc, allocator, scheme="ais", ns=0, all_ids=False):
+    """
+    衝突する ID（all_ids=True なら全 ID）を allocator で振り直し、(新しい文書, {旧: 新}) を返す。
+    振り直さなかった ID も allocator に予約されるので、続けて別の文書を remap すれば互いに衝突しない。
+    """
+    mapping = {}
+    for node_id in doc_node_ids(doc):
+        if node_id in mapping:
+            continue
+        if all_ids or allocator.taken(node_id):
+            mapping[node_id] = allocator.allocate(scheme, ns)
+        else:
+            allocator.reserved.add(node_id)
+    return apply_mapping(doc, {k: v for k, v in mapping.items() if k != v}), mapping
+
+
+def combine(docs, index=None, scheme="ais", ns=0):
+    """複数の文書を同じアプリに統合する前提で、文書間・索引と衝突しないよう ID を振り直したリストを返す"""
+    allocator = Allocator(index)
+    return [remap_doc(doc, allocator, scheme, ns)[0] for doc in docs]
+
+
+def verify_corpus(index):
+    """全文書の全 ID を振り直し、検証結果・参照が保たれることを確認する。[(path, 問題)] を返す"""
+    import dsl_validate
+    corpus = dsl_corpus.load_corpus()
+    allocator = Allocator(index)
+    problems = []
+    for path, doc in corpus.items():
+        before = Counter(i["code"] for i in dsl_validate.validate_doc(doc))
+        new, mapping = remap_doc(doc, allocator, "ais", 999, all_ids=True)
+        after = Counter(i["code"] for i in dsl_validate.validate_doc(new))
+        new_ids = doc_node_ids(new)
+        if before != after:
+            problems.append((path, f"validation changed: {dict(before)} -> {dict(after)}"))
+        if len(set(new_ids)) != len(set(doc_node_ids(doc))) or any(i in index for i in new_ids):
+            problems.append((path, "remapped ids are not unique"))
+        leftover = _leftover(new, set(mapping))
+        if leftover:
+            problems.append((path, f"old ids still referenced: {sorted(leftover)[:5]}"))
+    return problems, len(corpus)
+
+
+def _leftover(obj, old):
+    found = set()
+    if isinstance(obj, str):
+        if obj in old:
+            found.add(obj)
+        elif "{{#" in obj:
+            found.update(m for m in _TEMPLATE_REF.findall(obj) if m in old)
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            found |= _leftover(v, old)
+    elif isinstance(obj, list):
+        for v in obj:
+            found |= _leftover(v, old)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="衝突・重複があれば終了コード 1")
+    parser.add_argument("--alloc", nargs=2, metavar=("SCHEME", "NS"), help="未使用の ID を払い出して表示する")
+    parser.add_argument("-n", type=int, default=1, help="--alloc の件数")
+    parser.add_argument("--verify", action="store_true", help="全コーパスでリマップの正しさを確認する")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = IdIndex.load()
+    elapsed = time.perf_counter() - t0
+
+    if args.alloc:
+        scheme, ns = args.alloc
+        if scheme not in SCHEMES:
+            parser.error(f"unknown scheme {scheme!r} (choose from {', '.join(SCHEMES)})")
+        allocator = Allocator(index)
+        for _ in range(args.n):
+            print(allocator.allocate(scheme, int(ns, 0)))
+        return
+
+    if args.verify:
+        t0 = time.perf_counter()
+        problems, total = verify_corpus(index)
+        for path, problem in problems:
+            print(f"  {os.path.relpath(path, ROOT_DIR)}: {problem}")
+        print(f"remapped {total} documents in {time.perf_counter() - t0:.2f}s: {len(problems)} problems")
+        sys.exit(1 if problems else 0)
+
+    schemes = Counter(scheme_of(i) or "other" for i in index.ids)
+    collisions, duplicates = index.collisions(), index.duplicates()
+    print(f"{len(index.files)} files, {len(index)} ids ({', '.join(f'{k} {v}' for k, v in schemes.most_common())}) "
+          f"indexed in {elapsed * 1000:.0f} ms")
+    groups = Counter(tuple(sorted(set(files))) for files in collisions.values())
+    for files, count in sorted(groups.items()):
+        print(f"  collision: {count} ids shared by {', '.join(files)}")
+    for rel, ids in sorted(duplicates.items()):
+        print(f"  duplicate in {rel}: {', '.join(ids)}")
+    print(f"{len(collisions)} colliding ids, {len(duplicates)} files with duplicate ids")
+    sys.exit(1 if args.check and (collisions or duplicates) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+ワークフローグラフの自動レイアウト（階層型 DAG レイアウト）
+
+gen_graph.Graph のノード座標（position / positionAbsolute）を接続関係から決める。
+  1. レイヤー割り当て: 最長パス法（Kahn 法のトポロジカル順で 1 パス）。閉路は入力順で切る
+  2. 2 レイヤー以上をまたぐエッジにダミーノードを挿入（エッジが途中のノードと交差しないように）。
+     MAX_SPAN レイヤーを超えるエッジはダミーを置かず並び順の決定から外し、座標を決める段階で
+     source を target の y の基準に加えるだけにする（ダミー数がエッジのまたぐ長さの合計に比例しないように）
+  3. 交差削減: 重心法で下り・上りの掃引を繰り返し、交差数が最小だった並びを採用
+     （交差数はフェニック木で O(E log V)）
+  4. 座標: x はレイヤーごとに左から詰め、y は前段ノードの平均に寄せつつ
+     重ならないよう等差の制約付き最小二乗（PAV）で 1 レイヤー O(n) で解く
+
+イテレーションの子ノード（extra の parentId）は親ごとに同じ手順で配置し、
+親ノードの width / height を子の外接矩形に合わせる。子の position は親からの相対座標、
+positionAbsolute は絶対座標になる。
+
+  from gen_layout import layout
+  graph = layout(Graph(nodes, edges))
+"""
+from collections import deque
+
+ORIGIN = (80, 282)      # 先頭レイヤー・1 行目の左上
+H_GAP = 57              # レイヤー間の間隔（幅 243 のノードで 300 刻み）
+V_GAP = 50              # 同一レイヤー内のノード間隔
+CHILD_PADDING = (24, 68, 24, 24)   # イテレーション内の余白（左, 上, 右, 下）
+SWEEPS = 4
+MAX_SPAN = 8            # ダミーノードで分割するエッジの最大レイヤー数（コーパスの最大は 6）
+
+
+def _layers(ids, succ, pred):
+    """最長パス法。{id: layer} を返す"""
+    indeg = {v: len(pred[v]) for v in ids}
+    layer = dict.fromkeys(ids, 0)
+    queue = deque(v for v in ids if indeg[v] == 0)
+    done = set()
+    pending = iter(ids)
+    while len(done) < len(ids):
+        if not queue:
+            # 閉路: 未処理で入力順が最初のノードから再開し、残りの入辺は無視する
+            v = next(v for v in pending if v not in done)
+            queue.append(v)
+            indeg[v] = 0
+        v = queue.popleft()
+        if v in done:
+            continue
+        done.add(v)
+        for w in succ[v]:
+            if w in done:
+                continue  # 後退辺
+            layer[w] = max(layer[w], layer[v] + 1)
+            indeg[w] -= 1
+            if indeg[w] == 0:
+                queue.append(w)
+    return layer
+
+
+def _crossings(rows, down):
+    """隣接レイヤー間の交差数の合計"""
+    total = 0
+    for upper, lower in zip(rows, rows[1:]):
+        pos = {v: i for i, v in enumerate(lower)}
+        targets = [pos[w] for v in upper for w in sorted(down[v], key=pos.__getitem__)]
+        tree = [0] * (len(lower) + 1)
+        for seen, t in enumerate(targets):
+            # seen 件のうち t より右にある（= 交差する）件数
+            i, le = t + 1, 0
+            while i > 0:
+                le += tree[i]
+                i -= i & -i
+            total += seen - le
+            i = t + 1
+            while i <= len(lower):
+                tree[i] += 1
+                i += i & -i
+    return total
+
+
+def _order(rows, down, up):
+    """重心法の掃引。交差数が最小の並びを返す"""
+    best, best_x = [list(r) for r in rows], _crossings(rows, down)
+    for sweep in range(SWEEPS * 2):
+        if best_x == 0:
+            break
+        forward = sweep % 2 == 0
+        seq = range(1, len(rows)) if forward else range(len(rows) - 2, -1, -1)
+        for i in seq:
+            ref = rows[i - 1] if forward else rows[i + 1]
+            nbrs = up if forward else down
+            pos = {v: k for k, v in enumerate(ref)}
+            keyed = []
+            for k, v in enumerate(rows[i]):
+                ps = [pos[w] for w in nbrs[v] if w in pos]
+                keyed.append((sum(ps) / len(ps) if ps else k, k, v))
+            keyed.sort()
+            rows[i] = [v for _, _, v in keyed]
+        x = _crossings(rows, down)
+        if x < best_x:
+            best, best_x = [list(r) for r in rows], x
+    return best
+
+
+def _place_column(wanted, heights):
+    """
+    順序を保ったまま y[i+1] >= y[i] + h[i] + V_GAP を満たし、
+    Σ(y - wanted)² を最小にする y を返す（PAV: pool adjacent violators）
+    """
+    offsets, acc = [], 0
+    for h in heights:
+        offsets.append(acc)
+        acc += h + V_GAP
+    blocks = []  # [合計, 件数]
+    for w, off in zip(wanted, offsets):
+        blocks.append([w - off, 1])
+        while len(blocks) > 1 and blocks[-2][0] / blocks[-2][1] > blocks[-1][0] / blocks[-1][1]:
+            s, n = blocks.pop()
+            blocks[-1][0] += s
+            blocks[-1][1] += n
+    ys = []
+    for s, n in blocks:
+        ys += [s / n] * n
+    return [y + off for y, off in zip(ys, offsets)]
+
+
+def _layout_group(nodes, edges, origin, normalize=False):
+    """
+    1 階層分のノードを配置して {id: (x, y)} と外接矩形 (幅, 高さ) を返す。
+    normalize=True なら上端を origin の y に揃える（イテレーション内の相対座標用）
+    """
+    ids = [n.id for n in nodes]
+    size = {n.id: (n.width, n.height) for n in nodes}
+    succ = {v: [] for v in ids}
+    pred = {v: [] for v in ids}
+    for e in edges:
+        if e.source in succ and e.target in succ and e.source != e.target:
+            succ[e.source].append(e.target)
+            pred[e.target].append(e.source)
+    layer = _layers(ids, succ, pred)
+
+    # ダミーノードで長いエッジを 1 レイヤーずつに分割した隣接（順方向のみ）
+    down = {v: [] for v in ids}
+    up = {v: [] for v in ids}
+    long_up = {}  # MAX_SPAN を超えるエッジ: target → [source]（座標決定でのみ使う）
+    for v in ids:
+        for w in succ[v]:
+            if layer[w] <= layer[v]:
+                continue  # 後退辺は並び順に影響させない
+            if layer[w] - layer[v] > MAX_SPAN:
+                long_up.setdefault(w, []).append(v)
+                continue
+            prev = v
+            for k in range(layer[v] + 1, layer[w]):
+                d = ('dummy', v, w, k)
+                layer[d] = k
+                size[d] = (0, 0)
+                down[d], up[d] = [], []
+                down[prev].append(d)
+                up[d].append(prev)
+                prev = d
+            down[prev].append(w)
+            up[w].append(prev)
+
+    # 初期順序: 入力順の深さ優先（エッジの順 = sourceHandle の並びを保つ）
+    rows = [[] for _ in range(max(layer.values(), default=-1) + 1)]
+    seen = set()
+    for root in ids:
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            if v in seen:
+                continue
+            seen.add(v)
+            rows[layer[v]].append(v)
+            stack.extend(reversed(down[v]))
+    rows = _order(rows, down, up)
+
+    pos = {}
+    x = origin[0]
+    for row in rows:
+        wanted = []
+        for v in row:
+            ps = [pos[u][1] for u in up[v] + long_up.get(v, []) if u in pos]
+            wanted.append(sum(ps) / len(ps) if ps else origin[1])
+        for v, y in zip(row, _place_column(wanted, [size[v][1] for v in row])):
+            pos[v] = (x, y)
+        x += max((size[v][0] for v in row), default=0) + H_GAP
+
+    placed = {v: pos[v] for v in ids}
+    top = min((y for _, y in placed.values()), default=origin[1])
+    shift = origin[1] - top if normalize else 0
+    placed = {v: (round(px), round(py + shift)) for v, (px, py) in placed.items()}
+    width = max((px + size[v][0] for v, (px, _) in placed.items()), default=origin[0]) - origin[0]
+    height = max((py + size[v][1] for v, (_, py) in placed.items()), default=origin[1]) - min(
+        (py for _, py in placed.values()), default=origin[1])
+    return placed, (width, height)
+
+
+def layout(graph, origin=ORIGIN):
+    """graph のノード座標を書き換えて graph を返す"""
+    children, top = {}, []
+    for n in graph.nodes:
+        parent = (n.extra or {}).get('parentId')
+        if parent is not None and parent in graph:
+            children.setdefault(parent, []).append(n)
+        else:
+            top.append(n)
+
+    child_pos = {}
+
+    def place(nodes, origin, normalize):
+        # 子を先に配置して親の大きさを決める
+        for n in nodes:
+            if n.id in children:
+                left, upper, right, lower = CHILD_PADDING
+                child_pos[n.id], (w, h) = place(children[n.id], (left, upper), True)
+                n.width, n.height = w + left + right, h + upper + lower
+        return _layout_group(nodes, graph.edges, origin, normalize)
+
+    def apply(nodes, placed, base):
+        for n in nodes:
+            n.x, n.y = placed[n.id]
+            n.absolute = None if base is None else (base[0] + n.x, base[1] + n.y)
+            if n.id in children:
+                apply(children[n.id], child_pos[n.id], n.absolute or (n.x, n.y))
+
+    apply(top, place(top, origin, False)[0], None)
+    return graph
+
+
+def positions(graph, origin=ORIGIN):
+    """{id: (x, y)}（graph は書き換えない。トップレベルのノードのみ）"""
+    nodes = [n for n in graph.nodes if (n.extra or {}).get('parentId') is None]
+    placed, _ = _layout_group(nodes, graph.edges, origin)
+    return placed
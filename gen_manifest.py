@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+DSL YAML インクリメンタル生成用マニフェスト
+
+出力ディレクトリごとに .gen-manifest.json を置き、各ワークフローについて
+「入力定義（cfg 辞書 / gen_workflow 引数）＋ジェネレーターバージョン」のハッシュと
+出力テキストのハッシュを記録する。入力ハッシュが変わったもの、または出力ファイルが
+消えた・手で書き換えられたものだけを再生成する。
+
+  m = Manifest(os.path.join(out_dir, MANIFEST_NAME))
+  digest = input_digest(cfg, version)
+  if not m.is_current(filename, digest):
+      ... build & write ...
+      m.record(filename, digest, scope, text)
+  else:
+      m.skip(filename, scope)
+  m.prune([scope]); m.save(); print(m.summary())
+"""
+import hashlib
+import json
+import os
+
+import yaml
+
+MANIFEST_NAME = ".gen-manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def _sha256(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def source_version(*paths):
+    """ジェネレーターのソースファイル群と PyYAML のバージョンからバージョン文字列を作る"""
+    h = hashlib.sha256()
+    h.update(f"format={MANIFEST_FORMAT};pyyaml={yaml.__version__}".encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            h.update(b"\0" + os.path.basename(path).encode() + b"\0" + f.read())
+    return h.hexdigest()[:16]
+
+
+def input_digest(definition, version):
+    """入力定義（JSON 化できる値。tuple は list として扱う）のハッシュ"""
+    payload = json.dumps(definition, ensure_ascii=False, sort_keys=True, default=repr)
+    return _sha256(version + "\0" + payload)
+
+
+class Manifest:
+    """1 出力ディレクトリ分のマニフェスト。キーはディレクトリからの相対パス（/ 区切り）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.base = os.path.dirname(os.path.abspath(path))
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == MANIFEST_FORMAT:
+                self.entries = data.get("entries", {})
+        self.built, self.skipped, self.removed = [], [], []
+        self._seen = set()
+
+    def _abspath(self, filename):
+        return os.path.join(self.base, *filename.split("/"))
+
+    def is_current(self, filename, digest):
+        """入力ハッシュが一致し、出力ファイルが記録時のまま残っていれば True"""
+        entry = self.entries.get(filename)
+        if not entry or entry["input"] != digest:
+            return False
+        try:
+            with open(self._abspath(filename), "rb") as f:
+                return _sha256(f.read()) == entry["output"]
+        except OSError:
+            return False
+
+    def record(self, filename, digest, scope, text):
+        self.entries[filename] = {"input": digest, "output": _sha256(text), "scope": scope}
+        self.built.append(filename)
+        self._seen.add(filename)
+
+    def skip(self, filename, scope):
+        self.entries[filename]["scope"] = scope
+        self.skipped.append(filename)
+        self._seen.add(filename)
+
+    def prune(self, scopes):
+        """指定スコープで今回出現しなかった（定義が削除された）生成物を削除する"""
+        scopes = set(scopes)
+        for filename, entry in sorted(self.entries.items()):
+            if entry.get("scope") in scopes and filename not in self._seen:
+                try:
+                    os.remove(self._abspath(filename))
+                except FileNotFoundError:
+                    pass
+                del self.entries[filename]
+                self.removed.append(filename)
+        return self.removed
+
+    def save(self):
+        data = {"format": MANIFEST_FORMAT, "entries": dict(sorted(self.entries.items()))}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+    def summary(self):
+        return f"built {len(self.built)}, skipped {len(self.skipped)}, removed {len(self.removed)}"
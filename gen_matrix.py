@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+バリアントマトリクス生成: ワークフロー × バリアントグリッドを 1 つの圧縮アーカイブに書き出す
+
+グリッド（JSON）の各軸の直積がバリアントになる:
+  {
+    "models": [["openai", "gpt-4o-mini"], ["anthropic", "claude-3-5-haiku"]],
+    "temperature": [0.2, 0.5],
+    "max_tokens": [4096],
+    "sensitive_words": {"default": null, "strict": ["爆弾", "殺害", "違法薬物", "ハッキング手法", "個人情報"]}
+  }
+  temperature / max_tokens の null はワークフロー定義の値のまま、sensitive_words の null は既定のキーワード。
+
+対象は catalog（gen_all.REGISTRY → gen_workflow）と gen_batch1〜3c（build_auto）。
+generate_all の手組みワークフロー（AIS-11〜25）はバリアント化の対象外。
+
+文書は 1 件ずつ生成して tar.gz ストリームへ順に書き込み、index.jsonl（パス・AIS・
+バリアント・sha256）を最後のメンバーとして追加する。生成済み文書もインデックスも
+メモリに溜めないため、マトリクスの大きさによらずメモリ使用量は一定。
+アーカイブはシーケンシャル書き込みのみで、同じ入力からはバイト単位で同じものができる。
+
+  python gen_matrix.py -o dist/variants.tar.gz                      # 既定グリッド・全件
+  python gen_matrix.py grid.json -o variants.tar.gz --category catalog/energy
+  python gen_matrix.py grid.json -o variants.tar.gz --ais 26-49 --dry-run
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+import dsl_yaml
+import dify_gen
+import gen_core
+from gen_core import sensitive_words_features, workflow_dsl
+
+DEFAULT_GRID = {
+    "models": [["openai", "gpt-4o-mini"], ["openai", "gpt-4o"]],
+    "temperature": [None],
+    "max_tokens": [None],
+    "sensitive_words": {"default": None},
+}
+
+INDEX_NAME = "index.jsonl"
+
+
+def load_grid(path):
+    if not path:
+        return DEFAULT_GRID
+    with open(path, encoding="utf-8") as f:
+        grid = json.load(f)
+    unknown = set(grid) - set(DEFAULT_GRID)
+    if unknown:
+        raise ValueError(f"unknown grid axes: {sorted(unknown)}")
+    return {**DEFAULT_GRID, **grid}
+
+
+def variants(grid):
+    """グリッドの直積。各要素は {provider, model, temperature, max_tokens, sensitive_words, words}"""
+    for (provider, model), temp, mt, (sw_name, words) in itertools.product(
+            grid["models"], grid["temperature"], grid["max_tokens"], grid["sensitive_words"].items()):
+        yield {"provider": provider, "model": model, "temperature": temp, "max_tokens": mt,
+               "sensitive_words": sw_name, "words": words}
+
+
+def variant_id(v):
+    parts = [f"{v['provider']}-{v['model']}".replace("/", "_").replace(":", "_")]
+    if v["temperature"] is not None:
+        parts.append(f"t{v['temperature']}")
+    if v["max_tokens"] is not None:
+        parts.append(f"mt{v['max_tokens']}")
+    parts.append(f"sw-{v['sensitive_words']}")
+    return "_".join(parts)
+
+
+def stamper(target):
+    """生成対象 1 件分の「バリアント → DSL 文書」関数。バリアント化できなければ None"""
+    from workflow_engine import AutoSkeleton, render_cfg
+    _, func, arg, _ = target["job"]
+    if func is gen_core.render_definition:
+        def stamp(v):
+            llm = {"provider": v["provider"], "model": v["model"]}
+            if v["temperature"] is not None:
+                llm["temperature"] = v["temperature"]
+            if v["max_tokens"] is not None:
+                llm["max_tokens"] = v["max_tokens"]
+            if v["words"] is not None:
+                llm["features"] = sensitive_words_features(v["words"])
+            return workflow_dsl(arg, **llm)
+        return stamp
+    if func is render_cfg:
+        skeleton = AutoSkeleton(arg)
+
+        def stamp(v):
+            slots = {"provider": v["provider"], "model": v["model"]}
+            if v["temperature"] is not None:
+                slots["temp"] = v["temperature"]
+            if v["max_tokens"] is not None:
+                slots["mt"] = v["max_tokens"]
+            if v["words"] is not None:
+                slots["sensitive_words"] = v["words"]
+            return skeleton.stamp(slots)
+        return stamp
+    return None
+
+
+def matrix(targets, grid):
+    """(member_name, index_record, yaml_text) を 1 件ずつ返すジェネレーター"""
+    grid_variants = list(variants(grid))
+    for target in targets:
+        stamp = stamper(target)
+        if stamp is None:
+            continue
+        base = target["path"][:-len(".yml")]
+        for v in grid_variants:
+            text = dsl_yaml.dump(stamp(v))
+            name = f"{base}/{variant_id(v)}.yml"
+            record = {"path": name, "ais": target["ais"], "source": target["source"],
+                      "workflow": target["path"],
+                      "variant": {k: v[k] for k in ("provider", "model", "temperature", "max_tokens", "sensitive_words")}}
+            yield name, record, text
+
+
+def _add_member(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def write_archive(out_path, entries):
+    """entries を tar.gz にストリーム書き込みし、(件数, 非圧縮バイト数) を返す"""
+    count = total = 0
+    tmp_path = out_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as raw, \
+                gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz, \
+                tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar, \
+                tempfile.TemporaryFile("w+b") as index:
+            for name, record, text in entries:
+                data = text.encode("utf-8")
+                record["bytes"] = len(data)
+                record["sha256"] = hashlib.sha256(data).hexdigest()
+                _add_member(tar, name, data)
+                index.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                count += 1
+                total += len(data)
+            # インデックスはディスク上の一時ファイルから最後のメンバーとして流し込む
+            info = tarfile.TarInfo(INDEX_NAME)
+            info.size = index.tell()
+            info.mode = 0o644
+            index.seek(0)
+            tar.addfile(info, index)
+    except BaseException:
+        # 途中で失敗したら（Ctrl-C を含む）書きかけの .tmp を残さない
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(tmp_path, out_path)
+    return count, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("grid", nargs="?", help="バリアントグリッド JSON（省略時は DEFAULT_GRID）")
+    parser.add_argument("-o", "--output", default="variants.tar.gz", help="出力アーカイブ（.tar.gz）")
+    parser.add_argument("--ais", help="AIS 番号（例: 26-49,121）")
+    parser.add_argument("--category", action="append", default=[], help="カテゴリ（例: catalog/energy）")
+    parser.add_argument("--glob", action="append", default=[], help="パスまたはファイル名の glob パターン")
+    parser.add_argument("--dry-run", action="store_true", help="件数だけを表示する")
+    args = parser.parse_args()
+
+    try:
+        grid = load_grid(args.grid)
+        ais = dify_gen.parse_ais(args.ais) if args.ais else None
+    except ValueError as e:
+        parser.error(str(e))
+    categories = [c.strip("/") for c in args.category]
+    targets = dify_gen.select(dify_gen.discover(ais, categories), ais, categories, args.glob)
+    n_variants = sum(1 for _ in variants(grid))
+    n_targets = sum(1 for t in targets if t["source"] != "generate_all")
+    if not n_targets:
+        print("No matching workflows.")
+        sys.exit(1)
+    print(f"{n_targets} workflows x {n_variants} variants = {n_targets * n_variants} documents")
+    if args.dry_run:
+        return
+
+    out_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(out_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    count, total = write_archive(args.output, matrix(targets, grid))
+    elapsed = time.perf_counter() - t0
+    size = os.path.getsize(args.output)
+    print(f"{count} documents → {args.output} ({total / 1e6:.1f} MB → {size / 1e6:.1f} MB gz) "
+          f"in {elapsed:.1f}s ({count / elapsed:,.0f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 """業界別AIソリューション Batch 1: 製造業・金融/保険・医療/ヘルスケア (AIS-26〜49)"""
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from workflow_engine import generate_batch
+from workflow_engine import generate_batch, batch_arg_parser
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🏭 製造業 (Manufacturing) AIS-26〜33
@@ -1619,6 +1619,7 @@ WORKFLOWS = [
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 if __name__ == "__main__":
+    args = batch_arg_parser().parse_args()
     print("=== Batch 1: 製造業・金融/保険・医療/ヘルスケア ===")
-    n = generate_batch(WORKFLOWS)
+    n = generate_batch(WORKFLOWS, workers=args.workers, scope="gen_batch1", force=args.force)
     print(f"\n{n} workflows generated.")
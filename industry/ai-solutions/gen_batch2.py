@@ -2,7 +2,7 @@
 """業界別AIソリューション Batch 2: 小売・EC / 不動産 / 教育 / 物流 (AIS-50〜77)"""
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from workflow_engine import generate_batch
+from workflow_engine import generate_batch, batch_arg_parser
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🛒 小売・EC (AIS-50〜57)
@@ -1483,6 +1483,7 @@ WORKFLOWS = [
 ]
 
 if __name__ == "__main__":
+    args = batch_arg_parser().parse_args()
     print("=== Batch 2: 小売・EC / 不動産 / 教育 / 物流 ===")
-    n = generate_batch(WORKFLOWS)
+    n = generate_batch(WORKFLOWS, workers=args.workers, scope="gen_batch2", force=args.force)
     print(f"\n{n} workflows generated.")
@@ -2,7 +2,7 @@
 """業界別AIソリューション Batch 3a: IT・SaaS / 飲食・フードサービス (AIS-78〜91)"""
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from workflow_engine import generate_batch
+from workflow_engine import generate_batch, batch_arg_parser
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 💻 IT・SaaS (AIS-78〜84)
@@ -901,6 +901,7 @@ WORKFLOWS = [
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 if __name__ == "__main__":
+    args = batch_arg_parser().parse_args()
     print("=== Batch 3a: IT・SaaS / 飲食・フードサービス ===")
-    n = generate_batch(WORKFLOWS)
+    n = generate_batch(WORKFLOWS, workers=args.workers, scope="gen_batch3a", force=args.force)
     print(f"\n{n} workflows generated.")
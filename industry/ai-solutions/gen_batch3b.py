@@ -2,7 +2,7 @@
 """業界別AIソリューション Batch 3b: 建設・不動産管理 / メディア・コンテンツ (AIS-92〜105)"""
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from workflow_engine import generate_batch
+from workflow_engine import generate_batch, batch_arg_parser
 
 WORKFLOWS = [
     # ──────────────────────────────────────────────
@@ -887,6 +887,7 @@ WORKFLOWS = [
 ]
 
 if __name__ == "__main__":
+    args = batch_arg_parser().parse_args()
     print("=== Batch 3b: 建設・不動産管理 / メディア・コンテンツ ===")
-    n = generate_batch(WORKFLOWS)
+    n = generate_batch(WORKFLOWS, workers=args.workers, scope="gen_batch3b", force=args.force)
     print(f"\n{n} workflows generated.")
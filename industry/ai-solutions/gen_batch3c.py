@@ -2,7 +2,7 @@
 """業界別AIソリューション Batch 3c: 士業・法務 / 自治体・公共 / 人材・HR (AIS-106〜120)"""
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from workflow_engine import generate_batch
+from workflow_engine import generate_batch, batch_arg_parser
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # ⚖️ 士業・法務 (AIS-106〜110)
@@ -923,6 +923,7 @@ WORKFLOWS = [
 ]
 
 if __name__ == "__main__":
+    args = batch_arg_parser().parse_args()
     print("=== Batch 3c: 士業・法務 / 自治体・公共 / 人材・HR ===")
-    n = generate_batch(WORKFLOWS)
+    n = generate_batch(WORKFLOWS, workers=args.workers, scope="gen_batch3c", force=args.force)
     print(f"\n{n} workflows generated.")
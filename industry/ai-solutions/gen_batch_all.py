@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+業界別AIソリューション 一括生成: gen_batch1〜3c の WORKFLOWS と generate_all.BUILDERS
+(AIS-11〜120) を1つのプロセスプールでまとめて生成する
+
+  python gen_batch_all.py            # シリアル
+  python gen_batch_all.py -j 0       # CPU コア数で並列
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from workflow_engine import OUTPUT_DIR, batch_arg_parser, render_cfg, write_jobs
+import gen_batch1, gen_batch2, gen_batch3a, gen_batch3b, gen_batch3c
+import generate_all
+
+BATCHES = [gen_batch1, gen_batch2, gen_batch3a, gen_batch3b, gen_batch3c]
+
+
+def all_jobs():
+    jobs = generate_all.builder_jobs()
+    for mod in BATCHES:
+        scope = mod.__name__
+        jobs += [(cfg["file"], render_cfg, cfg, scope) for cfg in mod.WORKFLOWS]
+    return jobs
+
+
+if __name__ == "__main__":
+    args = batch_arg_parser(__doc__).parse_args()
+    print("=== AIS-11〜120: generate_all + Batch 1〜3c ===")
+    n = write_jobs(all_jobs(), OUTPUT_DIR, workers=args.workers, force=args.force)
+    print(f"\n{n} workflows generated.")
@@ -4,10 +4,14 @@ AI Solutions ファミレスメニュー: 新規15ワークフロー一括生成
 既存 AIS-01〜10 に加え、AIS-11〜25 を生成する
 """
 
-import yaml
 import os
 import textwrap
 
+from workflow_engine import batch_arg_parser, dump_doc, write_jobs
+from gen_graph import Edge, Graph, Node
+from gen_ids import format_id
+from gen_layout import layout
+
 OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -75,51 +79,27 @@ def main({params}) -> dict:
 
 def make_node_id(ais_num, node_num):
     """AIS番号とノード番号からID生成: AIS-11 node 1 → 51100000000001"""
-    return str(ais_num * 100000000000 + 50000000000000 + node_num)
-
+    return format_id("ais", ais_num, node_num)
 
-def make_edge_id(ais_num, src, tgt):
-    return f"e-{make_node_id(ais_num, src)}-{make_node_id(ais_num, tgt)}"
 
-
-def node_base(ais_num, node_num, x, y, ntype, title, desc, height=97, width=243, extra=None):
-    nid = make_node_id(ais_num, node_num)
-    n = {
-        "data": {
-            "desc": desc,
-            "selected": False,
-            "title": title,
-            "type": ntype,
-        },
-        "height": height,
-        "id": nid,
-        "position": {"x": x, "y": y},
-        "positionAbsolute": {"x": x, "y": y},
+def node_base(ais_num, node_num, ntype, title, desc, height=97, width=243, extra=None):
+    data = {
+        "desc": desc,
         "selected": False,
-        "sourcePosition": "right",
-        "targetPosition": "left",
-        "type": "custom",
-        "width": width,
+        "title": title,
+        "type": ntype,
     }
     if extra:
-        n["data"].update(extra)
-    return n
+        data.update(extra)
+    return Node(make_node_id(ais_num, node_num), data, height=height, width=width)
 
 
 def edge(ais_num, src_num, tgt_num, src_type, tgt_type, handle="source"):
-    return {
-        "data": {"sourceType": src_type, "targetType": tgt_type, "isInIteration": False},
-        "id": make_edge_id(ais_num, src_num, tgt_num),
-        "source": make_node_id(ais_num, src_num),
-        "sourceHandle": handle,
-        "target": make_node_id(ais_num, tgt_num),
-        "targetHandle": "target",
-        "type": "custom",
-    }
+    return Edge(make_node_id(ais_num, src_num), make_node_id(ais_num, tgt_num), src_type, tgt_type, handle)
 
 
-def llm_node(ais_num, node_num, x, y, title, desc, system_prompt, user_prompt, temp=0.3, max_tokens=4096):
-    return node_base(ais_num, node_num, x, y, "llm", title, desc, extra={
+def llm_node(ais_num, node_num, title, desc, system_prompt, user_prompt, temp=0.3, max_tokens=4096):
+    return node_base(ais_num, node_num, "llm", title, desc, extra={
         "context": {"enabled": False, "variable_selector": []},
         "model": {
             "completion_params": {
@@ -137,8 +117,8 @@ def llm_node(ais_num, node_num, x, y, title, desc, system_prompt, user_prompt, t
     })
 
 
-def code_node(ais_num, node_num, x, y, title, desc, code, variables, outputs):
-    return node_base(ais_num, node_num, x, y, "code", title, desc, extra={
+def code_node(ais_num, node_num, title, desc, code, variables, outputs):
+    return node_base(ais_num, node_num, "code", title, desc, extra={
         "code_language": "python3",
         "code": code,
         "variables": variables,
@@ -146,8 +126,8 @@ def code_node(ais_num, node_num, x, y, title, desc, code, variables, outputs):
     })
 
 
-def ifelse_node(ais_num, node_num, x, y, title, desc, var_node, var_name):
-    return node_base(ais_num, node_num, x, y, "if-else", title, desc, height=125, extra={
+def ifelse_node(ais_num, node_num, title, desc, var_node, var_name):
+    return node_base(ais_num, node_num, "if-else", title, desc, height=125, extra={
         "cases": [{
             "case_id": "true",
             "logical_operator": "and",
@@ -161,20 +141,20 @@ def ifelse_node(ais_num, node_num, x, y, title, desc, var_node, var_name):
     })
 
 
-def tt_node(ais_num, node_num, x, y, title, desc, template, variables):
-    return node_base(ais_num, node_num, x, y, "template-transform", title, desc, extra={
+def tt_node(ais_num, node_num, title, desc, template, variables):
+    return node_base(ais_num, node_num, "template-transform", title, desc, extra={
         "template": template,
         "variables": variables
     })
 
 
-def end_node(ais_num, node_num, x, y, outputs):
-    return node_base(ais_num, node_num, x, y, "end", "終了",
+def end_node(ais_num, node_num, outputs):
+    return node_base(ais_num, node_num, "end", "終了",
                      "結果またはエラーメッセージを出力する", height=89, extra={"outputs": outputs})
 
 
-def error_tt(ais_num, node_num, x, y, title_text, guide_text, error_var_node):
-    return tt_node(ais_num, node_num, x, y, "エラー応答",
+def error_tt(ais_num, node_num, title_text, guide_text, error_var_node):
+    return tt_node(ais_num, node_num, "エラー応答",
                    "入力検証エラー時のエラーメッセージを整形する",
                    f"## 入力エラー\n\n{title_text}\n\n**エラー詳細**: {{{{ error_message }}}}\n\n### 入力ガイド\n{guide_text}\n\n入力内容を修正して再度お試しください。",
                    [{"value_selector": [make_node_id(ais_num, error_var_node), "error_message"], "variable": "error_message"}])
@@ -200,11 +180,7 @@ def build_workflow(ais_num, app_name, app_desc, icon, icon_bg, mode, nodes, edge
             "environment_variables": [],
             "conversation_variables": [],
             "features": features,
-            "graph": {
-                "edges": edges_list,
-                "nodes": nodes,
-                "viewport": {"x": 0, "y": 0, "zoom": 1}
-            }
+            "graph": layout(Graph(nodes, edges_list))
         }
     }
     return doc
@@ -218,7 +194,7 @@ def build_ais_11():
     """AIS-11: メール文面パーソナライズ生成"""
     A = 11
     nodes = [
-        node_base(A, 1, 80, 282, "start", "開始", "送信先・目的・コンテキストを受け取る", height=149, extra={
+        node_base(A, 1, "start", "開始", "送信先・目的・コンテキストを受け取る", height=149, extra={
             "variables": [
                 {"label": "recipient_info", "max_length": 5000, "options": [], "required": True, "type": "paragraph", "variable": "recipient_info"},
                 {"label": "email_purpose", "max_length": 48, "options": ["アポイント依頼", "フォローアップ", "提案送付", "お礼メール", "催促メール", "お詫びメール"], "required": True, "type": "select", "variable": "email_purpose"},
@@ -226,7 +202,7 @@ def build_ais_11():
                 {"label": "tone", "max_length": 48, "options": ["丁寧・フォーマル", "ビジネスカジュアル", "親しみやすい"], "required": True, "type": "select", "variable": "tone"},
             ]
         }),
-        code_node(A, 2, 380, 282, "入力検証", "送信先情報の長さチェックとインジェクション検出を行う",
+        code_node(A, 2, "入力検証", "送信先情報の長さチェックとインジェクション検出を行う",
             INJECTION_CODE.format(
                 params="recipient_info: str",
                 checks='    if len(recipient_info.strip()) < 5:\n        issues.append("送信先情報が短すぎます（5文字以上必要）")\n    if len(recipient_info) > 5000:\n        issues.append("送信先情報が長すぎます（5000文字以下にしてください）")',
@@ -235,21 +211,21 @@ def build_ais_11():
             [{"value_selector": [make_node_id(A, 1), "recipient_info"], "variable": "recipient_info"}],
             {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}
         ),
-        ifelse_node(A, 3, 680, 282, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
-        llm_node(A, 4, 980, 182, "メール生成", "パーソナライズされたメール文面を3案生成する",
+        ifelse_node(A, 3, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
+        llm_node(A, 4, "メール生成", "パーソナライズされたメール文面を3案生成する",
             "あなたはビジネスメールの専門コピーライターです。送信先の情報と目的に基づいて、パーソナライズされたメール文面を3案生成してください。\n\n## 出力フォーマット\n各案について以下を出力:\n### 案1\n**件名**: （件名）\n**本文**:\n（本文）\n\n## ルール\n- 送信先の業界・役職・状況に合わせた表現を使用する\n- 指定されたトーンを厳守する\n- 目的に沿った明確なCTA（行動喚起）を含める\n- 件名は開封率を意識した魅力的な文言にする\n- 各案は異なるアプローチ（論理的/感情的/具体例ベース等）で作成する\n- 個人情報は出力しない\n- 押し付けがましい表現は避ける",
             "送信先情報: {{#" + make_node_id(A, 1) + ".recipient_info#}}\nメール目的: {{#" + make_node_id(A, 1) + ".email_purpose#}}\nキーポイント: {{#" + make_node_id(A, 1) + ".key_points#}}\nトーン: {{#" + make_node_id(A, 1) + ".tone#}}",
             temp=0.7),
-        tt_node(A, 5, 1280, 182, "出力整形", "メール文面にメタ情報を付与して整形する",
+        tt_node(A, 5, "出力整形", "メール文面にメタ情報を付与して整形する",
             "# メール文面生成結果\n\n**目的**: {{ email_purpose }}\n**トーン**: {{ tone }}\n\n---\n\n{{ email_drafts }}\n\n---\n*AIが生成したメール文面です。送信前に内容を確認・調整してください。*",
             [
                 {"value_selector": [make_node_id(A, 4), "text"], "variable": "email_drafts"},
                 {"value_selector": [make_node_id(A, 1), "email_purpose"], "variable": "email_purpose"},
                 {"value_selector": [make_node_id(A, 1), "tone"], "variable": "tone"},
             ]),
-        error_tt(A, 6, 980, 432, "メール文面の生成を開始できませんでした。",
+        error_tt(A, 6, "メール文面の生成を開始できませんでした。",
                  "- 送信先情報は5文字以上で入力してください\n- 不正な文字列は使用できません", 2),
-        end_node(A, 7, 1580, 282, [
+        end_node(A, 7, [
             {"value_selector": [make_node_id(A, 5), "output"], "variable": "email_result"},
             {"value_selector": [make_node_id(A, 6), "output"], "variable": "error_message"},
         ]),
@@ -270,7 +246,7 @@ def build_ais_12():
     """AIS-12: 競合分析レポート生成"""
     A = 12
     nodes = [
-        node_base(A, 1, 80, 282, "start", "開始", "自社情報・競合企業・分析観点を受け取る", height=149, extra={
+        node_base(A, 1, "start", "開始", "自社情報・競合企業・分析観点を受け取る", height=149, extra={
             "variables": [
                 {"label": "own_company_info", "max_length": 10000, "options": [], "required": True, "type": "paragraph", "variable": "own_company_info"},
                 {"label": "competitors", "max_length": 10000, "options": [], "required": True, "type": "paragraph", "variable": "competitors"},
@@ -278,7 +254,7 @@ def build_ais_12():
                 {"label": "industry", "max_length": 256, "options": [], "required": True, "type": "text-input", "variable": "industry"},
             ]
         }),
-        code_node(A, 2, 380, 282, "入力検証", "自社情報・競合情報の文字数チェックとインジェクション検出",
+        code_node(A, 2, "入力検証", "自社情報・競合情報の文字数チェックとインジェクション検出",
             INJECTION_CODE.format(
                 params="own_company_info: str, competitors: str",
                 checks='    if len(own_company_info.strip()) < 20:\n        issues.append("自社情報が短すぎます（20文字以上必要）")\n    if len(competitors.strip()) < 10:\n        issues.append("競合企業情報が短すぎます（10文字以上必要）")',
@@ -290,21 +266,21 @@ def build_ais_12():
             ],
             {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}
         ),
-        ifelse_node(A, 3, 680, 282, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
-        llm_node(A, 4, 980, 182, "競合分析", "競合企業の強み・弱みを多角的に分析する",
+        ifelse_node(A, 3, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
+        llm_node(A, 4, "競合分析", "競合企業の強み・弱みを多角的に分析する",
             "あなたは戦略コンサルタントです。自社と競合企業の情報に基づいて、詳細な競合分析レポートを作成してください。\n\n## レポート構成\n1. **エグゼクティブサマリー**（3行以内）\n2. **市場環境分析**\n3. **競合比較マトリクス**（表形式）\n   | 項目 | 自社 | 競合A | 競合B | ... |\n4. **各社SWOT分析**\n5. **ポジショニングマップ**（テキスト描写）\n6. **差別化戦略の提案**（3-5つ）\n7. **リスクと機会**\n8. **推奨アクション**（優先度順）\n\n## ルール\n- 分析観点に応じて深掘りする項目を変える\n- 客観的な分析を心がけ、根拠のない推測は「推定」と明記する\n- 具体的で実行可能な提案を含める\n- 機密情報の取扱いに注意する",
             "自社情報:\n{{#" + make_node_id(A, 1) + ".own_company_info#}}\n\n競合企業:\n{{#" + make_node_id(A, 1) + ".competitors#}}\n\n業界: {{#" + make_node_id(A, 1) + ".industry#}}\n分析観点: {{#" + make_node_id(A, 1) + ".analysis_focus#}}",
             temp=0.4, max_tokens=8192),
-        tt_node(A, 5, 1280, 182, "出力整形", "レポートにメタ情報を付与",
+        tt_node(A, 5, "出力整形", "レポートにメタ情報を付与",
             "# 競合分析レポート\n\n**業界**: {{ industry }}\n**分析観点**: {{ analysis_focus }}\n\n---\n\n{{ analysis_report }}\n\n---\n*AIが生成した分析レポートです。戦略的意思決定には追加調査をお勧めします。*",
             [
                 {"value_selector": [make_node_id(A, 4), "text"], "variable": "analysis_report"},
                 {"value_selector": [make_node_id(A, 1), "industry"], "variable": "industry"},
                 {"value_selector": [make_node_id(A, 1), "analysis_focus"], "variable": "analysis_focus"},
             ]),
-        error_tt(A, 6, 980, 432, "競合分析レポートの生成を開始できませんでした。",
+        error_tt(A, 6, "競合分析レポートの生成を開始できませんでした。",
                  "- 自社情報は20文字以上で入力してください\n- 競合企業情報は10文字以上で入力してください\n- 不正な文字列は使用できません", 2),
-        end_node(A, 7, 1580, 282, [
+        end_node(A, 7, [
             {"value_selector": [make_node_id(A, 5), "output"], "variable": "analysis_result"},
             {"value_selector": [make_node_id(A, 6), "output"], "variable": "error_message"},
         ]),
@@ -322,7 +298,7 @@ def build_ais_13():
     """AIS-13: LP/広告コピーバリエーション生成"""
     A = 13
     nodes = [
-        node_base(A, 1, 80, 282, "start", "開始", "商品情報・ターゲット・訴求軸を受け取る", height=149, extra={
+        node_base(A, 1, "start", "開始", "商品情報・ターゲット・訴求軸を受け取る", height=149, extra={
             "variables": [
                 {"label": "product_info", "max_length": 10000, "options": [], "required": True, "type": "paragraph", "variable": "product_info"},
                 {"label": "target_audience", "max_length": 500, "options": [], "required": True, "type": "text-input", "variable": "target_audience"},
@@ -330,7 +306,7 @@ def build_ais_13():
                 {"label": "num_variations", "max_length": 48, "options": ["3案", "5案", "10案"], "required": True, "type": "select", "variable": "num_variations"},
             ]
         }),
-        code_node(A, 2, 380, 282, "入力検証", "商品情報の文字数チェックとインジェクション検出",
+        code_node(A, 2, "入力検証", "商品情報の文字数チェックとインジェクション検出",
             INJECTION_CODE.format(
                 params="product_info: str, target_audience: str",
                 checks='    if len(product_info.strip()) < 20:\n        issues.append("商品情報が短すぎます（20文字以上必要）")\n    if not target_audience.strip():\n        issues.append("ターゲット顧客層が空です")',
@@ -342,12 +318,12 @@ def build_ais_13():
             ],
             {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}
         ),
-        ifelse_node(A, 3, 680, 282, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
-        llm_node(A, 4, 980, 182, "コピーバリエーション生成", "指定数のLP/広告コピーバリエーションを生成する",
+        ifelse_node(A, 3, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
+        llm_node(A, 4, "コピーバリエーション生成", "指定数のLP/広告コピーバリエーションを生成する",
             "あなたはダイレクトレスポンスのコピーライターです。商品情報とターゲット・訴求軸に基づいて、A/Bテスト用のコピーバリエーションを生成してください。\n\n## 各バリエーションの構成\n- **ヘッドライン**（30字以内）\n- **サブヘッド**（60字以内）\n- **ボディコピー**（100-200字）\n- **CTA文言**（15字以内）\n- **訴求ポイント**: なぜこの切り口が有効か（一行解説）\n\n## ルール\n- 各バリエーションは明確に異なる切り口にする\n- 訴求軸を基本としつつ、バリエーション内で角度を変える\n- 具体的な数値や事例を可能な限り含める\n- 広告審査に抵触しない表現を使用する（誇大表現を避ける）\n- ターゲットのペインポイントに直接語りかける",
             "商品情報:\n{{#" + make_node_id(A, 1) + ".product_info#}}\n\nターゲット: {{#" + make_node_id(A, 1) + ".target_audience#}}\n訴求軸: {{#" + make_node_id(A, 1) + ".appeal_axis#}}\n生成数: {{#" + make_node_id(A, 1) + ".num_variations#}}",
             temp=0.8, max_tokens=8192),
-        tt_node(A, 5, 1280, 182, "出力整形", "コピーバリエーションにメタ情報を付与",
+        tt_node(A, 5, "出力整形", "コピーバリエーションにメタ情報を付与",
             "# LP/広告コピー A/Bテスト用バリエーション\n\n**ターゲット**: {{ target_audience }}\n**訴求軸**: {{ appeal_axis }}\n**生成数**: {{ num_variations }}\n\n---\n\n{{ copy_variations }}\n\n---\n*AIが生成したコピーです。薬機法・景品表示法等の法令遵守を確認してからご使用ください。*",
             [
                 {"value_selector": [make_node_id(A, 4), "text"], "variable": "copy_variations"},
@@ -355,9 +331,9 @@ def build_ais_13():
                 {"value_selector": [make_node_id(A, 1), "appeal_axis"], "variable": "appeal_axis"},
                 {"value_selector": [make_node_id(A, 1), "num_variations"], "variable": "num_variations"},
             ]),
-        error_tt(A, 6, 980, 432, "コピーバリエーションの生成を開始できませんでした。",
+        error_tt(A, 6, "コピーバリエーションの生成を開始できませんでした。",
                  "- 商品情報は20文字以上で入力してください\n- ターゲット顧客層を入力してください", 2),
-        end_node(A, 7, 1580, 282, [
+        end_node(A, 7, [
             {"value_selector": [make_node_id(A, 5), "output"], "variable": "copy_result"},
             {"value_selector": [make_node_id(A, 6), "output"], "variable": "error_message"},
         ]),
@@ -375,14 +351,14 @@ def build_ais_14():
     """AIS-14: VOC分析・感情分析レポート"""
     A = 14
     nodes = [
-        node_base(A, 1, 80, 282, "start", "開始", "顧客の声データと分析観点を受け取る", height=149, extra={
+        node_base(A, 1, "start", "開始", "顧客の声データと分析観点を受け取る", height=149, extra={
             "variables": [
                 {"label": "voc_data", "max_length": 999999, "options": [], "required": True, "type": "paragraph", "variable": "voc_data"},
                 {"label": "data_source", "max_length": 48, "options": ["アンケート回答", "カスタマーレビュー", "SNS投稿", "問い合わせログ", "インタビュー記録"], "required": True, "type": "select", "variable": "data_source"},
                 {"label": "analysis_goal", "max_length": 48, "options": ["総合分析", "改善ポイント抽出", "ポジティブ要因特定", "解約理由分析", "競合比較分析"], "required": True, "type": "select", "variable": "analysis_goal"},
             ]
         }),
-        code_node(A, 2, 380, 282, "入力検証", "VOCデータの文字数チェックとインジェクション検出",
+        code_node(A, 2, "入力検証", "VOCデータの文字数チェックとインジェクション検出",
             INJECTION_CODE.format(
                 params="voc_data: str",
                 checks='    if len(voc_data.strip()) < 50:\n        issues.append("VOCデータが短すぎます（50文字以上必要）")\n    if len(voc_data) > 500000:\n        issues.append("VOCデータが長すぎます（500,000文字以下にしてください）")',
@@ -391,30 +367,30 @@ def build_ais_14():
             [{"value_selector": [make_node_id(A, 1), "voc_data"], "variable": "voc_data"}],
             {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}
         ),
-        ifelse_node(A, 3, 680, 282, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
-        llm_node(A, 4, 980, 132, "感情分類・トピック抽出", "各VOCエントリの感情とトピックを分類する",
+        ifelse_node(A, 3, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
+        llm_node(A, 4, "感情分類・トピック抽出", "各VOCエントリの感情とトピックを分類する",
             "あなたはVOC分析の専門家です。顧客の声データを分析し、以下を抽出してください。\n\n## 出力フォーマット\n### 感情分布\n| 感情 | 件数 | 割合 |\n|---|---|---|\n| ポジティブ | X | X% |\n| ニュートラル | X | X% |\n| ネガティブ | X | X% |\n\n### トピック別分類\n| トピック | 件数 | 代表的な声 | 感情傾向 |\n\n### キーワード頻出ランキング\n上位10キーワードとその文脈\n\n## ルール\n- データに存在しない情報を追加しない\n- 定量的な集計を心がける\n- 個人を特定できる情報は匿名化する",
             "データソース: {{#" + make_node_id(A, 1) + ".data_source#}}\n分析目的: {{#" + make_node_id(A, 1) + ".analysis_goal#}}\n\nVOCデータ:\n{{#" + make_node_id(A, 1) + ".voc_data#}}",
             temp=0.2, max_tokens=8192),
-        llm_node(A, 5, 980, 382, "洞察・提案生成", "分析結果から具体的なアクション提案を生成する",
+        llm_node(A, 5, "洞察・提案生成", "分析結果から具体的なアクション提案を生成する",
             "あなたはCX（カスタマーエクスペリエンス）コンサルタントです。VOC分析結果に基づいて、実行可能な改善提案を作成してください。\n\n## 出力フォーマット\n### インサイト（3-5個）\n各インサイトについて: 発見事項 → 根拠となる声 → ビジネスインパクト\n\n### 改善アクション（優先度順）\n| # | アクション | 期待効果 | 難易度 | 優先度 |\n\n### 要注意シグナル\n早急に対応が必要な問題点\n\n## ルール\n- 具体的で実行可能な提案にする\n- 定量的な根拠を可能な限り含める\n- 推測と事実を明確に区別する",
             "分析目的: {{#" + make_node_id(A, 1) + ".analysis_goal#}}\n\nVOC分析結果:\n{{#" + make_node_id(A, 4) + ".text#}}",
             temp=0.3, max_tokens=4096),
-        node_base(A, 6, 1280, 282, "variable-aggregator", "結果統合", "分析結果と提案を統合する", height=89, extra={
+        node_base(A, 6, "variable-aggregator", "結果統合", "分析結果と提案を統合する", height=89, extra={
             "advanced_settings": {"group_enabled": False},
             "output_type": "string",
             "variables": [[make_node_id(A, 4), "text"], [make_node_id(A, 5), "text"]]
         }),
-        tt_node(A, 7, 1580, 282, "レポート整形", "VOC分析レポートとしてフォーマットする",
+        tt_node(A, 7, "レポート整形", "VOC分析レポートとしてフォーマットする",
             "# VOC分析レポート\n\n**データソース**: {{ data_source }}\n**分析目的**: {{ analysis_goal }}\n\n---\n\n{{ combined_analysis }}\n\n---\n*AIによる自動分析です。重要な意思決定には生データの確認をお勧めします。*",
             [
                 {"value_selector": [make_node_id(A, 6), "output"], "variable": "combined_analysis"},
                 {"value_selector": [make_node_id(A, 1), "data_source"], "variable": "data_source"},
                 {"value_selector": [make_node_id(A, 1), "analysis_goal"], "variable": "analysis_goal"},
             ]),
-        error_tt(A, 8, 980, 532, "VOC分析を開始できませんでした。",
+        error_tt(A, 8, "VOC分析を開始できませんでした。",
                  "- VOCデータは50文字以上で入力してください\n- 500,000文字以下にしてください", 2),
-        end_node(A, 9, 1880, 282, [
+        end_node(A, 9, [
             {"value_selector": [make_node_id(A, 7), "output"], "variable": "voc_report"},
             {"value_selector": [make_node_id(A, 8), "output"], "variable": "error_message"},
         ]),
@@ -434,17 +410,17 @@ def build_standard_workflow(ais_num, name, desc, icon, icon_bg, start_vars, vali
     """標準パターン: Start → Code → IF-ELSE → LLM → TT → End"""
     A = ais_num
     nodes = [
-        node_base(A, 1, 80, 282, "start", "開始", "入力パラメータを受け取る", height=149, extra={"variables": start_vars}),
-        code_node(A, 2, 380, 282, "入力検証", "入力テキストの長さチェックとインジェクション検出を行う",
+        node_base(A, 1, "start", "開始", "入力パラメータを受け取る", height=149, extra={"variables": start_vars}),
+        code_node(A, 2, "入力検証", "入力テキストの長さチェックとインジェクション検出を行う",
             INJECTION_CODE.format(params=validation_params, checks=validation_checks, combined_var=validation_combined),
             [{"value_selector": [make_node_id(A, 1), v.split(":")[0].strip()], "variable": v.split(":")[0].strip()} for v in validation_params.split(", ")],
             {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}
         ),
-        ifelse_node(A, 3, 680, 282, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
-        llm_node(A, 4, 980, 182, "AI生成", desc, system_prompt, user_prompt, temp=temp, max_tokens=max_tokens),
-        tt_node(A, 5, 1280, 182, "出力整形", "生成結果にメタ情報を付与して整形する", output_title, output_template_vars),
-        error_tt(A, 6, 980, 432, f"{name}の生成を開始できませんでした。", guide_text, 2),
-        end_node(A, 7, 1580, 282, [
+        ifelse_node(A, 3, "検証結果分岐", "入力検証結果で分岐する", 2, "is_valid"),
+        llm_node(A, 4, "AI生成", desc, system_prompt, user_prompt, temp=temp, max_tokens=max_tokens),
+        tt_node(A, 5, "出力整形", "生成結果にメタ情報を付与して整形する", output_title, output_template_vars),
+        error_tt(A, 6, f"{name}の生成を開始できませんでした。", guide_text, 2),
+        end_node(A, 7, [
             {"value_selector": [make_node_id(A, 5), "output"], "variable": "result"},
             {"value_selector": [make_node_id(A, 6), "output"], "variable": "error_message"},
         ]),
@@ -734,24 +710,6 @@ def build_ais_25():
 # YAML出力 & 実行
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-class LiteralStr(str):
-    pass
-
-def literal_str_representer(dumper, data):
-    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
-
-yaml.add_representer(LiteralStr, literal_str_representer)
-
-def convert_multiline(obj):
-    """Recursively convert multiline strings to LiteralStr for YAML block style"""
-    if isinstance(obj, dict):
-        return {k: convert_multiline(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_multiline(i) for i in obj]
-    elif isinstance(obj, str) and '\n' in obj:
-        return LiteralStr(obj)
-    return obj
-
 BUILDERS = {
     11: build_ais_11, 12: build_ais_12, 13: build_ais_13, 14: build_ais_14,
     15: build_ais_15, 16: build_ais_16, 17: build_ais_17, 18: build_ais_18,
@@ -777,13 +735,18 @@ FILENAMES = {
     25: "ais-25-training-content.yml",
 }
 
+def render_builder(num):
+    """BUILDERS[num] の文書を YAML テキストに変換する（ワーカープロセスでも実行される）"""
+    return dump_doc(BUILDERS[num]())
+
+
+def builder_jobs():
+    return [(FILENAMES[num], render_builder, num, "generate_all") for num in BUILDERS]
+
+
 if __name__ == "__main__":
-    for num, builder in BUILDERS.items():
-        doc = builder()
-        doc = convert_multiline(doc)
-        filepath = os.path.join(OUTPUT_DIR, FILENAMES[num])
-        with open(filepath, "w", encoding="utf-8") as f:
-            yaml.dump(doc, f, default_flow_style=False, allow_unicode=True, sort_keys=False, width=200)
-        print(f"  Generated: {FILENAMES[num]}")
-
-    print(f"\nAll {len(BUILDERS)} workflows generated successfully.")
+    args = batch_arg_parser().parse_args()
+    n = write_jobs(builder_jobs(), OUTPUT_DIR, workers=args.workers,
+                   label="  Generated: {}", force=args.force)
+
+    print(f"\n{n} of {len(BUILDERS)} workflows generated successfully.")
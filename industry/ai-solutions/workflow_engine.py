@@ -5,8 +5,17 @@ Dify ワークフロー自動生成エンジン
 """
 import yaml
 import os
+import sys
 
 OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(OUTPUT_DIR))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import dsl_yaml
+from gen_graph import Edge, Graph, Node
+from gen_ids import format_id
+from gen_layout import positions
+from gen_build import batch_arg_parser, render_jobs, write_jobs
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # YAML ヘルパー
@@ -21,7 +30,10 @@ def literal_representer(dumper, data):
 yaml.add_representer(LiteralStr, literal_representer)
 
 def convert_multiline(obj):
-    """Recursively convert multiline strings to LiteralStr for YAML block style"""
+    """
+    Recursively convert multiline strings to LiteralStr for YAML block style.
+    生成パスでは dsl_yaml.BlockStyleDumper がダンプ時に判定するため使用しない（互換用）。
+    """
     if isinstance(obj, dict):
         return {k: convert_multiline(v) for k, v in obj.items()}
     elif isinstance(obj, list):
@@ -35,29 +47,17 @@ def convert_multiline(obj):
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 def nid(ais_num, node_num):
-    """AIS番号とノード番号からノードID生成"""
-    return str(ais_num * 100000000000 + 50000000000000 + node_num)
+    """AIS番号とノード番号からノードID生成（gen_ids の ais 体系）"""
+    return format_id("ais", ais_num, node_num)
 
 def mk_edge(ais, src, tgt, src_type, tgt_type, handle="source"):
-    return {
-        "data": {"sourceType": src_type, "targetType": tgt_type, "isInIteration": False},
-        "id": f"e-{nid(ais, src)}-{nid(ais, tgt)}",
-        "source": nid(ais, src), "sourceHandle": handle,
-        "target": nid(ais, tgt), "targetHandle": "target", "type": "custom"
-    }
+    return Edge(nid(ais, src), nid(ais, tgt), src_type, tgt_type, handle)
 
-def mk_node(ais, num, x, y, ntype, title, desc, height=97, width=243, extra=None):
-    nd = {
-        "data": {"desc": desc, "selected": False, "title": title, "type": ntype},
-        "height": height, "id": nid(ais, num),
-        "position": {"x": x, "y": y},
-        "positionAbsolute": {"x": x, "y": y},
-        "selected": False, "sourcePosition": "right", "targetPosition": "left",
-        "type": "custom", "width": width,
-    }
+def mk_node(ais, num, ntype, title, desc, height=97, width=243, extra=None):
+    data = {"desc": desc, "selected": False, "title": title, "type": ntype}
     if extra:
-        nd["data"].update(extra)
-    return nd
+        data.update(extra)
+    return Node(nid(ais, num), data, height=height, width=width)
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 共通テンプレート
@@ -102,6 +102,11 @@ SENSITIVE_WORDS_CONFIG = {
     }
 }
 
+def sensitive_words_config(keywords):
+    """キーワードだけを差し替えた sensitive_word_avoidance 設定"""
+    return {**SENSITIVE_WORDS_CONFIG,
+            "config": {**SENSITIVE_WORDS_CONFIG["config"], "keywords": "\n".join(keywords)}}
+
 BASE_FEATURES = {
     "file_upload": {
         "image": {"enabled": False, "number_limits": 3, "transfer_methods": ["local_file", "remote_url"]}
@@ -119,9 +124,193 @@ BASE_FEATURES = {
 # 自動ワークフロー構築
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+# スケルトンの構造を決める cfg キー（これ以外はバリアントごとに差し替えられるスロット）
+SKELETON_KEYS = ("num", "vars", "main_var", "min_len")
+
+# スケルトンの座標（gen_layout の結果）。エッジ構成は固定なのでノードの高さが同じなら使い回せる
+_SKELETON_LAYOUT = {}
+
+
+class AutoSkeleton:
+    """
+    build_auto の事前コンパイル済みスケルトン。
+
+    ノードID・Start変数・入力検証コード（INJECTION_CODE_TPL.format）・ユーザープロンプト・
+    エッジなど、cfg の構造（SKELETON_KEYS）だけで決まる部分を一度だけ組み立てておき、
+    stamp() ではモデル・temperature・プロンプト文言などの可変スロットだけを差し込んで
+    ワークフロー文書を作る。同じ cfg を多数のバリアントに展開するときに使う。
+
+    stamp() が返す文書は固定部分（Start/Code/IF-ELSE/End ノード・エッジ等）を
+    スケルトンと共有する。書き換える場合は copy.deepcopy してから行うこと。
+    """
+    __slots__ = ("cfg", "start", "code", "ifelse", "end", "edges", "user_prompt",
+                 "meta_str", "out_vars", "error_vars", "ids", "pos")
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        A = cfg["num"]
+        self.ids = [nid(A, i) for i in range(1, 8)]
+
+        # ── Start変数 ──
+        start_vars = []
+        for v in cfg["vars"]:
+            vname, vtype = v[0], v[1]
+            req = v[3] if len(v) > 3 else True
+            sv = {"label": vname, "variable": vname, "required": req}
+            if vtype == "paragraph":
+                sv.update({"type": "paragraph", "max_length": v[2] if isinstance(v[2], int) else 999999, "options": []})
+            elif vtype == "select":
+                sv.update({"type": "select", "max_length": 48, "options": v[2]})
+            elif vtype == "text":
+                sv.update({"type": "text-input", "max_length": v[2] if isinstance(v[2], int) else 256, "options": []})
+            start_vars.append(sv)
+
+        # ── 入力検証コード ──
+        para_vars = [v[0] for v in cfg["vars"] if v[1] == "paragraph"]
+        if not para_vars:
+            para_vars = [cfg["main_var"]]
+        params_str = ", ".join(f"{v}: str" for v in para_vars)
+        main_var = cfg["main_var"]
+        min_len = cfg.get("min_len", 20)
+
+        checks = f'    if len({main_var}.strip()) < {min_len}:\n        issues.append("入力が短すぎます（{min_len}文字以上必要）")'
+        combined = " + ' ' + ".join(para_vars) if len(para_vars) > 1 else main_var
+
+        code_text = INJECTION_CODE_TPL.format(params=params_str, checks=checks, combined=combined)
+        code_vars = [{"value_selector": [nid(A, 1), v], "variable": v} for v in para_vars]
+
+        # ── ユーザープロンプト ──
+        user_parts = []
+        for v in cfg["vars"]:
+            vname = v[0]
+            ref = "{{#" + nid(A, 1) + "." + vname + "#}}"
+            if v[1] == "paragraph":
+                user_parts.append(f"{vname}:\n{ref}")
+            else:
+                user_parts.append(f"{vname}: {ref}")
+        self.user_prompt = "\n\n".join(user_parts)
+
+        # ── 出力テンプレートの固定部分 ──
+        meta_lines = []
+        for v in cfg["vars"]:
+            if v[1] != "paragraph":
+                meta_lines.append(f"**{v[0]}**: {{{{ {v[0]} }}}}")
+        self.meta_str = "\n".join(meta_lines)
+
+        self.out_vars = [{"value_selector": [nid(A, 4), "text"], "variable": "result"}]
+        for v in cfg["vars"]:
+            if v[1] != "paragraph":
+                self.out_vars.append({"value_selector": [nid(A, 1), v[0]], "variable": v[0]})
+        self.error_vars = [{"value_selector": [nid(A, 2), "error_message"], "variable": "error_message"}]
+
+        # ── 固定ノード・エッジ ──
+        self.start = mk_node(A, 1, "start", "開始", "入力パラメータを受け取る", height=149,
+                             extra={"variables": start_vars})
+        self.code = mk_node(A, 2, "code", "入力検証", "入力テキストの検証とインジェクション検出を行う",
+                            extra={"code_language": "python3", "code": code_text, "variables": code_vars,
+                                   "outputs": {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}})
+        self.ifelse = mk_node(A, 3, "if-else", "検証結果分岐", "入力検証結果で分岐する", height=125,
+                              extra={"cases": [{"case_id": "true", "logical_operator": "and",
+                                                "conditions": [{"id": "cond_valid",
+                                                                "variable_selector": [nid(A, 2), "is_valid"],
+                                                                "comparison_operator": "is", "value": "true"}]}]})
+        self.end = mk_node(A, 7, "end", "終了", "結果またはエラーメッセージを出力する", height=89,
+                           extra={"outputs": [
+                               {"value_selector": [nid(A, 5), "output"], "variable": "result"},
+                               {"value_selector": [nid(A, 6), "output"], "variable": "error_message"},
+                           ]})
+        self.edges = [
+            mk_edge(A, 1, 2, "start", "code"),
+            mk_edge(A, 2, 3, "code", "if-else"),
+            mk_edge(A, 3, 4, "if-else", "llm", "true"),
+            mk_edge(A, 3, 6, "if-else", "template-transform", "false"),
+            mk_edge(A, 4, 5, "llm", "template-transform"),
+            mk_edge(A, 5, 7, "template-transform", "end"),
+            mk_edge(A, 6, 7, "template-transform", "end"),
+        ]
+
+        # ── 配置（LLM・出力整形・エラー応答はスタンプごとに作るため、同じ ID の仮ノードで計算）──
+        # テンプレートの形は全 cfg 共通なので、ノード番号順の座標をモジュール内で使い回す
+        shape = [self.start, self.code, self.ifelse] + [Node(i, {}) for i in self.ids[3:6]] + [self.end]
+        order = [n.id for n in shape]
+        if _SKELETON_LAYOUT.get("key") != [n.height for n in shape]:
+            placed = positions(Graph(shape, self.edges))
+            _SKELETON_LAYOUT.update(key=[n.height for n in shape], xy=[placed[i] for i in order])
+        self.pos = dict(zip(order, _SKELETON_LAYOUT["xy"]))
+        for node in (self.start, self.code, self.ifelse, self.end):
+            node.x, node.y = self.pos[node.id]
+
+    def stamp(self, variant=None, **slots):
+        """
+        可変スロットを差し込んでワークフロー文書を返す。
+        スロットは variant dict / キーワード引数で指定し、省略分はコンパイル元 cfg の値を使う。
+        SKELETON_KEYS の変更は ValueError（別のスケルトンが必要）。
+        """
+        if variant:
+            slots = {**variant, **slots}
+        for key in SKELETON_KEYS:
+            if key in slots and slots[key] != self.cfg.get(key):
+                raise ValueError(f"'{key}' is part of the skeleton; compile a new AutoSkeleton instead")
+        cfg = {**self.cfg, **slots} if slots else self.cfg
+        ids = self.ids
+
+        out_header = cfg.get("out_header", cfg["name"])
+        disclaimer = cfg.get("disclaimer", "AIが生成した結果です。内容を確認してからご使用ください。")
+        output_tpl = f"# {out_header}\n\n{self.meta_str}\n\n---\n\n{{{{ result }}}}\n\n---\n*{disclaimer}*"
+        error_tpl = (
+            f"## 入力エラー\n\n"
+            f"{cfg['name']}の処理を開始できませんでした。\n\n"
+            f"**エラー詳細**: {{{{ error_message }}}}\n\n"
+            f"入力内容を修正して再度お試しください。"
+        )
+
+        llm = Node(ids[3], {
+            "desc": cfg["desc"], "selected": False, "title": "AI生成", "type": "llm",
+            "context": {"enabled": False, "variable_selector": []},
+            "model": {"completion_params": {"frequency_penalty": 0, "max_tokens": cfg.get("mt", 4096),
+                                            "presence_penalty": 0, "temperature": cfg.get("temp", 0.3),
+                                            "top_p": 1},
+                      "mode": "chat", "name": cfg.get("model", "gpt-4o-mini"),
+                      "provider": cfg.get("provider", "openai")},
+            "prompt_template": [{"role": "system", "text": cfg["sys"]},
+                                {"role": "user", "text": self.user_prompt}],
+            "variables": [], "vision": {"enabled": False}}, *self.pos[ids[3]])
+        output = Node(ids[4], {
+            "desc": "生成結果にメタ情報を付与して整形する", "selected": False, "title": "出力整形",
+            "type": "template-transform", "template": output_tpl, "variables": self.out_vars}, *self.pos[ids[4]])
+        error = Node(ids[5], {
+            "desc": "入力検証エラー時のメッセージを整形する", "selected": False, "title": "エラー応答",
+            "type": "template-transform", "template": error_tpl, "variables": self.error_vars}, *self.pos[ids[5]])
+
+        features = BASE_FEATURES
+        if "sensitive_words" in cfg:
+            features = {**BASE_FEATURES, "sensitive_word_avoidance": sensitive_words_config(cfg["sensitive_words"])}
+
+        # ── ワークフロー文書 ──
+        return {
+            "kind": "app",
+            "version": "0.1.5",
+            "app": {
+                "description": cfg["desc"],
+                "icon": cfg["icon"],
+                "icon_background": cfg["bg"],
+                "mode": "workflow",
+                "name": f"AIS-{cfg['num']}: {cfg['name']}",
+                "use_icon_as_answer_icon": False,
+            },
+            "workflow": {
+                "environment_variables": [],
+                "conversation_variables": [],
+                "features": dict(features),
+                "graph": Graph([self.start, self.code, self.ifelse, llm, output, error, self.end], self.edges)
+            }
+        }
+
+
 def build_auto(cfg):
     """
     コンパクトな定義辞書から標準ワークフロー（Start→Code→IF-ELSE→LLM→TT→End）を自動構築する。
+    同じ cfg から多数のバリアントを作る場合は AutoSkeleton(cfg).stamp(...) を使う。
 
     cfg keys:
         num (int): AIS番号
@@ -140,149 +329,31 @@ def build_auto(cfg):
         disclaimer (str): 免責事項
         temp (float): LLM temperature
         mt (int): max_tokens
+        provider (str): モデルプロバイダー（既定 openai）
+        model (str): モデル名（既定 gpt-4o-mini）
+        sensitive_words (list): 機密ワードのキーワード（既定は SENSITIVE_WORDS_CONFIG）
     """
-    A = cfg["num"]
-
-    # ── Start変数 ──
-    start_vars = []
-    for v in cfg["vars"]:
-        vname, vtype = v[0], v[1]
-        req = v[3] if len(v) > 3 else True
-        sv = {"label": vname, "variable": vname, "required": req}
-        if vtype == "paragraph":
-            sv.update({"type": "paragraph", "max_length": v[2] if isinstance(v[2], int) else 999999, "options": []})
-        elif vtype == "select":
-            sv.update({"type": "select", "max_length": 48, "options": v[2]})
-        elif vtype == "text":
-            sv.update({"type": "text-input", "max_length": v[2] if isinstance(v[2], int) else 256, "options": []})
-        start_vars.append(sv)
-
-    # ── 入力検証コード ──
-    para_vars = [v[0] for v in cfg["vars"] if v[1] == "paragraph"]
-    if not para_vars:
-        para_vars = [cfg["main_var"]]
-    params_str = ", ".join(f"{v}: str" for v in para_vars)
-    main_var = cfg["main_var"]
-    min_len = cfg.get("min_len", 20)
-
-    checks = f'    if len({main_var}.strip()) < {min_len}:\n        issues.append("入力が短すぎます（{min_len}文字以上必要）")'
-    combined = " + ' ' + ".join(para_vars) if len(para_vars) > 1 else main_var
-
-    code_text = INJECTION_CODE_TPL.format(params=params_str, checks=checks, combined=combined)
-    code_vars = [{"value_selector": [nid(A, 1), v], "variable": v} for v in para_vars]
-
-    # ── ユーザープロンプト ──
-    user_parts = []
-    for v in cfg["vars"]:
-        vname = v[0]
-        ref = "{{#" + nid(A, 1) + "." + vname + "#}}"
-        if v[1] == "paragraph":
-            user_parts.append(f"{vname}:\n{ref}")
-        else:
-            user_parts.append(f"{vname}: {ref}")
-    user_prompt = "\n\n".join(user_parts)
-
-    # ── 出力テンプレート ──
-    meta_lines = []
-    for v in cfg["vars"]:
-        if v[1] != "paragraph":
-            meta_lines.append(f"**{v[0]}**: {{{{ {v[0]} }}}}")
-    meta_str = "\n".join(meta_lines)
-    out_header = cfg.get("out_header", cfg["name"])
-    disclaimer = cfg.get("disclaimer", "AIが生成した結果です。内容を確認してからご使用ください。")
-    output_tpl = f"# {out_header}\n\n{meta_str}\n\n---\n\n{{{{ result }}}}\n\n---\n*{disclaimer}*"
-
-    out_vars = [{"value_selector": [nid(A, 4), "text"], "variable": "result"}]
-    for v in cfg["vars"]:
-        if v[1] != "paragraph":
-            out_vars.append({"value_selector": [nid(A, 1), v[0]], "variable": v[0]})
-
-    # ── エラーテンプレート ──
-    error_tpl = (
-        f"## 入力エラー\n\n"
-        f"{cfg['name']}の処理を開始できませんでした。\n\n"
-        f"**エラー詳細**: {{{{ error_message }}}}\n\n"
-        f"入力内容を修正して再度お試しください。"
-    )
-
-    # ── ノード構築 ──
-    nodes = [
-        mk_node(A, 1, 80, 282, "start", "開始", "入力パラメータを受け取る", height=149,
-                extra={"variables": start_vars}),
-        mk_node(A, 2, 380, 282, "code", "入力検証", "入力テキストの検証とインジェクション検出を行う",
-                extra={"code_language": "python3", "code": code_text, "variables": code_vars,
-                       "outputs": {"is_valid": {"type": "string"}, "error_message": {"type": "string"}}}),
-        mk_node(A, 3, 680, 282, "if-else", "検証結果分岐", "入力検証結果で分岐する", height=125,
-                extra={"cases": [{"case_id": "true", "logical_operator": "and",
-                                  "conditions": [{"id": "cond_valid",
-                                                  "variable_selector": [nid(A, 2), "is_valid"],
-                                                  "comparison_operator": "is", "value": "true"}]}]}),
-        mk_node(A, 4, 980, 182, "llm", "AI生成", cfg["desc"],
-                extra={"context": {"enabled": False, "variable_selector": []},
-                       "model": {"completion_params": {"frequency_penalty": 0, "max_tokens": cfg.get("mt", 4096),
-                                                       "presence_penalty": 0, "temperature": cfg.get("temp", 0.3),
-                                                       "top_p": 1},
-                                 "mode": "chat", "name": "gpt-4o-mini", "provider": "openai"},
-                       "prompt_template": [{"role": "system", "text": cfg["sys"]},
-                                           {"role": "user", "text": user_prompt}],
-                       "variables": [], "vision": {"enabled": False}}),
-        mk_node(A, 5, 1280, 182, "template-transform", "出力整形", "生成結果にメタ情報を付与して整形する",
-                extra={"template": output_tpl, "variables": out_vars}),
-        mk_node(A, 6, 980, 432, "template-transform", "エラー応答", "入力検証エラー時のメッセージを整形する",
-                extra={"template": error_tpl,
-                       "variables": [{"value_selector": [nid(A, 2), "error_message"], "variable": "error_message"}]}),
-        mk_node(A, 7, 1580, 282, "end", "終了", "結果またはエラーメッセージを出力する", height=89,
-                extra={"outputs": [
-                    {"value_selector": [nid(A, 5), "output"], "variable": "result"},
-                    {"value_selector": [nid(A, 6), "output"], "variable": "error_message"},
-                ]}),
-    ]
+    return AutoSkeleton(cfg).stamp()
 
-    # ── エッジ構築 ──
-    edges_list = [
-        mk_edge(A, 1, 2, "start", "code"),
-        mk_edge(A, 2, 3, "code", "if-else"),
-        mk_edge(A, 3, 4, "if-else", "llm", "true"),
-        mk_edge(A, 3, 6, "if-else", "template-transform", "false"),
-        mk_edge(A, 4, 5, "llm", "template-transform"),
-        mk_edge(A, 5, 7, "template-transform", "end"),
-        mk_edge(A, 6, 7, "template-transform", "end"),
-    ]
 
-    # ── ワークフロー文書 ──
-    return {
-        "kind": "app",
-        "version": "0.1.5",
-        "app": {
-            "description": cfg["desc"],
-            "icon": cfg["icon"],
-            "icon_background": cfg["bg"],
-            "mode": "workflow",
-            "name": f"AIS-{A}: {cfg['name']}",
-            "use_icon_as_answer_icon": False,
-        },
-        "workflow": {
-            "environment_variables": [],
-            "conversation_variables": [],
-            "features": dict(BASE_FEATURES),
-            "graph": {
-                "edges": edges_list,
-                "nodes": nodes,
-                "viewport": {"x": 0, "y": 0, "zoom": 1}
-            }
-        }
-    }
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# YAML 出力（シリアル / プロセス並列）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def dump_doc(doc):
+    """ワークフロー文書を DSL YAML テキストに変換する（複数行文字列はダンプ時にブロック化）"""
+    return dsl_yaml.dump(doc)
+
 
+def render_cfg(cfg):
+    """cfg から build_auto + YAML 変換までを行う（ワーカープロセスでも実行される）"""
+    return dump_doc(build_auto(cfg))
 
-def generate_batch(workflows):
-    """ワークフロー定義リストからYAMLファイルを一括生成する"""
-    count = 0
-    for cfg in workflows:
-        doc = build_auto(cfg)
-        doc = convert_multiline(doc)
-        filepath = os.path.join(OUTPUT_DIR, cfg["file"])
-        with open(filepath, "w", encoding="utf-8") as f:
-            yaml.dump(doc, f, default_flow_style=False, allow_unicode=True, sort_keys=False, width=200)
-        print(f"  ✓ {cfg['file']}")
-        count += 1
-    return count
+
+def generate_batch(workflows, workers=1, scope="generate_batch", force=False, out_dir=OUTPUT_DIR):
+    """
+    ワークフロー定義リストからYAMLファイルを一括生成する。
+    workers > 1 でプロセス並列、変更のない cfg はマニフェストによりスキップ。
+    """
+    jobs = [(cfg["file"], render_cfg, cfg, scope) for cfg in workflows]
+    return write_jobs(jobs, out_dir, workers, force=force)
@@ -13,6 +13,10 @@ Phase C: モックAPI依存テスト（TC-23〜26, TC-36〜40）
 使い方:
   1. モックサーバーを起動: cd mock-server && python app.py
   2. 本スクリプトを実行: python scripts/run-phase-bc.py
+
+記録／再生（リポジトリ直下の dsl_replay.py）:
+  DSL_REPLAY=record python scripts/run-phase-bc.py   # モックサーバーの応答を記録
+  DSL_REPLAY=replay python scripts/run-phase-bc.py   # 記録から再生（モックサーバー不要・ソケットを開かない）
 """
 
 import json
@@ -21,6 +25,7 @@ import sys
 import urllib.parse
 import urllib.request
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # ============================================================
 # 設定
@@ -31,6 +36,19 @@ KB_DIR = os.path.join(BASE_DIR, 'knowledge-bases')
 WORKFLOW_DIR = os.path.join(BASE_DIR, '..')  # industry/banking/
 MOCK_BASE = 'http://localhost:5001'
 
+# DSL_REPLAY=record|replay|auto なら HTTP 呼び出しを dsl_replay で記録・再生する
+# （未設定なら dsl_replay を import しない。テスト環境の依存は flask だけ）
+REPLAY = None
+if os.environ.get('DSL_REPLAY'):
+    sys.path.insert(0, os.path.join(BASE_DIR, '..', '..', '..'))
+    import dsl_replay
+    REPLAY = dsl_replay.from_env()
+urlopen = REPLAY.urlopen if REPLAY else urllib.request.urlopen
+
+# BNK-05 Iteration ノード 30500000000003 の設定（parallel_mode: true, parallel_nums 未指定 → Dify 既定 10,
+# error_handle_mode: continue-on-error）
+BNK05_PARALLEL_NUMS = 10
+
 results = []
 
 # ============================================================
@@ -68,7 +86,7 @@ def load_yaml_text(filename: str) -> str:
 
 def http_get(url: str) -> dict:
     req = urllib.request.Request(url)
-    with urllib.request.urlopen(req, timeout=10) as resp:
+    with urlopen(req, timeout=10) as resp:
         return json.loads(resp.read().decode('utf-8'))
 
 
@@ -76,7 +94,7 @@ def http_post(url: str, data: dict) -> dict:
     body = json.dumps(data).encode('utf-8')
     req = urllib.request.Request(url, data=body, method='POST')
     req.add_header('Content-Type', 'application/json')
-    with urllib.request.urlopen(req, timeout=10) as resp:
+    with urlopen(req, timeout=10) as resp:
         return json.loads(resp.read().decode('utf-8'))
 
 
@@ -261,17 +279,24 @@ def bnk05_code_split(branch_list: str, report_period: str) -> dict:
 
 
 # --- BNK-05 Iteration: HTTP GET per branch ---
-def bnk05_iteration_http(items: list, report_period_enc: str) -> list:
-    """各支店の実績データをモックAPIから取得"""
-    api_results = []
-    for branch_code in items:
+def bnk05_iteration_http(items: list, report_period_enc: str,
+                         parallel_nums: int = BNK05_PARALLEL_NUMS) -> list:
+    """
+    各支店の実績データをモックAPIから取得
+    （最大 parallel_nums 件を同時に取得。結果は items の順、失敗した項目はエラー JSON = continue-on-error）
+    """
+    def fetch(branch_code):
         url = f'{MOCK_BASE}/branch-performance?branch={branch_code}&period={report_period_enc}'
         try:
-            resp = http_get(url)
-            api_results.append(json.dumps(resp, ensure_ascii=False))
+            return json.dumps(http_get(url), ensure_ascii=False)
         except Exception as e:
-            api_results.append(json.dumps({'error': str(e)}, ensure_ascii=False))
-    return api_results
+            return json.dumps({'error': str(e)}, ensure_ascii=False)
+
+    # 1 件だけ、または記録の再生（I/O 待ちが無い）ならスレッドを起こさない
+    if len(items) <= 1 or (REPLAY and REPLAY.mode == 'replay'):
+        return [fetch(b) for b in items]
+    with ThreadPoolExecutor(max_workers=min(parallel_nums, len(items))) as executor:
+        return list(executor.map(fetch, items))
 
 
 # --- BNK-05 Code ノード 30500000000005（結果集約）再現 ---
@@ -334,7 +359,7 @@ def bnk08_code_url_encode(currency_pair: str) -> dict:
 def bnk08_http_get(pair_enc: str) -> str:
     url = f'{MOCK_BASE}/fx-rate?pair={pair_enc}'
     req = urllib.request.Request(url)
-    with urllib.request.urlopen(req, timeout=10) as resp:
+    with urlopen(req, timeout=10) as resp:
         return resp.read().decode('utf-8')
 
 
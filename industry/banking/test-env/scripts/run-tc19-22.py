@@ -9,9 +9,13 @@ LLM ノード（30400000000005）はスタブで代替する。
   → 不正分析(LLM※スタブ) → リスク判定抽出(Code) → エスカレーション判定(IF/ELSE)
   → [TRUE]  JSON構築(Code) → エスカレーション通知(HTTP) → 結果集約 → End
   → [FALSE] 通常処理(Template) → 結果集約 → End
+
+DSL_REPLAY=record|replay で HTTP とスタブ LLM の呼び出しを記録・再生する（リポジトリ直下の dsl_replay.py）。
+replay ならモックサーバー不要で、ソケットを開かない。
 """
 
 import json
+import os
 import re
 import sys
 import urllib.parse
@@ -20,6 +24,14 @@ import urllib.error
 
 BASE_URL = 'http://localhost:5001'
 
+# DSL_REPLAY が設定されているときだけ dsl_replay を import する（テスト環境の依存は flask だけ）
+REPLAY = None
+if os.environ.get('DSL_REPLAY'):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..'))
+    import dsl_replay
+    REPLAY = dsl_replay.from_env()
+urlopen = REPLAY.urlopen if REPLAY else urllib.request.urlopen
+
 # ─── カラー出力 ───
 
 GREEN = '\033[92m'
@@ -82,7 +94,7 @@ def node_http_get_transaction(transaction_id_enc: str) -> dict:
     """Node 30400000000003: 取引データ取得 (HTTP GET)"""
     url = f'{BASE_URL}/transactions/{transaction_id_enc}'
     req = urllib.request.Request(url)
-    with urllib.request.urlopen(req) as resp:
+    with urlopen(req) as resp:
         status = resp.status
         body = resp.read().decode('utf-8')
     return {'status_code': status, 'body': body}
@@ -155,6 +167,10 @@ def node_llm_stub(alert_type: str, summary: str, amount: float) -> dict:
     return {'text': text}
 
 
+if REPLAY:
+    node_llm_stub = REPLAY.wrap(node_llm_stub, '30400000000005', kind='llm')
+
+
 def node_risk_extraction(llm_text: str) -> dict:
     """Node 30400000000012: リスク判定抽出 (Code) — YAMLのコードを忠実に再現"""
     risk_level = "UNKNOWN"
@@ -196,7 +212,7 @@ def node_http_post_escalate(payload: str) -> dict:
         headers={'Content-Type': 'application/json'},
         method='POST',
     )
-    with urllib.request.urlopen(req) as resp:
+    with urlopen(req) as resp:
         status = resp.status
         body = resp.read().decode('utf-8')
     return {'status_code': status, 'body': body}
@@ -0,0 +1,32 @@
+"""テスト共通: リポジトリ直下のモジュールを import できるようにし、小さな DSL を組み立てる"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def node(nid, ntype, parent=None, **data):
+    n = {"id": nid, "type": "custom", "data": {"type": ntype, "title": nid, **data}}
+    if parent is not None:
+        n["parentId"] = parent
+    return n
+
+
+def edge(source, target, handle="source"):
+    return {"id": f"e-{source}-{target}", "source": source, "target": target, "sourceHandle": handle,
+            "targetHandle": "target", "type": "custom", "data": {}}
+
+
+def code(nid, source, variables=(), outputs=("out",), parent=None):
+    """main(**variables) を実行する code ノード。variables は [(変数名, value_selector)]"""
+    return node(nid, "code", parent, code_language="python3", code=source,
+                variables=[{"variable": v, "value_selector": list(s)} for v, s in variables],
+                outputs={o: {"type": None} for o in outputs})
+
+
+def workflow(nodes, edges, start_vars=("x",), mode="workflow"):
+    """Start（変数 start_vars）を先頭に足した DSL 文書"""
+    start = node("start", "start", variables=[{"variable": v, "type": "text-input"} for v in start_vars])
+    return {"app": {"mode": mode, "name": "test"}, "kind": "app", "version": "0.1.5",
+            "workflow": {"graph": {"nodes": [start, *nodes], "edges": edges}}}
@@ -0,0 +1,68 @@
+"""dsl_batch のチェックポイントと再開"""
+import json
+
+import pytest
+from conftest import code, edge, node, workflow
+
+from dsl_batch import run_batch
+
+
+@pytest.fixture
+def batch(tmp_path):
+    doc = workflow([
+        code("upper", "def main(x):\n    return {'out': x.upper()}\n", [("x", ("start", "x"))]),
+        node("end", "end", outputs=[{"variable": "y", "value_selector": ["upper", "out"]}]),
+    ], [edge("start", "upper"), edge("upper", "end")])
+    wf = tmp_path / "wf.yml"
+    wf.write_text(json.dumps(doc, ensure_ascii=False), encoding="utf-8")   # JSON は YAML としても読める
+    rows = [json.dumps({"x": f"row{i}"}) for i in range(10)]
+    rows[3] = "not json"
+    inp = tmp_path / "in.jsonl"
+    inp.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(wf), str(inp), str(tmp_path / "out.jsonl")
+
+
+def run(paths, **kwargs):
+    return run_batch(*paths, workers=1, chunk=2, progress=False, **kwargs)
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_continues_after_the_checkpoint(batch):
+    first = run(batch, limit=5)
+    assert (first["rows"], first["processed"], first["failed"]) == (5, 5, 1)
+
+    resumed = run(batch, resume=True)
+    assert (resumed["rows"], resumed["processed"], resumed["skipped"], resumed["failed"]) == (10, 5, 5, 1)
+    lines = read(batch[2])
+    assert [line["row"] for line in lines] == list(range(10))
+    assert lines[0]["outputs"] == {"y": "ROW0"} and lines[9]["outputs"] == {"y": "ROW9"}
+    assert lines[3]["status"] == "failed" and "invalid JSON" in lines[3]["error"]
+
+
+def test_resume_truncates_output_written_after_the_checkpoint(batch):
+    run(batch, limit=4)
+    with open(batch[2], "a", encoding="utf-8") as f:
+        f.write('{"row": 4, "status": "succ')   # チェックポイント保存前に中断された書きかけの行
+    resumed = run(batch, resume=True)
+    assert resumed["skipped"] == 4
+    assert [line["row"] for line in read(batch[2])] == list(range(10))
+
+
+def test_resume_restarts_when_the_workflow_changed(batch):
+    run(batch, limit=5)
+    with open(batch[0], "a", encoding="utf-8") as f:
+        f.write("\n")
+    resumed = run(batch, resume=True)
+    assert (resumed["skipped"], resumed["processed"]) == (0, 10)
+    assert len(read(batch[2])) == 10
+
+
+def test_without_resume_starts_over(batch):
+    run(batch, limit=5)
+    again = run(batch)
+    assert (again["skipped"], again["rows"]) == (0, 10)
+    assert len(read(batch[2])) == 10
@@ -0,0 +1,61 @@
+"""gen_build のインクリメンタル生成: ジョブのバージョンが import 先の共有モジュールを含むこと"""
+import importlib
+import os
+import sys
+
+import pytest
+
+import gen_build
+
+JOB_MODULE = '''from shared_fmt import render
+
+
+def build(arg):
+    return render(arg)
+'''
+
+
+@pytest.fixture
+def job_module(tmp_path, monkeypatch):
+    """tmp_path/jobmod.py（ジョブ関数）→ shared_fmt.py（共有モジュール）"""
+    (tmp_path / "shared_fmt.py").write_text("def render(arg):\n    return f'name: {arg}\\n'\n", encoding="utf-8")
+    (tmp_path / "jobmod.py").write_text(JOB_MODULE, encoding="utf-8")
+    (tmp_path / "out").mkdir()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("jobmod", "shared_fmt"):
+        sys.modules.pop(name, None)
+    gen_build._VERSIONS.clear()
+    gen_build._ORIGINS.clear()
+    yield importlib.import_module("jobmod"), tmp_path
+    for name in ("jobmod", "shared_fmt"):
+        sys.modules.pop(name, None)
+    gen_build._VERSIONS.clear()
+    gen_build._ORIGINS.clear()
+
+
+def write(module, out_dir):
+    return gen_build.write_jobs([("a.yml", module.build, "a", "test")], str(out_dir))
+
+
+def test_editing_a_shared_module_invalidates_the_manifest(job_module):
+    module, tmp_path = job_module
+    out_dir = tmp_path / "out"
+    assert write(module, out_dir) == 1
+    assert write(module, out_dir) == 0
+
+    (tmp_path / "shared_fmt.py").write_text("def render(arg):\n    return f'name: {arg}!\\n'\n", encoding="utf-8")
+    importlib.reload(sys.modules["shared_fmt"])
+    module = importlib.reload(module)
+    gen_build._VERSIONS.clear()   # 新しいプロセス（または dsl_watch の reload）と同じ状態
+    assert write(module, out_dir) == 1
+    assert (out_dir / "a.yml").read_text(encoding="utf-8") == "name: a!\n"
+
+
+def test_version_covers_layout_graph_ids_and_engine():
+    sys.path.insert(0, os.path.join(os.path.dirname(gen_build.__file__), "industry", "ai-solutions"))
+    import gen_batch1
+    import generate_all
+    for module in (gen_batch1, generate_all):
+        names = {os.path.basename(p) for p in gen_build.local_sources(module.__file__)}
+        assert {"gen_layout.py", "gen_graph.py", "gen_ids.py", "workflow_engine.py", "dsl_yaml.py"} <= names
+        assert not any("site-packages" in p for p in gen_build.local_sources(module.__file__))
@@ -0,0 +1,30 @@
+"""Code ノード: コンパイル結果のキャッシュと、ノードごとに独立した main() の名前空間"""
+from conftest import code, edge, node, workflow
+
+from dsl_interpreter import CODE_CACHE_STATS, Workflow, compile_code
+
+COUNTER = "calls = []\n\ndef main():\n    calls.append(1)\n    return {'out': len(calls)}\n"
+
+
+def test_same_source_is_compiled_once():
+    source = "def main():\n    return {'out': 'test_same_source_is_compiled_once'}\n"
+    hits, misses = CODE_CACHE_STATS["hits"], CODE_CACHE_STATS["misses"]
+    first = compile_code(source)
+    assert (CODE_CACHE_STATS["hits"], CODE_CACHE_STATS["misses"]) == (hits, misses + 1)
+    assert compile_code(source) is first
+    assert (CODE_CACHE_STATS["hits"], CODE_CACHE_STATS["misses"]) == (hits + 1, misses + 1)
+    assert compile_code(source + "\n") is not first
+
+
+def test_nodes_sharing_a_source_keep_separate_module_state():
+    doc = workflow([
+        code("a", COUNTER), code("b", COUNTER),
+        node("end", "end", outputs=[{"variable": "a", "value_selector": ["a", "out"]},
+                                    {"variable": "b", "value_selector": ["b", "out"]}]),
+    ], [edge("start", "a"), edge("a", "b"), edge("b", "end")])
+    compile_code(COUNTER)
+    hits = CODE_CACHE_STATS["hits"]
+    wf = Workflow(doc)
+    assert wf.run({}).outputs == {"a": 1, "b": 1}       # 同じコードオブジェクトでも calls はノードごと
+    assert CODE_CACHE_STATS["hits"] == hits + 2
+    assert Workflow(doc).run({}).outputs == {"a": 1, "b": 1}   # 別の Workflow は新しい名前空間で exec する
@@ -0,0 +1,35 @@
+"""dsl_corpus のディスクキャッシュ: 変更の検出と、削除されたファイルのエントリの掃除"""
+import dsl_corpus
+
+
+def write_docs(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / f"{name}.yml"
+        path.write_text(f"app:\n  name: {name}\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_unchanged_files_come_from_the_cache(tmp_path):
+    cache = str(tmp_path / "cache" / "corpus.pickle")
+    paths = write_docs(tmp_path, ["a", "b"])
+    assert dsl_corpus.load_corpus(paths, workers=1, cache_path=cache).stats["parsed"] == 2
+    corpus = dsl_corpus.load_corpus(paths, workers=1, cache_path=cache)
+    assert (corpus.stats["cached"], corpus.stats["parsed"]) == (2, 0)
+    assert corpus[paths[1]] == {"app": {"name": "b"}}
+
+
+def test_deleted_files_are_dropped_from_the_cache(tmp_path):
+    cache = str(tmp_path / "cache" / "corpus.pickle")
+    a, b, c = write_docs(tmp_path, ["a", "b", "c"])
+    dsl_corpus.load_corpus([a, b, c], workers=1, cache_path=cache)
+
+    (tmp_path / "b.yml").unlink()
+    dsl_corpus.load_corpus([a], workers=1, cache_path=cache)    # b は paths に無くても、消えたので捨てる
+    assert set(dsl_corpus._read_cache(cache)) == {a, c}          # c は存在するので部分ロードでも残す
+
+    (tmp_path / "c.yml").unlink()
+    corpus = dsl_corpus.load_corpus([a, c], workers=1, cache_path=cache)
+    assert c in corpus.errors
+    assert set(dsl_corpus._read_cache(cache)) == {a}
@@ -0,0 +1,25 @@
+"""gen_graph の DSL ⇔ 中間表現の往復"""
+from gen_graph import Edge, Graph, Node
+
+
+def test_node_round_trip_keeps_non_default_fixed_keys():
+    node = {"data": {"type": "llm", "title": "回答"}, "height": 120, "id": "n1",
+            "position": {"x": 10, "y": 20}, "positionAbsolute": {"x": 30, "y": 40}, "selected": True,
+            "sourcePosition": "bottom", "targetPosition": "top", "type": "custom-note", "width": 300,
+            "parentId": "it", "zIndex": 1002}
+    assert Node.from_dsl(node).to_dsl() == node
+
+
+def test_edge_round_trip_keeps_id_and_unknown_keys():
+    edge = {"id": "custom-1", "source": "a", "target": "b", "sourceHandle": "true", "targetHandle": "x",
+            "type": "custom", "zIndex": 1002,
+            "data": {"sourceType": "if-else", "targetType": "llm", "isInLoop": False}}
+    assert Edge.from_dsl(edge).to_dsl() == edge
+
+
+def test_generated_graph_uses_defaults():
+    graph = Graph([Node("a", {"type": "start"}), Node("b", {"type": "end"})], [Edge("a", "b", "start", "end")])
+    dsl = graph.to_dsl()
+    assert dsl["edges"][0]["id"] == "e-a-b" and dsl["edges"][0]["data"]["isInIteration"] is False
+    assert dsl["nodes"][0]["selected"] is False and dsl["nodes"][0]["type"] == "custom"
+    assert Graph.from_dsl(dsl).to_dsl() == dsl
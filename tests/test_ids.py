@@ -0,0 +1,44 @@
+"""gen_ids のリマップ: 衝突する ID だけを振り直し、参照・エッジ ID も追従させる"""
+from conftest import edge, node, workflow
+
+from gen_ids import Allocator, IdIndex, apply_mapping, combine, doc_node_ids, remap_doc
+
+
+def summarize_doc():
+    return workflow([
+        node("llm", "llm", prompt_template=[{"role": "user", "text": "{{#start.x#}} を要約"}]),
+        node("end", "end", outputs=[{"variable": "text", "value_selector": ["llm", "text"]}]),
+    ], [edge("start", "llm"), edge("llm", "end")])
+
+
+def index_of(ids):
+    index = IdIndex()
+    index.ids = {i: ["other.yml"] for i in ids}
+    return index
+
+
+def test_remap_only_touches_colliding_ids():
+    new, mapping = remap_doc(summarize_doc(), Allocator(index_of(["llm"])))
+    assert mapping == {"llm": "50000000000001"}
+    assert doc_node_ids(new) == ["start", "50000000000001", "end"]
+    graph = new["workflow"]["graph"]
+    assert [e["id"] for e in graph["edges"]] == ["e-start-50000000000001", "e-50000000000001-end"]
+    assert graph["edges"][0]["target"] == graph["edges"][1]["source"] == "50000000000001"
+    assert graph["nodes"][2]["data"]["outputs"][0]["value_selector"] == ["50000000000001", "text"]
+    assert graph["nodes"][1]["data"]["prompt_template"][0]["text"] == "{{#start.x#}} を要約"
+
+
+def test_combine_keeps_the_first_doc_and_renames_the_rest():
+    first, second = combine([summarize_doc(), summarize_doc()], index=IdIndex())
+    assert first == summarize_doc()
+    renamed = doc_node_ids(second)
+    assert len(set(renamed)) == 3 and not set(renamed) & set(doc_node_ids(first))
+    start = renamed[0]
+    assert second["workflow"]["graph"]["nodes"][1]["data"]["prompt_template"][0]["text"] == "{{#" + start + ".x#}} を要約"
+
+
+def test_edge_id_tokens_match_whole_ids_only():
+    doc = workflow([node("a", "code"), node("ab", "code")], [edge("a", "ab"), edge("ab", "a")])
+    new = apply_mapping(doc, {"a": "Z"})
+    assert [e["id"] for e in new["workflow"]["graph"]["edges"]] == ["e-Z-ab", "e-ab-Z"]
+    assert doc_node_ids(new) == ["start", "Z", "ab"]
@@ -0,0 +1,122 @@
+"""dsl_interpreter / dsl_scheduler の分岐・合流・イテレーションの動作"""
+import pytest
+from conftest import code, edge, node, workflow
+
+from dsl_interpreter import Workflow
+from dsl_scheduler import AsyncWorkflow
+
+
+@pytest.fixture(params=[Workflow, AsyncWorkflow], ids=["sync", "async"])
+def engine(request):
+    return request.param
+
+
+def ran(result):
+    return [nid for nid, *_ in result.steps]
+
+
+def condition(op, value, selector=("start", "x")):
+    return {"variable_selector": list(selector), "comparison_operator": op, "value": value}
+
+
+def branches(if_else, handles):
+    """if-else → ハンドルごとの code ノード（ハンドル名を返す）→ 合流する variable-aggregator → end"""
+    nodes = [if_else]
+    edges = [edge("start", "if")]
+    for handle in handles:
+        nodes.append(code(f"b_{handle}", f"def main():\n    return {{'out': {handle!r}}}\n"))
+        edges += [edge("if", f"b_{handle}", handle), edge(f"b_{handle}", "join")]
+    nodes += [node("join", "variable-aggregator", variables=[[f"b_{h}", "out"] for h in handles]),
+              node("end", "end", outputs=[{"variable": "branch", "value_selector": ["join", "output"]}])]
+    edges.append(edge("join", "end"))
+    return workflow(nodes, edges)
+
+
+def test_if_else_selects_first_matching_case(engine):
+    if_else = node("if", "if-else", cases=[
+        {"case_id": "big", "logical_operator": "and", "conditions": [condition(">", "10")]},
+        {"case_id": "mid", "logical_operator": "or", "conditions": [condition(">", "5"), condition("=", "0")]},
+    ])
+    wf = engine(branches(if_else, ["big", "mid", "false"]))
+    for x, expected in [("20", "big"), ("7", "mid"), ("0", "mid"), ("3", "false")]:
+        result = wf.run({"x": x})
+        assert result.status == "succeeded"
+        assert result.outputs == {"branch": expected}
+        assert result.steps and [n for n in ran(result) if n.startswith("b_")] == [f"b_{expected}"]
+        assert wf.run({"x": x}).outputs == result.outputs  # 実行ごとに状態を持ち越さない
+
+
+def test_if_else_legacy_true_false_handles(engine):
+    if_else = node("if", "if-else", logical_operator="and", conditions=[condition("contains", "急ぎ")])
+    wf = engine(branches(if_else, ["true", "false"]))
+    assert wf.run({"x": "急ぎの依頼"}).outputs == {"branch": "true"}
+    assert wf.run({"x": "通常の依頼"}).outputs == {"branch": "false"}
+
+
+def test_join_runs_when_only_some_branches_were_taken(engine):
+    # start → a → join、start → if →(true) b → join。if が false なら b は実行されずに join が走る
+    doc = workflow([
+        code("a", "def main(x):\n    return {'out': 'a:' + x}\n", [("x", ("start", "x"))]),
+        node("if", "if-else", cases=[{"case_id": "true", "conditions": [condition("is", "yes")]}]),
+        code("b", "def main():\n    return {'out': 'b'}\n"),
+        node("join", "template-transform", template="{{ a }}/{{ b }}",
+             variables=[{"variable": "a", "value_selector": ["a", "out"]},
+                        {"variable": "b", "value_selector": ["b", "out"]}]),
+        node("end", "end", outputs=[{"variable": "text", "value_selector": ["join", "output"]}]),
+    ], [edge("start", "a"), edge("start", "if"), edge("if", "b", "true"), edge("a", "join"), edge("b", "join"),
+        edge("join", "end")])
+    wf = engine(doc)
+
+    taken = wf.run({"x": "yes"})
+    assert taken.outputs == {"text": "a:yes/b"}
+
+    skipped = wf.run({"x": "no"})
+    assert skipped.status == "succeeded"
+    assert "b" not in ran(skipped) and "join" in ran(skipped)
+    assert skipped.outputs == {"text": "a:no/None"}
+
+
+def iteration_doc(mode, parallel=False):
+    """[1, 2, 3] を 2 倍する。2 の項目だけ失敗する"""
+    return workflow([
+        code("items", "def main():\n    return {'out': [1, 2, 3]}\n"),
+        node("it", "iteration", iterator_selector=["items", "out"], output_selector=["double", "out"],
+             start_node_id="double", error_handle_mode=mode, is_parallel=parallel, parallel_nums=3),
+        code("double", "def main(item):\n    if item == 2:\n        raise ValueError('bad item')\n"
+             "    return {'out': item * 2}\n", [("item", ("it", "item"))], parent="it"),
+        node("end", "end", outputs=[{"variable": "result", "value_selector": ["it", "output"]}]),
+    ], [edge("start", "items"), edge("items", "it"), edge("it", "end")])
+
+
+@pytest.mark.parametrize("parallel", [False, True], ids=["serial", "parallel"])
+def test_iteration_terminated_fails_the_run(engine, parallel):
+    result = engine(iteration_doc("terminated", parallel)).run({})
+    assert result.status == "failed"
+    assert result.error_node == "double"
+    assert "bad item" in result.error
+    assert "end" not in ran(result)
+
+
+@pytest.mark.parametrize("parallel", [False, True], ids=["serial", "parallel"])
+@pytest.mark.parametrize("mode, expected", [
+    ("continue-on-error", [2, None, 6]),
+    ("remove-abnormal-output", [2, 6]),
+])
+def test_iteration_error_modes_keep_running(engine, parallel, mode, expected):
+    result = engine(iteration_doc(mode, parallel)).run({})
+    assert result.status == "succeeded"
+    assert result.outputs == {"result": expected}
+    assert [(e["iteration"], e["index"], e["node"]) for e in result.item_errors] == [("it", 1, "double")]
+
+
+def test_async_workflow_closes_its_thread_pool():
+    doc = workflow([node("llm", "llm", prompt_template=[{"role": "user", "text": "{{#start.x#}}"}]),
+                    node("end", "end", outputs=[{"variable": "text", "value_selector": ["llm", "text"]}])],
+                   [edge("start", "llm"), edge("llm", "end")])
+    with AsyncWorkflow(doc) as wf:
+        assert wf.run({"x": "a"}).status == "succeeded"
+        executor = wf._executor
+        assert executor is not None
+    assert wf._executor is None and executor._shutdown
+    assert wf.run({"x": "b"}).status == "succeeded"   # close 後も次の run でプールを作り直す
+    wf.close()
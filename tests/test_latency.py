@@ -0,0 +1,57 @@
+"""dsl_latency: 分布の幅を 0 にしたコストモデルで、手計算できる見積もりになること"""
+import pytest
+from conftest import code, edge, node, workflow
+
+from dsl_latency import estimate, load_model
+
+
+@pytest.fixture
+def model():
+    """すべて固定値（[中央値, 裾] の裾 = 中央値も固定になる）のコストモデル"""
+    model = load_model()
+    model.update({"default": 0, "code": 1.0, "template-transform": 2.0,
+                  "iteration": {"items": 4, "overhead": 0.5},
+                  "http-request": {"latency": 0.3, "failure_rate": 0.0}})
+    model["llm"].update({"profiles": {"fixed": {"ttft": [0.5, 0.5], "tps": [100.0, 100.0]}},
+                         "default_profile": "fixed", "fill": [0.5, 0.5]})
+    return model
+
+
+def end(*selectors):
+    return node("end", "end", outputs=[{"variable": s, "value_selector": [s, "out"]} for s in selectors])
+
+
+def test_parallel_branches_take_the_slower_one(model):
+    model["default"] = 0.25   # start / end
+    doc = workflow([code("a", ""), node("b", "template-transform", template=""), end("a")],
+                   [edge("start", "a"), edge("start", "b"), edge("a", "end"), edge("b", "end")])
+    result = estimate(doc, model, samples=20)
+    assert (result["p50"], result["p95"]) == (0.25 + 2.0 + 0.25, 0.25 + 2.0 + 0.25)
+    assert [step["node"] for step in result["path"]] == ["start", "b", "end"]
+
+
+def test_sequential_llm_and_http_add_up(model):
+    doc = workflow([node("llm", "llm", model={"name": "fixed", "completion_params": {"max_tokens": 200}}),
+                    node("http", "http-request", method="get", url="http://example.invalid/"), end("llm")],
+                   [edge("start", "llm"), edge("llm", "http"), edge("http", "end")])
+    assert estimate(doc, model, samples=20)["p50"] == 0.5 + 100 / 100 + 0.3   # TTFT + 200×0.5 トークン / 100 tok/s + HTTP
+
+
+def test_failing_http_waits_for_timeouts_and_retries(model):
+    model["http-request"]["failure_rate"] = 1.0
+    doc = workflow([node("http", "http-request", timeout={"read": 2},
+                         retry_config={"retry_enabled": True, "max_retries": 2, "retry_interval": 500})],
+                   [edge("start", "http")])
+    assert estimate(doc, model, samples=5)["p50"] == 3 * 2 + 2 * 0.5
+
+
+@pytest.mark.parametrize("parallel, expected", [(False, 4 * 1.0 + 0.5), (True, 2 * 1.0 + 0.5)])
+def test_iteration_fills_parallel_slots(model, parallel, expected):
+    doc = workflow([
+        node("it", "iteration", iterator_selector=["start", "x"], output_selector=["child", "out"],
+             start_node_id="child", is_parallel=parallel, parallel_nums=2),
+        code("child", "", parent="it"), end("it"),
+    ], [edge("start", "it"), edge("it", "end")])
+    result = estimate(doc, model, samples=5)
+    assert result["p50"] == expected   # 4 項目 × 1 秒を 1 枠（直列）または 2 枠に割り当て + オーバーヘッド 0.5 秒
+    assert result["path"][1]["path"][0]["node"] == "child"
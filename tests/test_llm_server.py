@@ -0,0 +1,64 @@
+"""dsl_llm_server: SSE の形式、max_tokens での打ち切り、/metrics"""
+import json
+import urllib.request
+
+import pytest
+
+from dsl_llm_server import serve_in_thread
+
+MESSAGES = [{"role": "system", "content": "## 出力\n### 判定\nリスクレベル: 高/中/低\n- 理由: …"},
+            {"role": "user", "content": "案件 1"}]
+
+
+@pytest.fixture
+def server():
+    server, base_url = serve_in_thread(0)
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def post(base_url, **request):
+    req = urllib.request.Request(base_url + "/chat/completions", method="POST",
+                                 data=json.dumps({"model": "gpt-4o-mini", "messages": MESSAGES, **request}).encode(),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return resp.headers.get("Content-Type"), resp.read().decode("utf-8")
+
+
+def test_stream_is_sse_framed_and_matches_the_plain_response(server):
+    _, base_url = server
+    content_type, body = post(base_url, stream=True, stream_options={"include_usage": True})
+    assert content_type == "text/event-stream"
+    assert body.endswith("\n\n")
+    events = body[:-2].split("\n\n")
+    assert all(e.startswith("data: ") and "\n" not in e for e in events)
+    assert events[-1] == "data: [DONE]"
+    chunks = [json.loads(e[6:]) for e in events[:-1]]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": ""}
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    streamed = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+    assert chunks[-1]["usage"]["completion_tokens"] == len(chunks) - 2
+
+    _, plain = post(base_url)
+    assert json.loads(plain)["choices"][0]["message"]["content"] == streamed
+
+
+def test_max_tokens_truncates_with_finish_reason_length(server):
+    _, base_url = server
+    full = json.loads(post(base_url)[1])
+    assert full["choices"][0]["finish_reason"] == "stop" and full["usage"]["completion_tokens"] > 3
+    cut = json.loads(post(base_url, max_tokens=3)[1])
+    assert cut["choices"][0]["finish_reason"] == "length"
+    assert cut["usage"]["completion_tokens"] == 3
+    assert full["choices"][0]["message"]["content"].startswith(cut["choices"][0]["message"]["content"])
+
+
+def test_metrics_count_requests_and_tokens(server):
+    _, base_url = server
+    post(base_url, max_tokens=3)
+    post(base_url, max_tokens=3, stream=True)
+    with urllib.request.urlopen(base_url.rsplit("/v1", 1)[0] + "/metrics", timeout=10) as resp:
+        metrics = json.loads(resp.read())
+    assert (metrics["requests"], metrics["streamed"], metrics["completion_tokens"]) == (2, 1, 6)
+    assert metrics["ttft_p50"] == 0.0
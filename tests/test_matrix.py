@@ -0,0 +1,31 @@
+"""gen_matrix のアーカイブ書き込み: 成功時の中身と、失敗時に一時ファイルを残さないこと"""
+import json
+import tarfile
+
+import pytest
+
+from gen_matrix import INDEX_NAME, write_archive
+
+
+def entries(n, fail_at=None):
+    for i in range(n):
+        if i == fail_at:
+            raise RuntimeError("generator failed")
+        yield f"v{i}.yml", {"name": f"v{i}.yml"}, f"app:\n  name: v{i}\n"
+
+
+def test_archive_contains_members_and_index(tmp_path):
+    out = tmp_path / "variants.tar.gz"
+    assert write_archive(str(out), entries(3)) == (3, 3 * len("app:\n  name: v0\n"))
+    with tarfile.open(out) as tar:
+        assert tar.getnames() == ["v0.yml", "v1.yml", "v2.yml", INDEX_NAME]
+        index = [json.loads(line) for line in tar.extractfile(INDEX_NAME)]
+    assert [r["name"] for r in index] == ["v0.yml", "v1.yml", "v2.yml"]
+    assert not (tmp_path / "variants.tar.gz.tmp").exists()
+
+
+def test_failed_generation_removes_the_temporary_file(tmp_path):
+    out = tmp_path / "variants.tar.gz"
+    with pytest.raises(RuntimeError):
+        write_archive(str(out), entries(3, fail_at=2))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,127 @@
+"""dsl_replay の記録・再生と、記録が無いときの扱い"""
+import socket
+
+import pytest
+from conftest import edge, node, workflow
+
+from dsl_interpreter import Stubs, Workflow
+from dsl_replay import ReplayCache, ReplayMiss, ReplayStubs
+
+
+class CountingTransport:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, request):
+        self.calls += 1
+        return {"status_code": 200, "headers": {"Content-Type": "text/plain"},
+                "body": f"{request['method']} {request['url']}".encode("utf-8")}
+
+
+class CountingStubs(Stubs):
+    def __init__(self):
+        self.calls = 0
+
+    def llm(self, node_id, data, messages):
+        self.calls += 1
+        return {"text": f"応答 {self.calls}: {messages[-1]['text']}"}
+
+
+HTTP_DOC = workflow([
+    node("http", "http-request", method="get", url="http://example.invalid/items/{{#start.x#}}"),
+    node("end", "end", outputs=[{"variable": "body", "value_selector": ["http", "body"]}]),
+], [edge("start", "http"), edge("http", "end")])
+
+LLM_DOC = workflow([
+    node("llm", "llm", model={"provider": "openai", "name": "gpt-4o-mini"},
+         prompt_template=[{"role": "user", "text": "{{#start.x#}} を要約"}]),
+    node("end", "end", outputs=[{"variable": "text", "value_selector": ["llm", "text"]}]),
+], [edge("start", "llm"), edge("llm", "end")])
+
+
+def http_workflow(tmp_path, mode, transport):
+    cache = ReplayCache(str(tmp_path), mode)
+    return Workflow(HTTP_DOC, transport=cache.transport(transport)), cache
+
+
+def llm_workflow(tmp_path, mode, stubs):
+    cache = ReplayCache(str(tmp_path), mode)
+    return Workflow(LLM_DOC, stubs=ReplayStubs(stubs, cache)), cache
+
+
+def test_http_replay_returns_the_recording_without_calling(tmp_path):
+    transport = CountingTransport()
+    wf, _ = http_workflow(tmp_path, "record", transport)
+    recorded = wf.run({"x": "1"})
+    assert recorded.outputs == {"body": "GET http://example.invalid/items/1"}
+
+    wf, cache = http_workflow(tmp_path, "replay", transport)
+    assert wf.run({"x": "1"}).outputs == recorded.outputs
+    assert transport.calls == 1
+    assert (cache.stats["hits"], cache.stats["misses"]) == (1, 0)
+
+
+def test_http_replay_miss_fails_the_node(tmp_path):
+    transport = CountingTransport()
+    http_workflow(tmp_path, "record", transport)[0].run({"x": "1"})
+
+    wf, cache = http_workflow(tmp_path, "replay", transport)
+    result = wf.run({"x": "2"})
+    assert result.status == "failed"
+    assert result.error_node == "http"
+    assert "no recording for http" in result.error
+    assert transport.calls == 1 and cache.stats["misses"] == 1
+
+
+def test_http_replay_miss_is_not_retried(tmp_path):
+    doc = workflow([
+        node("http", "http-request", method="get", url="http://example.invalid/{{#start.x#}}",
+             retry_config={"retry_enabled": True, "max_retries": 3, "retry_interval": 5000}),
+    ], [edge("start", "http")])
+    cache = ReplayCache(str(tmp_path), "replay")
+    result = Workflow(doc, transport=cache.transport(CountingTransport())).run({"x": "1"})
+    assert result.status == "failed"
+    assert cache.stats["misses"] == 1      # 再送しない（retry_interval の 5 秒も待たない）
+    assert result.elapsed < 1
+
+
+def test_llm_replay_miss_fails_the_node(tmp_path):
+    stubs = CountingStubs()
+    llm_workflow(tmp_path, "record", stubs)[0].run({"x": "議事録"})
+
+    wf, _ = llm_workflow(tmp_path, "replay", stubs)
+    assert wf.run({"x": "議事録"}).outputs == {"text": "応答 1: 議事録 を要約"}
+    result = wf.run({"x": "日報"})
+    assert result.status == "failed"
+    assert result.error_node == "llm"
+    assert "ReplayMiss" in result.error
+    assert stubs.calls == 1
+
+
+def test_auto_records_misses_and_replays_hits(tmp_path):
+    stubs = CountingStubs()
+    wf, cache = llm_workflow(tmp_path, "auto", stubs)
+    first = wf.run({"x": "議事録"}).outputs
+    assert wf.run({"x": "議事録"}).outputs == first
+    assert stubs.calls == 1
+    assert (cache.stats["hits"], cache.stats["misses"], cache.stats["recorded"]) == (1, 1, 1)
+
+
+def test_wrap_raises_replay_miss(tmp_path):
+    cache = ReplayCache(str(tmp_path), "replay")
+    wrapped = cache.wrap(lambda x: x, "n1", kind="llm")
+    with pytest.raises(ReplayMiss):
+        wrapped(1)
+
+
+def test_block_sockets_can_be_undone(tmp_path):
+    original = socket.socket.connect
+    cache = ReplayCache(str(tmp_path), "replay")
+    restore = cache.block_sockets()
+    try:
+        with pytest.raises(ReplayMiss):
+            socket.create_connection(("127.0.0.1", 9))
+    finally:
+        restore()
+    assert socket.socket.connect is original
+    assert cache.stats["blocked_sockets"] == 1
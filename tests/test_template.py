@@ -0,0 +1,42 @@
+"""dsl_template の内蔵レンダラー（_plain）と jinja2 の描画結果の一致"""
+import pytest
+
+from dsl_template import TemplateCache, TemplateError, _plain
+
+CASES = [
+    ("{{ name }}様", {"name": "山田"}, "山田様"),
+    ("{{name}}-{{ n }}", {"name": "a", "n": 3}, "a-3"),
+    ("件名: {{ title }}\n", {"title": "報告"}, "件名: 報告"),            # 末尾の改行 1 つは落とす
+    ("件名: {{ title }}\n\n", {"title": "報告"}, "件名: 報告\n"),
+    ("A  \n  {{- x -}}  \n  B", {"x": "X"}, "AXB"),                       # {{- / -}} は前後の空白・改行を削る
+    ("A  {{- x }}  B", {"x": "X"}, "AX  B"),
+    ("A  {{ x -}}\n  B", {"x": "X"}, "A  XB"),
+    ("[{{ missing }}]", {}, "[]"),                                        # 未定義は空文字
+    ("[{{ none }}]", {"none": None}, "[None]"),                           # 定義済みの None は jinja2 と同じく "None"
+    ("no variables", {}, "no variables"),
+]
+
+
+@pytest.mark.parametrize("source, values, expected", CASES)
+def test_plain_renderer(source, values, expected):
+    assert _plain(source)(values) == expected
+
+
+@pytest.mark.parametrize("source, values, expected", CASES)
+def test_plain_matches_jinja2(source, values, expected):
+    jinja2 = pytest.importorskip("jinja2")
+    assert jinja2.Environment(autoescape=False).from_string(source).render(values) == expected
+
+
+@pytest.mark.parametrize("source", ["{% if x %}y{% endif %}", "{{ x | upper }}", "{{ a.b }}", "{# comment #}"])
+def test_plain_rejects_jinja2_syntax(source):
+    with pytest.raises(TemplateError):
+        _plain(source)
+
+
+def test_cache_hits_and_evicts():
+    cache = TemplateCache(maxsize=2)
+    for source in ["{{ a }}", "{{ a }}", "{{ b }}", "{{ c }}", "{{ a }}"]:
+        cache.render(source, {"a": 1, "b": 2, "c": 3})
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["evictions"], info["size"]) == (1, 4, 2, 2)
@@ -0,0 +1,51 @@
+"""dsl_trace: 区間の行（lane）割り当て、Chrome trace イベント、クリティカルパス"""
+from types import SimpleNamespace
+
+from conftest import code, edge, node, workflow
+
+from dsl_interpreter import Workflow
+from dsl_trace import _lanes, critical_path, trace_events
+
+
+def span(nid, start, end, kind="node", ntype="code", scope=None, item=None):
+    return {"node": nid, "kind": kind, "type": ntype, "scope": scope, "item": item, "title": nid,
+            "start": start, "end": end, "in_bytes": 0, "out_bytes": 0}
+
+
+def test_overlapping_spans_get_separate_lanes_and_children_nest():
+    spans = [span("a", 0.0, 1.0), span("b", 0.5, 2.0), span("a1", 0.1, 0.4, kind="attempt"), span("c", 1.0, 1.5)]
+    lanes = {s["node"]: tid for tid, s in _lanes(spans)}
+    assert lanes == {"a": 0, "a1": 0, "b": 1, "c": 0}   # a1 は a の内側、c は a の終了後に同じ行を使う
+
+
+def test_trace_events_are_relative_microseconds():
+    result = SimpleNamespace(started=10.0, spans=[span("a", 10.0, 10.5), span("b", 10.25, 11.0)])
+    events = trace_events(result, "wf.yml")
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "wf.yml"}}
+    complete = [(e["name"], e["tid"], e["ts"], e["dur"]) for e in events if e["ph"] == "X"]
+    assert complete == [("a", 0, 0.0, 500000.0), ("b", 1, 250000.0, 750000.0)]
+    assert [e["args"]["name"] for e in events if e["name"] == "thread_name"] == ["lane 0", "lane 1"]
+
+
+def fan_in_doc():
+    return workflow([
+        code("a", "def main():\n    return {'out': 1}\n"), code("b", "def main():\n    return {'out': 2}\n"),
+        node("end", "end", outputs=[{"variable": "a", "value_selector": ["a", "out"]}]),
+    ], [edge("start", "a"), edge("start", "b"), edge("a", "end"), edge("b", "end")])
+
+
+def test_critical_path_follows_the_latest_predecessor():
+    wf = Workflow(fan_in_doc())
+    spans = [span("start", 0.0, 0.1, ntype="start"), span("a", 0.1, 0.3), span("b", 0.1, 0.5),
+             span("end", 0.5, 0.6, ntype="end")]
+    assert [s["node"] for s, _ in critical_path(wf, spans)] == ["start", "b", "end"]
+    spans[1]["end"] = 0.55
+    assert [s["node"] for s, _ in critical_path(wf, spans)] == ["start", "a", "end"]
+
+
+def test_traced_run_ends_its_critical_path_at_end():
+    wf = Workflow(fan_in_doc(), trace=True)
+    result = wf.run({})
+    assert {s["node"] for s in result.spans if s["kind"] == "node"} == {"start", "a", "b", "end"}
+    path = critical_path(wf, result.spans)
+    assert path[0][0]["node"] == "start" and path[-1][0]["node"] == "end"
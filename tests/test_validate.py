@@ -0,0 +1,70 @@
+"""dsl_validate の会話変数（variables.12）と sensitive_word_avoidance のチェック"""
+import pytest
+from conftest import edge, node, workflow
+
+from dsl_validate import validate_doc
+
+
+def codes(doc, rule):
+    return sorted(i["code"] for i in validate_doc(doc) if i["rule"] == rule)
+
+
+def chatflow(*nodes, conversation=("customer_id",)):
+    doc = workflow([*nodes, node("answer", "answer", answer="ok")],
+                   [edge("start", nodes[0]["id"]), edge(nodes[-1]["id"], "answer")], mode="advanced-chat")
+    doc["workflow"]["conversation_variables"] = [{"name": n, "value_type": "string", "value": ""} for n in conversation]
+    return doc
+
+
+def assigner(target, nid="assign"):
+    return node(nid, "variable-assigner", assigned_variable_selector=target,
+                input=[{"variable_selector": ["start", "x"], "write_mode": "over-write"}])
+
+
+def test_assigner_writing_a_declared_conversation_var_is_ok():
+    assert codes(chatflow(assigner(["conversation", "customer_id"])), "variables.12") == []
+
+
+def test_conversation_write_outside_assigner():
+    code = node("code", "code", code_language="python3", code="def main():\n    return {}\n", outputs={},
+                assigned_variable_selector=["conversation", "customer_id"])
+    assert codes(chatflow(code), "variables.12") == ["conversation-write-outside-assigner"]
+
+
+def test_assignments_target_must_be_declared():
+    legacy = node("assign", "variable-assigner",
+                  assignments=[{"target": ["missing"], "operation": "overwrite", "source": ["start", "x"]}])
+    assert codes(chatflow(legacy), "variables.12") == ["unknown-conversation-var"]
+
+
+def test_conversation_write_in_workflow_mode():
+    doc = workflow([assigner(["conversation", "customer_id"]),
+                    node("end", "end", outputs=[{"variable": "x", "value_selector": ["start", "x"]}])],
+                   [edge("start", "assign"), edge("assign", "end")])
+    assert "conversation-var-in-workflow" in codes(doc, "variables.12")
+
+
+def with_swa(swa):
+    doc = workflow([node("end", "end", outputs=[{"variable": "x", "value_selector": ["start", "x"]}])],
+                   [edge("start", "end")])
+    doc["workflow"]["features"] = {"sensitive_word_avoidance": swa}
+    return doc
+
+
+@pytest.mark.parametrize("swa, expected", [
+    ({"enabled": False, "configs": []}, []),
+    ({"enabled": True, "type": "keywords",
+      "config": {"keywords": "爆弾\n殺害", "inputs_config": {"enabled": True, "preset_response": "お答えできません。"}}}, []),
+    ({"enabled": True, "type": "keywords", "configs": {"keywords": "a"}}, ["config-not-mapping", "configs-plural"]),
+    ({"enabled": True, "type": "keywords", "config": [{"keywords": "a"}]}, ["config-not-mapping"]),
+    ({"enabled": True, "type": "keywords", "config": {"keywords": ["爆弾", "殺害"]}}, ["keywords-not-string"]),
+    ({"enabled": True, "type": "keywords", "config": {"keywords": "\n".join(map(str, range(101)))}},
+     ["too-many-keywords"]),
+    ({"enabled": True, "type": "keywords",
+      "config": {"keywords": "a", "outputs_config": {"enabled": True, "preset_response": "あ" * 101}}},
+     ["preset-response-too-long"]),
+    ({"enabled": True, "type": "api", "config": {}}, ["missing-extension-id"]),
+    ({"enabled": True, "type": "moderation", "config": {}}, ["invalid-type"]),
+])
+def test_sensitive_word_avoidance(swa, expected):
+    assert codes(with_swa(swa), "sensitive-words") == expected